@@ -0,0 +1,73 @@
+"""Add indexes for booking conflict checks and dashboard queries
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Tables are created by Base.metadata.create_all / sql/DB.sql, which did not define
+indexes on the foreign keys and time columns the repositories filter on.
+Indexes are built CONCURRENTLY and with IF NOT EXISTS, so the migration is safe on a
+live database and on one where create_all already created them from the models.
+The unique registration index requires no duplicate (member_id, class_id) rows; if any exist the
+migration stops and lists them, and nothing is deleted.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# (name, table, column list, unique)
+INDEXES = [
+    ("ix_groupclass_room_time", "groupclass", "room_id, start_time, end_time", False),
+    ("ix_groupclass_trainer_start", "groupclass", "trainer_id, start_time", False),
+    ("ix_pt_session_room_status_start", "personaltrainingsession", "room_id, status, start_time", False),
+    ("ix_pt_session_trainer_status_start", "personaltrainingsession", "trainer_id, status, start_time", False),
+    ("ix_healthmetric_member_recorded", "healthmetric", "member_id, recorded_at DESC", False),
+    ("ix_classregistration_class", "classregistration", "class_id", False),
+    ("uq_classregistration_member_class", "classregistration", "member_id, class_id", True),
+    ("ix_traineravailability_trainer_start", "traineravailability", "trainer_id, start_time", False),
+    ("ix_maintenancerecord_status", "maintenancerecord", "status", False),
+]
+
+
+# Duplicate (member_id, class_id) pairs named in the error when the unique index cannot be built
+DUPLICATE_SAMPLE = 50
+
+
+def upgrade() -> None:
+    # The unique index cannot be built while duplicate registrations exist. Which copy to keep is
+    # the operator's call, so stop and name them instead of deleting rows
+    duplicates = op.get_bind().exec_driver_sql(
+        """
+        SELECT member_id, class_id, count(*) AS copies
+        FROM classregistration
+        GROUP BY member_id, class_id
+        HAVING count(*) > 1
+        ORDER BY member_id, class_id
+        """
+    ).all()
+    if duplicates:
+        pairs = ", ".join(f"({member_id}, {class_id}) x{copies}" for member_id, class_id, copies in duplicates[:DUPLICATE_SAMPLE])
+        more = f" and {len(duplicates) - DUPLICATE_SAMPLE} more" if len(duplicates) > DUPLICATE_SAMPLE else ""
+        raise RuntimeError(
+            f"classregistration has {len(duplicates)} duplicate (member_id, class_id) pairs, so "
+            f"uq_classregistration_member_class cannot be created. Remove the extra rows and rerun "
+            f"the migration. Duplicates (member_id, class_id) x copies: {pairs}{more}"
+        )
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        for name, table, columns, unique in INDEXES:
+            op.execute(
+                f"CREATE {'UNIQUE ' if unique else ''}INDEX CONCURRENTLY IF NOT EXISTS {name} "
+                f"ON {table} ({columns})"
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _, _, _ in reversed(INDEXES):
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,44 @@
+"""Add exclusion constraints that forbid overlapping bookings
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Uses btree_gist so room_id/trainer_id equality can be combined with tsrange overlap (&&)
+in one GiST exclusion constraint. Ranges are half-open [start, end), matching the
+start < end AND end > start predicates in the repositories, so back-to-back bookings are allowed.
+Only scheduled PT sessions take part; cancelled/completed rows never block a slot.
+
+Existing overlapping rows make ADD CONSTRAINT fail; resolve them before upgrading.
+Set BOOKING_CONFLICT_MODE=constraint once this revision is applied.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# (name, table, key column, predicate)
+CONSTRAINTS = [
+    ("ex_groupclass_room_overlap", "groupclass", "room_id", None),
+    ("ex_groupclass_trainer_overlap", "groupclass", "trainer_id", None),
+    ("ex_pt_session_room_overlap", "personaltrainingsession", "room_id", "status = 'scheduled'"),
+    ("ex_pt_session_trainer_overlap", "personaltrainingsession", "trainer_id", "status = 'scheduled'"),
+]
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    for name, table, key, predicate in CONSTRAINTS:
+        where = f" WHERE ({predicate})" if predicate else ""
+        op.execute(
+            f"ALTER TABLE {table} ADD CONSTRAINT {name} "
+            f"EXCLUDE USING gist ({key} WITH =, tsrange(start_time, end_time) WITH &&){where}"
+        )
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(CONSTRAINTS):
+        op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {name}")
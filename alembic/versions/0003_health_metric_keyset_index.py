@@ -0,0 +1,30 @@
+"""Add index for newest-first keyset pagination of health metrics
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+GET /api/admin/health-metrics pages through all metrics ordered by (recorded_at, metric_id)
+descending; this index lets every page start with an index seek instead of a sort.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_healthmetric_recorded_metric "
+            "ON healthmetric (recorded_at DESC, metric_id DESC)"
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_healthmetric_recorded_metric")
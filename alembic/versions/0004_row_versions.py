@@ -0,0 +1,40 @@
+"""Add row version columns for conditional GET
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+room, fitnessgoal and traineravailability get a version column that the application bumps on
+every UPDATE (Column.onupdate). The polled list endpoints build their ETag from
+count(*), max(id) and sum(version) over the listed rows, so the check reads at most one page of an
+index range instead of hashing every column. UPDATEs that bypass the application (raw SQL) must
+also set version = version + 1, or clients keep getting 304 for the old rows.
+Also indexes fitnessgoal.member_id, the predicate of the goal list and its ETag.
+Columns and index use IF NOT EXISTS, so the migration is safe on a database where create_all
+(or sql/DB.sql) already created them from the models.
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+TABLES = ["room", "fitnessgoal", "traineravailability"]
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # Constant default: no table rewrite on PostgreSQL 11+
+        op.execute(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1")
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.execute("CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_fitnessgoal_member ON fitnessgoal (member_id)")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_fitnessgoal_member")
+    for table in reversed(TABLES):
+        op.execute(f"ALTER TABLE {table} DROP COLUMN IF EXISTS version")
@@ -0,0 +1,3 @@
+"""
+CLI package - command line entry points for operational tasks (run with python -m app.cli.<name>).
+"""
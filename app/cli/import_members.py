@@ -0,0 +1,52 @@
+"""
+Bulk member import from the command line.
+Loads a CSV file through the same COPY-based path as POST /api/admin/members/import,
+without going through the HTTP upload.
+
+Usage: python -m app.cli.import_members members.csv
+"""
+
+import argparse
+import sys
+import time
+
+import app.model  # Registers all models with Base.metadata
+from app.core.database import SessionLocal
+from app.services import member_service
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Import members from a CSV file (header: name,email[,date_of_birth,gender,phone])")
+    parser.add_argument("csv_file", help="Path to the CSV file ('-' reads stdin)")
+    args = parser.parse_args(argv)
+
+    csv_file = sys.stdin.buffer if args.csv_file == "-" else open(args.csv_file, "rb")
+    db = SessionLocal()
+    start = time.perf_counter()
+    try:
+        result = member_service.import_members_csv(db, csv_file)
+        if not result["success"]:
+            db.rollback()
+            print(f"Import failed: {result['message']}", file=sys.stderr)
+            return 1
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+        if csv_file is not sys.stdin.buffer:
+            csv_file.close()
+
+    elapsed = time.perf_counter() - start
+    print(
+        f"received={result['received']} inserted={result['inserted']} "
+        f"skipped={result['skipped']} invalid={result['invalid']} in {elapsed:.2f}s"
+    )
+    if result["invalid_rows"]:
+        print(f"first invalid rows: {', '.join(map(str, result['invalid_rows']))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
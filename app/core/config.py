@@ -41,13 +41,63 @@ class Settings(BaseSettings):
         return f"postgresql://{user}:{password}@{host}:{port}/{name}"
     
     DATABASE_URL: str = os.getenv("DATABASE_URL") or ""
+
+    # Async driver URL (defaults to DATABASE_URL with the asyncpg driver)
+    def _build_async_database_url(self) -> str:
+        """Build async database URL from DATABASE_URL."""
+        from sqlalchemy.engine import make_url
+        url = make_url(self.DATABASE_URL)
+        async_drivers = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+        backend = url.get_backend_name()
+        url = url.set(drivername=f"{backend}+{async_drivers.get(backend, url.get_driver_name())}")
+        return url.render_as_string(hide_password=False)
+
+    ASYNC_DATABASE_URL: str = os.getenv("ASYNC_DATABASE_URL") or ""
+
+    # Optional read replica for read-only routes (empty = use the primary)
+    READ_DATABASE_URL: str = os.getenv("READ_DATABASE_URL") or ""
+    READ_AFTER_WRITE_STICKY_SECONDS: int = int(os.getenv("READ_AFTER_WRITE_STICKY_SECONDS", "5"))
+
+    # Connection Pool (applies per engine, per worker process)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # Seconds, -1 disables recycling
+    DB_POOL_TIMEOUT: int = int(os.getenv("DB_POOL_TIMEOUT", "30"))  # Seconds to wait for a free connection
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"  # Pessimistic liveness check on checkout
     
     # Application Settings
     ENVIRONMENT: str = os.getenv("ENVIRONMENT", "development")
     APP_HOST: str = os.getenv("APP_HOST", "127.0.0.1")
     APP_PORT: int = int(os.getenv("APP_PORT", "8000"))
     DEBUG: bool = os.getenv("DEBUG", "True").lower() == "true"
+    SQL_ECHO: bool = os.getenv("SQL_ECHO", "False").lower() == "true"  # Log every SQL statement (very noisy)
  
+    # Booking conflict detection: "query" (check-then-insert) or "constraint"
+    # (rely on the exclusion constraints from alembic revision 0002)
+    BOOKING_CONFLICT_MODE: str = os.getenv("BOOKING_CONFLICT_MODE", "query")
+
+    # Query instrumentation (X-DB-Queries / X-DB-Time-ms headers are always on)
+    DB_N_PLUS_ONE_STRICT: bool = os.getenv("DB_N_PLUS_ONE_STRICT", "False").lower() == "true"
+    DB_N_PLUS_ONE_THRESHOLD: int = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", "3"))  # Same statement shape this many times in one request
+
+    # Slow-query log (JSON lines)
+    SLOW_QUERY_MS: float = float(os.getenv("SLOW_QUERY_MS", "200"))  # 0 disables the log
+    SLOW_QUERY_LOG_FILE: str = os.getenv("SLOW_QUERY_LOG_FILE", "")  # Empty = stderr
+    SLOW_QUERY_EXPLAIN: bool = os.getenv("SLOW_QUERY_EXPLAIN", "False").lower() == "true"  # Re-runs sampled slow SELECTs under EXPLAIN ANALYZE
+    SLOW_QUERY_EXPLAIN_SAMPLE_RATE: float = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.1"))
+
+    # In-process cache of Member/Trainer/Room/AdminStaff/Equipment rows by id and email
+    ENTITY_CACHE_SIZE: int = int(os.getenv("ENTITY_CACHE_SIZE", "10000"))  # Entries per worker, 0 disables the cache
+    ENTITY_CACHE_TTL: float = float(os.getenv("ENTITY_CACHE_TTL", "30"))  # Seconds; bounds staleness across workers
+
+    # Query-result cache for filtered list reads (invalidated by per-table write versions)
+    QUERY_CACHE_MAX_BYTES: int = int(os.getenv("QUERY_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))  # Estimated size per worker, 0 disables
+    QUERY_CACHE_TTL: float = float(os.getenv("QUERY_CACHE_TTL", "60"))  # Default seconds; bounds staleness across workers
+    QUERY_CACHE_TTLS: str = os.getenv("QUERY_CACHE_TTLS", "")  # Per-query overrides, e.g. "list_trainers=300,equipment_by_status=0"
+
+    # In-process room/trainer booking calendars for conflict and free-slot checks
+    INTERVAL_INDEX_TTL: float = float(os.getenv("INTERVAL_INDEX_TTL", "60"))  # Seconds before a calendar is reloaded, 0 disables the index
+
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: str = os.getenv("LOG_FILE", "app.log")
@@ -63,3 +113,7 @@ settings = Settings()
 # Build DATABASE_URL if not provided directly
 if not settings.DATABASE_URL:
     settings.DATABASE_URL = settings._build_database_url()
+
+# Build ASYNC_DATABASE_URL if not provided directly
+if not settings.ASYNC_DATABASE_URL:
+    settings.ASYNC_DATABASE_URL = settings._build_async_database_url()
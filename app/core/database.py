@@ -4,30 +4,96 @@ Handles database initialization, connection pooling, and session creation.
 Central point for all database interactions in the application.
 """
 
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
 from app.core.config import settings
+from app.core.pool import InstrumentedQueuePool, InstrumentedAsyncQueuePool
+from app.core.read_routing import prefers_primary, READ_ONLY_SCOPE_KEY
+from app.core.query_stats import instrument_engine
 import logging
 
 logger = logging.getLogger(__name__)
 
+def _pool_options() -> dict:
+    """Pool sizing shared by every engine, taken from Settings."""
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,  # Verify connections before using them
+    }
+
+def _connect_args(url: str) -> dict:
+    """Driver specific connect arguments (SQLite can stand in for a local replica)."""
+    if make_url(url).get_backend_name() == "sqlite":
+        return {"check_same_thread": False}
+    return {"connect_timeout": 10}  # 10 second timeout
+
 # Create database engine with better error handling
 try:
     engine = create_engine(
         settings.DATABASE_URL,
-        pool_pre_ping=True,  # Verify connections before using them
-        echo=settings.DEBUG,  # Log SQL queries in debug mode
-        connect_args={"connect_timeout": 10}  # 10 second timeout
+        poolclass=InstrumentedQueuePool,
+        **_pool_options(),
+        echo=settings.SQL_ECHO,  # Log every SQL query (see SLOW_QUERY_MS for the slow-query log)
+        connect_args=_connect_args(settings.DATABASE_URL)
     )
     logger.info(f"Database engine created for: {settings.DATABASE_HOST}:{settings.DATABASE_PORT}/{settings.DATABASE_NAME}")
 except Exception as e:
     logger.error(f"Failed to create database engine: {e}")
     raise
 
+# Create read replica engine if configured (read-only routes fall back to the primary otherwise)
+read_engine = None
+if settings.READ_DATABASE_URL:
+    try:
+        read_engine = create_engine(
+            settings.READ_DATABASE_URL,
+            poolclass=InstrumentedQueuePool,
+            **_pool_options(),
+            echo=settings.SQL_ECHO,
+            connect_args=_connect_args(settings.READ_DATABASE_URL)
+        )
+        logger.info("Read replica engine created")
+    except Exception as e:
+        logger.error(f"Failed to create read replica engine: {e}")
+        raise
+
+# Create async database engine (used by routes that have moved to the event loop)
+try:
+    async_engine = create_async_engine(
+        settings.ASYNC_DATABASE_URL,
+        poolclass=InstrumentedAsyncQueuePool,
+        **_pool_options(),
+        echo=settings.SQL_ECHO,  # Log every SQL query (see SLOW_QUERY_MS for the slow-query log)
+        connect_args={"timeout": 10}  # 10 second timeout
+    )
+except Exception as e:
+    logger.error(f"Failed to create async database engine: {e}")
+    raise
+
+# Count statements and DB time per request on every engine
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+if read_engine is not None:
+    instrument_engine(read_engine)
+
 # Create SessionLocal class for database sessions
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False so objects returned by a route stay loaded after the request commits
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+# Create ReadSessionLocal class for sessions bound to the replica (or the primary if none)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine or engine)
+
+# Create AsyncSessionLocal class for async database sessions
+# expire_on_commit=False so attribute access after commit never triggers implicit IO
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 
 # Create Base class for declarative models
 Base = declarative_base()
@@ -37,17 +103,68 @@ def get_db():
     """
     Dependency function that yields a database session.
     Used with FastAPI's Depends() to inject database sessions into route handlers.
+
+    The session is the request's unit of work: repositories only flush(), and the
+    transaction is committed once when the route returns (before the response is sent),
+    or rolled back if the route raises.
     """
     db = SessionLocal()
     try:
         yield db
+        db.commit()
     except SQLAlchemyError as e:
         logger.error(f"Database error: {e}")
         db.rollback()
         raise
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
 
+def read_sessionmaker_for(request: Request) -> sessionmaker:
+    """Pick the session factory for a read-only request (replica unless the client wrote recently)."""
+    if read_engine is None or prefers_primary(request):
+        return SessionLocal
+    return ReadSessionLocal
+
+# Dependency to get a read-only database session
+def get_read_db(request: Request):
+    """
+    Dependency for read-only route handlers.
+    Yields a replica session, or a primary session inside the client's read-your-writes window.
+    Also marks the request read-only, so a POSTed query does not pin the client to the primary.
+    """
+    request.scope[READ_ONLY_SCOPE_KEY] = True
+    db = read_sessionmaker_for(request)()
+    try:
+        yield db
+    except SQLAlchemyError as e:
+        logger.error(f"Database error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+# Dependency to get async database session
+async def get_async_db():
+    """
+    Async counterpart of get_db.
+    Yields an AsyncSession so route handlers can await the database on the event loop
+    instead of occupying a worker thread. Commits once when the route returns.
+    """
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+            await db.commit()
+        except SQLAlchemyError as e:
+            logger.error(f"Database error: {e}")
+            await db.rollback()
+            raise
+        except Exception:
+            await db.rollback()
+            raise
+
 # Function to create all tables (useful for initialization)
 def create_tables():
     """Create all tables defined in models."""
@@ -0,0 +1,257 @@
+"""
+Primary-key / email entity cache.
+Keeps detached snapshots of frequently read rows (Member, Trainer, Room, AdminStaff, Equipment)
+in a bounded per-process LRU with a TTL. A hit is merged into the caller's session with
+load=False, so callers get a normal session-bound instance without a SELECT and never share or
+mutate the cached snapshot.
+
+Repositories invalidate an entity when they update or delete it; the invalidation is repeated
+after the transaction commits so a concurrent request cannot re-cache the pre-commit row.
+Every row a session flushes is tracked the same way and invalidated again on commit or rollback,
+and a session with uncommitted changes never fills the cache, so rolled-back data is not served.
+The cache is per worker process: other workers see a change after at most ENTITY_CACHE_TTL seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Set, Tuple, Type
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import read_engine
+
+_PENDING_KEY = "entity_cache_invalidate"
+
+
+class EntityCache:
+    """Thread-safe LRU + TTL map of cache key -> detached ORM snapshot."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        # key -> (expires at, snapshot, (model, primary key))
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any, Tuple[type, Any]]]" = OrderedDict()
+        # (model, primary key) -> every key (id and email) holding that entity
+        self._aliases: Dict[Tuple[type, Any], Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.maxsize > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the snapshot for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, snapshot: Any, identity: Tuple[type, Any]):
+        """Store a snapshot under key; identity (model, pk) groups keys for invalidation."""
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl, snapshot, identity)
+            self._aliases.setdefault(identity, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, model: type, pk: Any):
+        """Drop every cached key (id and email) of one entity."""
+        with self._lock:
+            keys = self._aliases.pop((model, pk), None)
+            if keys:
+                for key in keys:
+                    self._entries.pop(key, None)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _drop(self, key: Hashable):
+        _, _, identity = self._entries.pop(key)
+        keys = self._aliases.get(identity)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._aliases[identity]
+
+
+entity_cache = EntityCache(settings.ENTITY_CACHE_SIZE, settings.ENTITY_CACHE_TTL)
+
+
+def snapshot(instance: Any) -> Any:
+    """Detached copy of an instance's column attributes (relationships are left unloaded)."""
+    mapper = inspect(instance).mapper
+    copy = mapper.class_(**{attr.key: getattr(instance, attr.key) for attr in mapper.column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def _identity(instance: Any) -> Tuple[type, Any]:
+    state = inspect(instance)
+    pk = state.identity
+    return state.mapper.class_, pk[0] if len(pk) == 1 else pk
+
+
+def _cacheable_session(db) -> bool:
+    """
+    Only cache rows read from the primary (replica rows may lag behind an invalidation), and only
+    from a session without uncommitted changes (its rows may still be rolled back).
+    """
+    session = db if isinstance(db, Session) else db.sync_session
+    if session.info.get(_PENDING_KEY) or session.new or session.dirty or session.deleted:
+        return False
+    return read_engine is None or session.get_bind() is not read_engine
+
+
+def _in_session(db, cached: Any) -> Optional[Any]:
+    """Instance already present in the session for the snapshot's identity (it may carry unflushed changes)."""
+    identity_map = db.identity_map if isinstance(db, Session) else db.sync_session.identity_map
+    return identity_map.get(inspect(cached).key)
+
+
+def attach(db: Session, cached: Any) -> Any:
+    """Session-bound instance for a cached snapshot, without a SELECT (the snapshot itself stays detached)."""
+    return _in_session(db, cached) or db.merge(cached, load=False)
+
+
+def _remember(key: Hashable, instance: Any):
+    entity_cache.put(key, snapshot(instance), _identity(instance))
+
+
+def get_by_id(db: Session, model: Type, pk: Any):
+    """Session.get() through the cache."""
+    if not entity_cache.enabled:
+        return db.get(model, pk)
+    key = (model, None, pk)
+    cached = entity_cache.get(key)
+    if cached is not None:
+        return attach(db, cached)
+    instance = db.get(model, pk)
+    if instance is not None and _cacheable_session(db):
+        _remember(key, instance)
+    return instance
+
+
+def get_fields_by_id(db: Session, model: Type, pk: Any, columns: Sequence):
+    """
+    Some columns of one row (sparse fieldsets): the cached entity on a hit, otherwise a
+    column-only SELECT that returns a Row (partial rows are not cached).
+    """
+    if entity_cache.enabled:
+        cached = entity_cache.get((model, None, pk))
+        if cached is not None:
+            return attach(db, cached)
+    return db.execute(select(*columns).where(inspect(model).primary_key[0] == pk)).first()
+
+
+def get_by_attr(db: Session, model: Type, attr: str, value: Any, load: Callable[[], Any]):
+    """Unique-attribute lookup (e.g. email) through the cache; `load` runs the query on a miss."""
+    if not entity_cache.enabled:
+        return load()
+    key = (model, attr, value)
+    cached = entity_cache.get(key)
+    if cached is not None:
+        return attach(db, cached)
+    instance = load()
+    if instance is not None and _cacheable_session(db):
+        _remember(key, instance)
+    return instance
+
+
+async def get_by_id_async(db: AsyncSession, model: Type, pk: Any):
+    """AsyncSession.get() through the cache."""
+    if not entity_cache.enabled:
+        return await db.get(model, pk)
+    key = (model, None, pk)
+    cached = entity_cache.get(key)
+    if cached is not None:
+        return _in_session(db, cached) or await db.merge(cached, load=False)
+    instance = await db.get(model, pk)
+    if instance is not None and _cacheable_session(db):
+        _remember(key, instance)
+    return instance
+
+
+async def get_by_attr_async(db: AsyncSession, model: Type, attr: str, value: Any, load: Callable):
+    """Unique-attribute lookup through the cache (async); `load` is a coroutine function run on a miss."""
+    if not entity_cache.enabled:
+        return await load()
+    key = (model, attr, value)
+    cached = entity_cache.get(key)
+    if cached is not None:
+        return _in_session(db, cached) or await db.merge(cached, load=False)
+    instance = await load()
+    if instance is not None and _cacheable_session(db):
+        _remember(key, instance)
+    return instance
+
+
+def invalidate(db: Session, instance: Any):
+    """Forget an entity that is being updated or deleted (again after commit, see module docstring)."""
+    identity = _identity(instance)
+    entity_cache.invalidate(*identity)
+    db.info.setdefault(_PENDING_KEY, set()).add(identity)
+
+
+@event.listens_for(Session, "after_flush")
+def _invalidate_flushed(session: Session, flush_context):
+    # Every written row, including direct attribute changes and relationship cascades (e.g. a
+    # room's equipment) that never pass through the repositories' invalidate calls
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        state = inspect(instance)
+        if state.key is not None:
+            invalidate(session, instance)
+        else:
+            _track_new(session, state)
+
+
+def _track_new(session: Session, state):
+    # Fresh INSERTs get their identity key only after this hook; build it from the primary key
+    pk = state.mapper.primary_key_from_instance(state.obj())
+    session.info.setdefault(_PENDING_KEY, set()).add((state.mapper.class_, pk[0] if len(pk) == 1 else tuple(pk)))
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session):
+    for identity in session.info.pop(_PENDING_KEY, ()):
+        entity_cache.invalidate(*identity)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _invalidate_after_rollback(session: Session, previous_transaction):
+    # Anything cached from the rolled-back transaction (e.g. by another path) must not outlive it
+    for identity in session.info.pop(_PENDING_KEY, ()):
+        entity_cache.invalidate(*identity)
@@ -0,0 +1,102 @@
+"""
+Conditional GET support (ETag / If-None-Match) for endpoints that clients poll.
+Single resources are versioned by hashing the entity's column values (usually already in the
+entity cache, so no query). Lists are versioned by an aggregate the database computes over the
+same rows the endpoint would return (count, max primary key and the sum of the per-row version
+columns), so three numbers cross the wire and nothing is loaded into the ORM. A matching
+If-None-Match short-circuits with 304 before the response model runs; a miss costs that aggregate
+plus the normal list query.
+
+List versions live in the database, so every worker computes the same ETag for the same rows.
+Single-resource ETags hash the entity cache's copy, which is per process: another worker may
+serve the old ETag (and body) for up to ENTITY_CACHE_TTL seconds after a change. Writes that bypass the ORM (raw SQL,
+bulk Core updates) must bump `version` themselves, or clients keep getting 304.
+The tables carry no updated_at column, so Last-Modified is not emitted.
+"""
+
+import hashlib
+from typing import Optional, Sequence
+
+from fastapi import Request, Response
+from sqlalchemy import Select, func, inspect, select
+from sqlalchemy.orm import Session
+
+# Clients must revalidate every time, but may keep the body to reuse on 304
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """Build a weak ETag from a resource name and version parts."""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def row_etag(name: str, instance, fields: Optional[Sequence[str]] = None) -> str:
+    """
+    ETag for a single ORM row, from its mapped column values.
+
+    Parameters :
+        name     : Resource name (keeps versions of different endpoints apart)
+        instance : Loaded ORM instance (or a Core row when fields are given)
+        fields   : Only version these attributes (sparse fieldsets)
+    Returns :
+        etag     : Weak ETag
+    """
+    if fields is None:
+        fields = [attr.key for attr in inspect(instance).mapper.column_attrs]
+    values = tuple(getattr(instance, name) for name in fields)
+    return make_etag(name, tuple(fields), values)
+
+
+def rows_etag(db: Session, name: str, stmt: Select, key_column, version_column) -> str:
+    """
+    ETag for the rows `stmt` selects: count(*), max(key) and sum(version) in one aggregate query.
+
+    An insert raises max(key) (keys are never reused), a delete lowers the count and every update
+    bumps the row's version column, so any change through the ORM yields a new ETag. The aggregate
+    reads the same index range as the list itself, in the same order on every dialect.
+
+    Parameters :
+        db             : Database session
+        name           : Resource name (keeps versions of different endpoints apart)
+        stmt           : The select() the endpoint returns (including filters, order and limit)
+        key_column     : Primary key column of the listed entity
+        version_column : Version column bumped on update (see alembic 0004)
+    Returns :
+        etag           : Weak ETag
+    """
+    sub = stmt.subquery()
+    key, version = sub.c[key_column.name], sub.c[version_column.name]
+    count, max_key, versions = db.execute(
+        select(func.count(), func.max(key), func.sum(version)).select_from(sub)
+    ).one()
+    return make_etag(name, count, max_key, versions)
+
+
+def if_none_match(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already names `etag` (weak comparison)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in header.split(","))
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Answer a conditional GET.
+
+    Parameters :
+        request  : Incoming request
+        response : Response the route will return on a miss (gets the ETag headers)
+        etag     : Current version of the resource
+    Returns :
+        A bare 304 response if the client's copy is current, otherwise None
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if if_none_match(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
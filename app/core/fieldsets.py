@@ -0,0 +1,63 @@
+"""
+Sparse fieldsets (?fields=name,member_id) for list and detail endpoints.
+The requested names are checked against the response schema, the response model is narrowed to
+them (one generated model per schema and field set, cached), and the repositories select only the
+matching columns, so both the query and the payload shrink.
+"""
+
+from functools import lru_cache
+from typing import Optional, Sequence, Tuple, Type
+
+from fastapi import HTTPException, Query
+from pydantic import BaseModel, ConfigDict, create_model
+
+# Shared declaration of the ?fields= query parameter
+FIELDS_QUERY = Query(None, description="Comma-separated response fields to return, e.g. name,member_id (default: all)")
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Validate a ?fields= value against a response schema.
+
+    Parameters :
+        fields : Comma-separated field names (None or empty for all fields)
+        schema : Full response model
+    Returns :
+        Field names in schema order, or None when every field was asked for
+    """
+    if not fields:
+        return None
+    wanted = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = wanted - schema.model_fields.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown field(s): {', '.join(sorted(unknown))}")
+    selected = tuple(name for name in schema.model_fields if name in wanted)
+    if not selected or len(selected) == len(schema.model_fields):
+        return None
+    return selected
+
+
+@lru_cache(maxsize=256)
+def sparse_model(schema: Type[BaseModel], fields: Optional[Tuple[str, ...]]) -> Type[BaseModel]:
+    """The response schema narrowed to `fields` (the schema itself when fields is None)."""
+    if fields is None:
+        return schema
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields}
+    )
+
+
+def columns(model: type, fields: Sequence[str], *always: str) -> list:
+    """
+    Mapped columns to select for a field set.
+
+    Parameters :
+        model  : ORM model
+        fields : Requested field names (from parse_fields)
+        always : Columns needed regardless, e.g. the keyset pagination key
+    Returns :
+        List of column attributes, without duplicates
+    """
+    return [getattr(model, name) for name in dict.fromkeys((*always, *fields))]
@@ -0,0 +1,374 @@
+"""
+In-process interval index of room and trainer bookings.
+For every room and trainer that is asked about, the group classes and scheduled PT sessions are
+loaded once (through the caller's session connection, see _load) into a calendar: an array sorted by
+start time. Overlap, "what is booked between X and Y" and free-slot questions are then answered
+with a binary search and a short scan, without a database round-trip.
+
+The index follows this process's writes: bookings flushed in a session are visible to that
+session right away, and applied to the shared calendars when the session commits (dropped on
+rollback). Writes from other worker processes are picked up when a calendar expires after
+INTERVAL_INDEX_TTL seconds, so a "free" answer can be stale; booking writes confirm it with the
+SQL probe, and the exclusion constraints (alembic 0002) stay the final arbiter at insert time.
+
+Intervals are half-open [start, end), like the SQL overlap predicates. Booking times are stored
+as naive timestamps; timezone-aware query bounds are converted to naive UTC.
+"""
+
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.database import engine, read_engine
+from app.model.group_class import GroupClass
+from app.model.personal_training_session import PersonalTrainingSession
+
+ROOM = "room"
+TRAINER = "trainer"
+
+CLASS = "class"
+SESSION = "session"
+
+_PENDING_KEY = "interval_index_pending"
+_DML_KEY = "interval_index_dml"
+
+
+class Booking(NamedTuple):
+    """One booked interval in a room or trainer calendar."""
+    start: datetime
+    end: datetime
+    kind: str               # CLASS or SESSION
+    id: int                 # class_id or session_id
+    label: Optional[str]    # class name (None for PT sessions)
+
+
+def naive_utc(value: datetime) -> datetime:
+    """Bring a query bound to the convention of the (naive) booking columns."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def free_windows(bookings: Iterable, start: datetime, end: datetime, min_length: timedelta = timedelta(0)) -> List[Tuple[datetime, datetime]]:
+    """
+    Complement of a set of bookings within [start, end).
+
+    Parameters :
+        bookings   : (start, end, ...) tuples such as Booking, sorted by start
+        start      : Window start (naive, like the booking columns)
+        end        : Window end
+        min_length : Shortest gap worth returning
+    Returns :
+        Free (start, end) gaps in time order; overlapping and adjacent bookings are merged
+    """
+    gaps = []
+    cursor = start
+    for booking_start, booking_end, *_ in bookings:
+        if booking_start >= end:
+            break
+        if booking_start > cursor and booking_start - cursor >= min_length:
+            gaps.append((cursor, booking_start))
+        cursor = max(cursor, booking_end)
+    if end > cursor and end - cursor >= min_length:
+        gaps.append((cursor, end))
+    return gaps
+
+
+def merge_windows(windows: Iterable) -> List[Tuple[datetime, datetime]]:
+    """Union of (start, end, ...) windows sorted by start; overlapping and back-to-back windows become one."""
+    merged = []
+    for window_start, window_end, *_ in windows:
+        if merged and window_start <= merged[-1][1]:
+            if window_end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], window_end)
+        else:
+            merged.append((window_start, window_end))
+    return merged
+
+
+def covers(windows: Iterable, start: datetime, end: datetime) -> bool:
+    """True when the union of (start, end, ...) windows sorted by start contains all of [start, end)."""
+    return any(window_start <= start and window_end >= end for window_start, window_end in merge_windows(windows))
+
+
+def _placement(instance) -> Tuple[Tuple[str, int], Optional[Tuple[Tuple[str, int], ...]], Optional[Booking]]:
+    """Identity, calendar keys and interval of a GroupClass / PersonalTrainingSession (None once it no longer blocks time)."""
+    start, end = naive_utc(instance.start_time), naive_utc(instance.end_time)
+    if isinstance(instance, GroupClass):
+        identity = (CLASS, instance.class_id)
+        booking = Booking(start, end, CLASS, instance.class_id, instance.class_name)
+    else:
+        identity = (SESSION, instance.session_id)
+        if instance.status != "scheduled":
+            return identity, None, None
+        booking = Booking(start, end, SESSION, instance.session_id, None)
+    return identity, ((ROOM, instance.room_id), (TRAINER, instance.trainer_id)), booking
+
+
+class Calendar:
+    """Bookings of one room or trainer, sorted by start time."""
+
+    __slots__ = ("starts", "bookings", "max_length", "expires_at")
+
+    def __init__(self, bookings: Iterable[Booking], expires_at: float):
+        self.bookings: List[Booking] = sorted(bookings)
+        self.starts: List[datetime] = [b.start for b in self.bookings]
+        # Longest booking seen; bounds how far back an overlapping booking can start
+        self.max_length = max((b.end - b.start for b in self.bookings), default=timedelta(0))
+        self.expires_at = expires_at
+
+    def add(self, booking: Booking):
+        i = bisect_right(self.starts, booking.start)
+        self.starts.insert(i, booking.start)
+        self.bookings.insert(i, booking)
+        self.max_length = max(self.max_length, booking.end - booking.start)
+
+    def remove(self, kind: str, id: int, start: datetime):
+        """Remove a booking, found by its start time (falls back to a scan if the start is off)."""
+        i = bisect_left(self.starts, start)
+        while i < len(self.bookings) and self.starts[i] == start:
+            if self.bookings[i].kind == kind and self.bookings[i].id == id:
+                del self.starts[i], self.bookings[i]
+                return
+            i += 1
+        for i, booking in enumerate(self.bookings):
+            if booking.kind == kind and booking.id == id:
+                del self.starts[i], self.bookings[i]
+                return
+
+    def overlapping(self, start: datetime, end: datetime) -> List[Booking]:
+        """Bookings with start < end and end > start, in start order."""
+        lo = bisect_right(self.starts, start - self.max_length)
+        hi = bisect_left(self.starts, end)
+        return [b for b in self.bookings[lo:hi] if b.end > start]
+
+
+class IntervalIndex:
+    """Per-process room and trainer calendars with lazy loading and write-through updates."""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._calendars: Dict[Tuple[str, int], Calendar] = {}
+        # Calendars each booking is filed under (with its start there), to move or drop it on change
+        self._filed: Dict[Tuple[str, int], Dict[Tuple[str, int], datetime]] = defaultdict(dict)
+        # Bumped on every change to a calendar key; a load that raced a change is not installed
+        self._generation: Dict[Tuple[str, int], int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def consult(self, dimension: str, key: int, confirm: bool) -> bool:
+        """
+        Whether a conflict check should ask the index. Read-only checks (confirm=False) always do.
+        Booking writes re-check a free answer in SQL anyway, so they only use a calendar that is
+        already loaded (to reject a clash early) and never pay for loading one.
+        """
+        if not self.enabled:
+            return False
+        if not confirm:
+            return True
+        with self._lock:
+            calendar = self._calendars.get((dimension, key))
+            return calendar is not None and calendar.expires_at > time.monotonic()
+
+    # ---- queries ---------------------------------------------------------
+
+    def overlapping(self, db: Session, dimension: str, key: int, start: datetime, end: datetime, kinds: Iterable[str] = (CLASS, SESSION)) -> List[Booking]:
+        """
+        Bookings of a room or trainer that overlap [start, end).
+
+        Parameters :
+            db        : Caller's session (its flushed, uncommitted bookings are included)
+            dimension : ROOM or TRAINER
+            key       : room_id or trainer_id
+            start     : Interval start
+            end       : Interval end
+            kinds     : Booking kinds to consider (CLASS, SESSION)
+        Returns :
+            Overlapping bookings in start order
+        """
+        start, end = naive_utc(start), naive_utc(end)
+        kinds = set(kinds)
+        calendar = self._calendar(db, (dimension, key))
+        with self._lock:
+            found = calendar.overlapping(start, end)
+        pending = db.info.get(_PENDING_KEY)
+        if pending:
+            # This session's own changes win over the shared calendar
+            found = [b for b in found if (b.kind, b.id) not in pending]
+            for keys, booking in pending.values():
+                if booking is not None and (dimension, key) in keys and booking.start < end and booking.end > start:
+                    found.append(booking)
+            found.sort()
+        return [b for b in found if b.kind in kinds]
+
+    def first_overlap(self, db: Session, dimension: str, key: int, start: datetime, end: datetime, kinds: Iterable[str] = (CLASS, SESSION)) -> Optional[Booking]:
+        """First booking overlapping [start, end), or None if the slot is free."""
+        found = self.overlapping(db, dimension, key, start, end, kinds)
+        return found[0] if found else None
+
+    def free_slots(self, db: Session, dimension: str, key: int, start: datetime, end: datetime, min_length: timedelta = timedelta(0)) -> List[Tuple[datetime, datetime]]:
+        """Gaps of at least `min_length` between the bookings in [start, end)."""
+        start, end = naive_utc(start), naive_utc(end)
+        return free_windows(self.overlapping(db, dimension, key, start, end), start, end, min_length)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "calendars": len(self._calendars),
+                "bookings": sum(len(c.bookings) for c in self._calendars.values()),
+                "hits": self.hits,
+                "loads": self.loads,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._calendars.clear()
+            self._filed.clear()
+            for calendar_key in list(self._generation):
+                self._generation[calendar_key] += 1
+
+    # ---- loading ---------------------------------------------------------
+
+    def _calendar(self, db, calendar_key: Tuple[str, int]) -> Calendar:
+        with self._lock:
+            calendar = self._calendars.get(calendar_key)
+            if calendar is not None and calendar.expires_at > time.monotonic():
+                self.hits += 1
+                return calendar
+            generation = self._generation[calendar_key]
+        bookings, shareable = _load(db, *calendar_key)
+        calendar = Calendar(bookings, time.monotonic() + self.ttl)
+        with self._lock:
+            self.loads += 1
+            # Skip caching a load that may have missed a change committed while it ran, or that
+            # saw this session's uncommitted writes (used for this lookup only)
+            if shareable and self._generation[calendar_key] == generation:
+                self._drop(calendar_key)
+                self._calendars[calendar_key] = calendar
+                for booking in calendar.bookings:
+                    self._filed[(booking.kind, booking.id)][calendar_key] = booking.start
+        return calendar
+
+    def _drop(self, calendar_key: Tuple[str, int]):
+        calendar = self._calendars.pop(calendar_key, None)
+        if calendar is not None:
+            for booking in calendar.bookings:
+                self._filed[(booking.kind, booking.id)].pop(calendar_key, None)
+
+    # ---- write-through ---------------------------------------------------
+
+    def apply(self, changes: Dict[Tuple[str, int], Tuple[Tuple[Tuple[str, int], ...], Optional[Booking]]]):
+        """File committed changes: identity -> (calendar keys, booking or None when it was removed)."""
+        with self._lock:
+            for (kind, id), (keys, booking) in changes.items():
+                for calendar_key, start in self._filed.pop((kind, id), {}).items():
+                    calendar = self._calendars.get(calendar_key)
+                    if calendar is not None:
+                        calendar.remove(kind, id, start)
+                    self._generation[calendar_key] += 1
+                for calendar_key in keys:
+                    self._generation[calendar_key] += 1
+                    calendar = self._calendars.get(calendar_key)
+                    if booking is not None and calendar is not None:
+                        calendar.add(booking)
+                        self._filed[(kind, id)][calendar_key] = booking.start
+
+    def invalidate(self, calendar_keys: Iterable[Tuple[str, int]]):
+        """Forget calendars so they are reloaded on next use."""
+        with self._lock:
+            for calendar_key in calendar_keys:
+                self._generation[calendar_key] += 1
+                self._drop(calendar_key)
+
+
+def _load(db, dimension: str, key: int) -> Tuple[List[Booking], bool]:
+    """
+    Bookings of one room or trainer, and whether they may go into the shared index.
+
+    A sync session on the primary loads through its own connection: taking a second pooled
+    connection while the request holds one can exhaust the pool under concurrent requests. The
+    rows are then only shared when the session has no uncommitted booking writes. Async and
+    replica sessions cannot lend their connection and read committed rows from the primary
+    engine instead (a different pool from the one they hold, so they cannot starve each other).
+    """
+    if isinstance(db, AsyncSession) or db.get_bind() is read_engine:
+        with engine.connect() as conn:
+            return _select_bookings(conn, dimension, key), True
+    shareable = not (db.info.get(_PENDING_KEY) or db.info.get(_DML_KEY))
+    return _select_bookings(db.connection(), dimension, key), shareable
+
+
+def _select_bookings(conn, dimension: str, key: int) -> List[Booking]:
+    class_column = GroupClass.room_id if dimension == ROOM else GroupClass.trainer_id
+    session_column = PersonalTrainingSession.room_id if dimension == ROOM else PersonalTrainingSession.trainer_id
+    classes = conn.execute(
+        select(GroupClass.start_time, GroupClass.end_time, GroupClass.class_id, GroupClass.class_name)
+        .where(class_column == key)
+    ).all()
+    sessions = conn.execute(
+        select(PersonalTrainingSession.start_time, PersonalTrainingSession.end_time, PersonalTrainingSession.session_id)
+        .where(session_column == key, PersonalTrainingSession.status == "scheduled")
+    ).all()
+    return [Booking(s, e, CLASS, i, name) for s, e, i, name in classes] + [Booking(s, e, SESSION, i, None) for s, e, i in sessions]
+
+
+interval_index = IntervalIndex(settings.INTERVAL_INDEX_TTL)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_after_flush(session: Session, flush_context):
+    pending = None
+    for instance in list(session.new) + list(session.dirty):
+        if isinstance(instance, (GroupClass, PersonalTrainingSession)):
+            identity, keys, booking = _placement(instance)
+            pending = pending if pending is not None else session.info.setdefault(_PENDING_KEY, {})
+            pending[identity] = (keys or (), booking)
+    for instance in session.deleted:
+        if isinstance(instance, (GroupClass, PersonalTrainingSession)):
+            identity, _, _ = _placement(instance)
+            pending = pending if pending is not None else session.info.setdefault(_PENDING_KEY, {})
+            pending[identity] = ((), None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _clear_on_dml(orm_execute_state):
+    # Bulk UPDATE/DELETE bypass the flush; just reload everything
+    if orm_execute_state.is_update or orm_execute_state.is_delete or orm_execute_state.is_insert:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None and table.name in (GroupClass.__tablename__, PersonalTrainingSession.__tablename__):
+            interval_index.clear()
+            # Calendars loaded through this session now see uncommitted rows
+            orm_execute_state.session.info[_DML_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_after_commit(session: Session):
+    if session.info.pop(_DML_KEY, None):
+        interval_index.clear()
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        interval_index.apply(pending)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _drop_after_rollback(session: Session, previous_transaction):
+    if session.info.pop(_DML_KEY, None):
+        interval_index.clear()
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        # A savepoint rollback may leave earlier flushes of the outer transaction in place; reload those calendars
+        interval_index.invalidate({calendar_key for keys, _ in pending.values() for calendar_key in keys})
@@ -0,0 +1,76 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+Pages are ordered by a unique key (the primary key, or a timestamp plus the primary key) and
+the next page starts strictly after the last key of the previous one, so deep pages cost the same
+as the first and rows do not shift between calls. The key is handed to clients as an opaque
+token in the X-Next-Cursor header and comes back as ?cursor=.
+OFFSET (skip) keeps working for older clients, now over the same stable ordering.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    """Pack key values into an opaque URL-safe token."""
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def parse_cursor(cursor: Optional[str], *types: type) -> Optional[Tuple]:
+    """
+    Decode a ?cursor= token back into key values.
+
+    Parameters :
+        cursor : Token from X-Next-Cursor (None for the first page)
+        types  : Expected type of each key value (int or datetime)
+    Returns :
+        Tuple of key values, or None when no cursor was given
+    """
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("wrong number of key values")
+        return tuple(datetime.fromisoformat(v) if t is datetime else t(v) for t, v in zip(types, values))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(stmt: Select, key_columns: Sequence, after: Optional[Tuple] = None, skip: int = 0, limit: int = 100, descending: bool = False) -> Select:
+    """
+    Order a select() by its key and cut out one page.
+
+    Parameters :
+        stmt        : select() to paginate
+        key_columns : Columns forming a unique key, most significant first
+        after       : Key of the last row of the previous page (from parse_cursor)
+        skip        : OFFSET, only used when no cursor is given
+        limit       : Page size
+        descending  : Walk the key from newest to oldest
+    Returns :
+        stmt        : Paginated select()
+    """
+    stmt = stmt.order_by(*[column.desc() if descending else column for column in key_columns])
+    if after is not None:
+        key = tuple_(*key_columns) if len(key_columns) > 1 else key_columns[0]
+        value = tuple_(*after) if len(key_columns) > 1 else after[0]
+        stmt = stmt.where(key < value if descending else key > value)
+    elif skip:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+def set_next_cursor(response: Response, rows: Sequence, limit: int, *key_attrs: str):
+    """Advertise the cursor for the next page when this page came back full."""
+    if rows and len(rows) == limit:
+        last = rows[-1]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*(getattr(last, attr) for attr in key_attrs))
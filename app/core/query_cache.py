@@ -0,0 +1,266 @@
+"""
+Query-result cache for filtered list reads.
+Results are keyed on the compiled SQL plus its parameters and tagged with the version of every
+table the statement reads. Each table has a version counter that is bumped whenever this process
+writes to it: ORM flushes (after_flush) and Core INSERT/UPDATE/DELETE run through a Session
+(do_orm_execute). A cached result whose table versions moved on is discarded on the next lookup.
+The written tables are bumped again when the transaction commits or rolls back, and a session
+never caches a result over tables it has uncommitted writes to, so rolled-back rows are not served.
+
+Rows are stored as detached snapshots and merged into the caller's session on a hit (see
+entity_cache.attach); Core column rows (cached_rows) are immutable and stored as they are. The cache is bounded by an estimate of its memory use, and each cached
+query has a name whose TTL can be overridden with QUERY_CACHE_TTLS (0 turns that query off).
+Writes from other worker processes are only seen after the TTL expires.
+"""
+
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from sqlalchemy import Select, event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.util import find_tables
+
+from app.core.config import settings
+from app.core.database import read_engine
+from app.core.entity_cache import snapshot, attach
+
+_PENDING_KEY = "query_cache_tables"
+
+
+def _parse_ttls(raw: str) -> Dict[str, float]:
+    """Parse "name=seconds,name=seconds" overrides."""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in raw.split(","))):
+        name, _, seconds = item.partition("=")
+        ttls[name.strip()] = float(seconds)
+    return ttls
+
+
+class TableVersions:
+    """Per-table write counters (and when each table was last written)."""
+
+    def __init__(self):
+        self._versions: Dict[str, int] = defaultdict(int)
+        self._written_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def bump(self, tables):
+        with self._lock:
+            now = time.monotonic()
+            for table in tables:
+                self._versions[table] += 1
+                self._written_at[table] = now
+
+    def snapshot(self, tables) -> Tuple[Tuple[str, int], ...]:
+        return tuple((table, self._versions[table]) for table in sorted(tables))
+
+    def current(self, versions: Tuple[Tuple[str, int], ...]) -> bool:
+        return all(self._versions[table] == version for table, version in versions)
+
+    def written_within(self, tables, seconds: float) -> bool:
+        cutoff = time.monotonic() - seconds
+        return any(self._written_at.get(table, 0) > cutoff for table in tables)
+
+
+class QueryCache:
+    """Thread-safe LRU of query results, bounded by estimated bytes."""
+
+    def __init__(self, max_bytes: int, default_ttl: float, ttls: Dict[str, float]):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.ttls = ttls
+        self.versions = TableVersions()
+        # key -> (expires at, table versions, rows, estimated bytes)
+        self._entries: "OrderedDict[Hashable, Tuple[float, tuple, List[Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits: Dict[str, int] = defaultdict(int)
+        self.misses: Dict[str, int] = defaultdict(int)
+        self.evictions = 0
+        self.stale = 0
+
+    def ttl_for(self, name: str, ttl: Optional[float]) -> float:
+        if self.max_bytes <= 0:
+            return 0
+        if name in self.ttls:
+            return self.ttls[name]
+        return self.default_ttl if ttl is None else ttl
+
+    def get(self, name: str, key: Hashable) -> Optional[List[Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= time.monotonic() and self.versions.current(entry[1]):
+                self._entries.move_to_end(key)
+                self.hits[name] += 1
+                return entry[2]
+            if entry is not None:
+                self._drop(key)
+                self.stale += 1
+            self.misses[name] += 1
+            return None
+
+    def put(self, key: Hashable, versions: tuple, rows: List[Any], ttl: float):
+        size = _estimate_bytes(rows)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, versions, rows, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.max_bytes > 0,
+            "entries": len(self._entries),
+            "estimated_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": dict(self.hits),
+            "misses": dict(self.misses),
+            "stale": self.stale,
+            "evictions": self.evictions,
+        }
+
+    def _drop(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[3]
+
+
+def _estimate_bytes(rows: List[Any]) -> int:
+    """Rough memory estimate: instance + attribute dict + attribute values (or the tuple's values for Core rows)."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        values = getattr(row, "__dict__", None)
+        if values is None:
+            size += sys.getsizeof(row) + sum(sys.getsizeof(v) for v in row)
+        else:
+            size += sys.getsizeof(row) + sys.getsizeof(values) + sum(sys.getsizeof(v) for v in values.values())
+    return size
+
+
+query_cache = QueryCache(settings.QUERY_CACHE_MAX_BYTES, settings.QUERY_CACHE_TTL, _parse_ttls(settings.QUERY_CACHE_TTLS))
+
+
+def _cached(db: Session, name: str, stmt: Select, ttl: Optional[float], fetch, store, load) -> List[Any]:
+    """Shared lookup for cached_scalars/cached_rows; store/load convert rows to and from their cached form."""
+    ttl = query_cache.ttl_for(name, ttl)
+    if ttl <= 0:
+        return fetch(stmt)
+
+    bind = db.get_bind()
+    compiled = stmt.compile(dialect=bind.dialect)
+    params = tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in compiled.params.items()))
+    # ORM entities and Core rows of the same SELECT compile alike; keep them apart
+    key = (fetch.__name__, compiled.string, params)
+    tables = {table.name for table in find_tables(stmt, check_columns=True)}
+
+    rows = query_cache.get(name, key)
+    if rows is not None:
+        return load(rows)
+
+    versions = query_cache.versions.snapshot(tables)
+    result = fetch(stmt)
+    # Our own uncommitted writes may still be rolled back; a lagging replica could hand back
+    # rows from before a write this process just made
+    if tables & db.info.get(_PENDING_KEY, set()):
+        return result
+    if read_engine is None or bind is not read_engine or not query_cache.versions.written_within(
+        tables, settings.READ_AFTER_WRITE_STICKY_SECONDS
+    ):
+        query_cache.put(key, versions, store(result), ttl)
+    return result
+
+
+def cached_scalars(db: Session, name: str, stmt: Select, ttl: Optional[float] = None) -> List[Any]:
+    """
+    db.scalars(stmt).all() through the query cache.
+
+    Parameters :
+        db   : Database session
+        name : Cache name of the calling repository function (stats, QUERY_CACHE_TTLS overrides)
+        stmt : select() of a single ORM entity
+        ttl  : Seconds to keep the result (None = QUERY_CACHE_TTL)
+    Returns :
+        List of session-bound instances
+    """
+    def scalars(stmt):
+        return db.scalars(stmt).all()
+
+    return _cached(
+        db, name, stmt, ttl, scalars,
+        store=lambda result: [snapshot(row) for row in result],
+        load=lambda rows: [attach(db, row) for row in rows]
+    )
+
+
+def cached_rows(db: Session, name: str, stmt: Select, ttl: Optional[float] = None) -> List[Any]:
+    """
+    db.execute(stmt).all() through the query cache, for Core column selects.
+    Rows are immutable tuples, so they are cached and handed out as they are.
+
+    Parameters :
+        db   : Database session
+        name : Cache name of the calling repository function (stats, QUERY_CACHE_TTLS overrides)
+        stmt : select() of columns
+        ttl  : Seconds to keep the result (None = QUERY_CACHE_TTL)
+    Returns :
+        List of Row objects
+    """
+    def rows(stmt):
+        return db.execute(stmt).all()
+
+    return _cached(db, name, stmt, ttl, rows, store=list, load=list)
+
+
+def _written_tables(session: Session):
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        mapper = getattr(instance, "__mapper__", None)
+        if mapper is not None:
+            yield from (table.name for table in mapper.tables)
+
+
+def _mark_written(session: Session, tables):
+    tables = set(tables)
+    if tables:
+        query_cache.versions.bump(tables)
+        session.info.setdefault(_PENDING_KEY, set()).update(tables)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_after_flush(session: Session, flush_context):
+    _mark_written(session, _written_tables(session))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bump_on_dml(orm_execute_state):
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = getattr(orm_execute_state.statement, "table", None)
+        if table is not None:
+            _mark_written(orm_execute_state.session, [table.name])
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_after_commit(session: Session):
+    # Results cached by other requests between our flush and commit saw the old rows
+    tables = session.info.pop(_PENDING_KEY, None)
+    if tables:
+        query_cache.versions.bump(tables)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _bump_after_rollback(session: Session, previous_transaction):
+    # Drop anything cached while the rolled-back writes were visible
+    tables = session.info.pop(_PENDING_KEY, None)
+    if tables:
+        query_cache.versions.bump(tables)
@@ -0,0 +1,137 @@
+"""
+Per-request SQL instrumentation.
+Counts statements and database time for the current request using cursor execute events,
+and reports them in the X-DB-Queries / X-DB-Time-ms response headers.
+Streamed responses get no headers: their queries run after the headers are sent.
+Every statement is also handed to the slow-query log.
+In strict mode, repeated identical statement shapes within one request are flagged as N+1 patterns.
+"""
+
+import logging
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional, Dict
+
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+from app.core import slow_query_log
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalize a DBAPI statement (parameters are already placeholders) for grouping."""
+    return _WHITESPACE.sub(" ", statement).strip()
+
+
+class RequestQueryStats:
+    """SQL statement counters for a single request."""
+
+    __slots__ = ("count", "total_ms", "shapes", "scope", "streamed")
+
+    def __init__(self, scope: Optional[dict] = None):
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.scope = scope
+        self.streamed = False
+
+    @property
+    def route(self) -> Optional[str]:
+        """Method and route template of the request (the router fills in scope["route"])."""
+        if self.scope is None:
+            return None
+        route = self.scope.get("route")
+        return f"{self.scope.get('method')} {getattr(route, 'path', None) or self.scope.get('path')}"
+
+    def record(self, shape: str, elapsed_ms: float):
+        """Record one executed statement."""
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.shapes[shape] += 1
+
+    def repeated_shapes(self, threshold: int) -> Dict[str, int]:
+        """Statement shapes executed at least `threshold` times (likely N+1 patterns)."""
+        return {shape: n for shape, n in self.shapes.items() if n >= threshold}
+
+
+# Stats for the request currently being handled (None outside a request)
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    """Return the stats object bound to the current request, if any."""
+    return _current_stats.get()
+
+
+def mark_streamed():
+    """Flag the current request's body as streamed, so no (incomplete) X-DB-* headers are sent."""
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.streamed = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed_ms = (time.perf_counter() - conn.info["query_start_time"].pop()) * 1000
+    shape = statement_shape(statement)
+    stats = _current_stats.get()
+    if stats is not None:
+        stats.record(shape, elapsed_ms)
+    slow_query_log.record_statement(
+        conn, statement, parameters, context, executemany, elapsed_ms, shape,
+        stats.route if stats is not None else None
+    )
+
+
+def _handle_error(exception_context):
+    # Failed statements never reach after_cursor_execute; drop their start time
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_start_time"):
+        conn.info["query_start_time"].pop()
+
+
+def instrument_engine(engine: Engine):
+    """
+    Attach the statement counters to an engine.
+
+    Parameters :
+        engine : Sync engine (pass async_engine.sync_engine for async engines)
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+async def query_stats_middleware(request: Request, call_next):
+    """Bind a fresh RequestQueryStats to the request and report it in response headers."""
+    stats = RequestQueryStats(request.scope)
+    token = _current_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        _current_stats.reset(token)
+
+    if stats.streamed:
+        return response
+
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time-ms"] = f"{stats.total_ms:.2f}"
+
+    if settings.DB_N_PLUS_ONE_STRICT:
+        repeated = stats.repeated_shapes(settings.DB_N_PLUS_ONE_THRESHOLD)
+        if repeated:
+            response.headers["X-DB-N-Plus-One"] = str(len(repeated))
+            for shape, n in repeated.items():
+                logger.warning(f"Possible N+1 on {request.method} {request.url.path}: {n}x {shape}")
+    return response
@@ -0,0 +1,50 @@
+"""
+Read-replica routing helpers.
+Decides whether a read-only request may use the replica or must stay on the primary.
+After a client writes, it is pinned to the primary for a short window (read-your-writes).
+"""
+
+import time
+from fastapi import Request
+from app.core.config import settings
+
+# Cookie (browsers) and header (API clients) carrying the sticky-primary deadline
+PRIMARY_STICKY_COOKIE = "db_primary_until"
+PRIMARY_STICKY_HEADER = "X-DB-Primary-Until"
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Set in the ASGI scope by get_read_db: the route only reads, whatever its method (e.g. a POSTed query)
+READ_ONLY_SCOPE_KEY = "db_read_only"
+
+
+def prefers_primary(request: Request) -> bool:
+    """
+    Check if this client wrote recently and must read from the primary.
+
+    Parameters :
+        request : Incoming request
+    Returns :
+        True if the sticky-primary deadline has not passed yet
+    """
+    value = request.headers.get(PRIMARY_STICKY_HEADER) or request.cookies.get(PRIMARY_STICKY_COOKIE)
+    if not value:
+        return False
+    try:
+        return float(value) > time.time()
+    except ValueError:
+        return False
+
+
+async def read_your_writes_middleware(request: Request, call_next):
+    """Pin clients to the primary for READ_AFTER_WRITE_STICKY_SECONDS after a successful write."""
+    response = await call_next(request)
+    if (
+        settings.READ_DATABASE_URL and request.method in WRITE_METHODS and response.status_code < 400
+        and not request.scope.get(READ_ONLY_SCOPE_KEY)
+    ):
+        window = settings.READ_AFTER_WRITE_STICKY_SECONDS
+        until = f"{time.time() + window:.3f}"
+        response.headers[PRIMARY_STICKY_HEADER] = until
+        response.set_cookie(PRIMARY_STICKY_COOKIE, until, max_age=window, httponly=True, samesite="lax")
+    return response
@@ -0,0 +1,89 @@
+"""
+Fast JSON serialization for list responses.
+FastAPI's response_model path validates every ORM row into a model (Decimal validation is
+particularly slow), dumps the models to Python primitives and JSON-encodes those in a second pass.
+For large lists the routes hand their rows to `json_list` instead. Rows coming out of typed columns
+need no re-validation, so their values are read straight from the loaded ORM state (or from Core
+column rows, see the repositories' *_rows functions) and written as JSON bytes by a precomputed
+pydantic-core TypeAdapter over a TypedDict with the schema's fields.
+The serializers are the ones the schema itself uses, so the body is identical to response_model
+output. The route keeps response_model for the OpenAPI schema.
+
+Only for flat response schemas (no nested models, validators or aliases).
+"""
+
+from functools import lru_cache
+from operator import itemgetter
+from typing import List, Optional, Sequence, Type, Tuple
+
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Row
+from typing_extensions import TypedDict
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=None)
+def _row_type(schema: Type[BaseModel]) -> type:
+    """TypedDict with the schema's fields."""
+    return TypedDict(f"{schema.__name__}Row", {name: field.annotation for name, field in schema.model_fields.items()})
+
+
+@lru_cache(maxsize=None)
+def list_adapter(schema: Type[BaseModel]) -> Tuple[TypeAdapter, Tuple[str, ...]]:
+    """TypeAdapter for a list of `schema`-shaped dicts and the field names, built once per schema."""
+    return TypeAdapter(List[_row_type(schema)]), tuple(schema.model_fields)
+
+
+@lru_cache(maxsize=None)
+def object_adapter(schema: Type[BaseModel]) -> TypeAdapter:
+    """TypeAdapter for a single `schema`-shaped dict, built once per schema."""
+    return TypeAdapter(_row_type(schema))
+
+
+def _values(row, fields: Sequence[str]) -> dict:
+    """The schema's fields of an ORM instance or Core row."""
+    # Loaded column values live in the instance dict; fall back to getattr for anything else
+    loaded = getattr(row, "__dict__", {})
+    return {name: loaded[name] if name in loaded else getattr(row, name) for name in fields}
+
+
+def dump_list(rows: Sequence, schema: Type[BaseModel]) -> bytes:
+    """Encode ORM instances or Core rows as a JSON array of `schema` objects."""
+    adapter, fields = list_adapter(schema)
+    if rows and isinstance(rows[0], Row) and len(fields) > 1 and set(fields) <= set(rows[0]._fields):
+        # Core rows: pick the columns in schema order (the serializer keeps the dict's key order)
+        pick = itemgetter(*(rows[0]._fields.index(name) for name in fields))
+        return adapter.dump_json([dict(zip(fields, pick(row))) for row in rows])
+    return adapter.dump_json([_values(row, fields) for row in rows])
+
+
+def _with_headers(out: Response, response: Optional[Response]) -> Response:
+    """Carry headers set on the route's injected Response over to `out`."""
+    if response is not None:
+        out.raw_headers.extend(
+            (name, value) for name, value in response.raw_headers if name != b"content-length"
+        )
+    return out
+
+
+def json_list(rows: Sequence, schema: Type[BaseModel], response: Response = None) -> Response:
+    """
+    Serialize a list of ORM rows straight to a JSON response.
+
+    Parameters :
+        rows     : ORM instances or Core rows (anything with the schema's attributes)
+        schema   : Pydantic response model for one row
+        response : The route's injected Response; headers set on it (X-Next-Cursor, ETag)
+                   are carried over, since FastAPI ignores it once a Response is returned
+    Returns :
+        Response with the encoded body
+    """
+    return _with_headers(Response(content=dump_list(rows, schema), media_type=JSON_MEDIA_TYPE), response)
+
+
+def json_object(row, schema: Type[BaseModel], response: Response = None) -> Response:
+    """Serialize one ORM instance or Core row straight to a JSON response (see json_list)."""
+    body = object_adapter(schema).dump_json(_values(row, tuple(schema.model_fields)))
+    return _with_headers(Response(content=body, media_type=JSON_MEDIA_TYPE), response)
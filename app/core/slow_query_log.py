@@ -0,0 +1,105 @@
+"""
+Slow-query log.
+Writes one JSON line per statement slower than SLOW_QUERY_MS with the normalized SQL,
+parameters and the route that issued it.
+Optionally captures EXPLAIN (ANALYZE, BUFFERS) for a sample of slow SELECT statements (PostgreSQL only).
+"""
+
+import json
+import logging
+import random
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.core.config import settings
+
+# Dedicated logger so the JSON lines are not mixed with application log formatting
+slow_query_logger = logging.getLogger("app.slow_query")
+
+
+def _configure_logger():
+    """Send slow-query records to SLOW_QUERY_LOG_FILE (or stderr) as bare JSON lines."""
+    if slow_query_logger.handlers:
+        return
+    if settings.SLOW_QUERY_LOG_FILE:
+        handler = logging.FileHandler(settings.SLOW_QUERY_LOG_FILE)
+    else:
+        handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    slow_query_logger.addHandler(handler)
+    slow_query_logger.setLevel(logging.INFO)
+    slow_query_logger.propagate = False
+
+_configure_logger()
+
+
+def _loggable_parameters(parameters, executemany: bool):
+    """Keep executemany batches short in the log."""
+    if executemany and isinstance(parameters, (list, tuple)):
+        return {"batch_size": len(parameters), "first": parameters[:3]}
+    return parameters
+
+
+def _explain(conn, statement: str, parameters) -> Optional[object]:
+    """
+    Run EXPLAIN (ANALYZE, BUFFERS) for a statement on the same connection.
+    Uses a raw DBAPI cursor (so it is not instrumented itself) inside a savepoint,
+    so a failing EXPLAIN cannot abort the caller's transaction.
+    """
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT slow_query_explain")
+        try:
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, parameters)
+            plan = cursor.fetchone()[0]
+            cursor.execute("RELEASE SAVEPOINT slow_query_explain")
+            return plan
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT slow_query_explain")
+            return {"error": str(e)}
+    finally:
+        cursor.close()
+
+
+def _should_explain(conn, statement: str, context, executemany: bool) -> bool:
+    """Only sampled, single-row-set SELECTs on PostgreSQL without an open server-side cursor."""
+    if not settings.SLOW_QUERY_EXPLAIN or executemany:
+        return False
+    if conn.dialect.name != "postgresql":
+        return False
+    if not statement.lstrip().upper().startswith("SELECT"):
+        return False
+    if context is not None and getattr(context, "_is_server_side", False):
+        return False
+    return random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE
+
+
+def record_statement(conn, statement: str, parameters, context, executemany: bool, elapsed_ms: float, shape: str, route: Optional[str]):
+    """
+    Log a statement if it exceeded the slow-query threshold.
+
+    Parameters :
+        conn        : SQLAlchemy connection that ran the statement
+        statement   : DBAPI statement text
+        parameters  : DBAPI parameters
+        context     : Execution context (may be None)
+        executemany : True for executemany batches
+        elapsed_ms  : Measured duration in milliseconds
+        shape       : Normalized statement text
+        route       : Route that issued the statement, if inside a request
+    """
+    if settings.SLOW_QUERY_MS <= 0 or elapsed_ms < settings.SLOW_QUERY_MS:
+        return
+
+    record = {
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "event": "slow_query",
+        "duration_ms": round(elapsed_ms, 3),
+        "route": route,
+        "statement": shape,
+        "parameters": _loggable_parameters(parameters, executemany),
+    }
+    if _should_explain(conn, statement, context, executemany):
+        record["explain"] = _explain(conn, statement, parameters)
+
+    slow_query_logger.info(json.dumps(record, default=str))
@@ -0,0 +1,60 @@
+"""
+NDJSON streaming for unbounded list endpoints.
+Clients opt in with `Accept: application/x-ndjson`. Rows are fetched through a server-side cursor
+(yield_per) and written out one JSON object per line as each batch arrives, so memory stays flat
+and time-to-first-byte does not grow with the size of the result.
+"""
+
+from typing import Iterator, Type
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from app.core.database import read_sessionmaker_for
+from app.core.query_stats import mark_streamed
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Rows fetched from the server-side cursor (and serialized) per round-trip
+STREAM_BATCH_SIZE = 500
+
+# OpenAPI `responses` entry for routes that can stream
+NDJSON_RESPONSES = {200: {"content": {NDJSON_MEDIA_TYPE: {}}, "description": "One JSON object per line when requested via Accept"}}
+
+
+def wants_ndjson(request: Request) -> bool:
+    """True if the client asked for NDJSON in the Accept header."""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def stream_ndjson(request: Request, statement: Select, schema: Type[BaseModel], batch_size: int = STREAM_BATCH_SIZE) -> StreamingResponse:
+    """
+    Stream the ORM rows selected by `statement` as NDJSON, serialized with `schema`.
+
+    The rows are read with a session of their own: the route's dependency session is closed
+    before the response body is sent, while this one lives as long as the stream. Its queries
+    run after the headers are sent, so the response carries no X-DB-Queries / X-DB-Time-ms.
+
+    Parameters :
+        request    : Incoming request (decides replica vs primary like get_read_db)
+        statement  : select() of a single ORM entity
+        schema     : Response schema with from_attributes enabled
+        batch_size : Rows per server-side cursor fetch
+    Returns :
+        StreamingResponse with media type application/x-ndjson
+    """
+    session_factory = read_sessionmaker_for(request)
+    mark_streamed()
+
+    def lines() -> Iterator[str]:
+        db = session_factory()
+        try:
+            result = db.scalars(statement.execution_options(yield_per=batch_size))
+            for batch in result.partitions():
+                yield "".join(schema.model_validate(row).model_dump_json() + "\n" for row in batch)
+        finally:
+            db.close()
+
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
@@ -4,13 +4,20 @@ Junction table linking members to group classes (many-to-many relationship).
 Tracks when members register for classes to manage enrollment.
 """
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class ClassRegistration(Base):
     __tablename__ = "classregistration"
+    __table_args__ = (
+        # Capacity counts by class; a member can register for a class only once (see alembic 0001)
+        Index("ix_classregistration_class", "class_id"),
+        Index("uq_classregistration_member_class", "member_id", "class_id", unique=True),
+    )
+    # Fetch server defaults with RETURNING at flush time instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     registration_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     member_id = Column(Integer, ForeignKey("member.member_id"), nullable=False)
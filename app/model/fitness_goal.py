@@ -5,13 +5,19 @@ Links goals to members and tracks whether goals are currently active.
 Stores target values and creation timestamps for progress tracking.
 """
 
-from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Date, Boolean, DateTime
+from sqlalchemy import Column, Integer, String, Numeric, ForeignKey, Date, Boolean, DateTime, Index, literal_column
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class FitnessGoal(Base):
     __tablename__ = "fitnessgoal"
+    __table_args__ = (
+        # Goal lists and their ETag aggregate filter on the member (see alembic 0004)
+        Index("ix_fitnessgoal_member", "member_id"),
+    )
+    # Fetch server defaults with RETURNING at flush time instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     goal_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     member_id = Column(Integer, ForeignKey("member.member_id"), nullable=False)
@@ -23,5 +29,8 @@ class FitnessGoal(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    # Bumped by every update; list ETags are built from count, max id and the sum of versions (see app.core.etag)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
+
     # Relationships
     member = relationship("Member", back_populates="fitness_goals")
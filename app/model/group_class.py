@@ -4,12 +4,17 @@ Represents fitness classes with name, instructor (trainer), room assignment, and
 Tracks class capacity for enrollment management.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class GroupClass(Base):
     __tablename__ = "groupclass"
+    __table_args__ = (
+        # Room and trainer conflict checks filter on these (see alembic 0001)
+        Index("ix_groupclass_room_time", "room_id", "start_time", "end_time"),
+        Index("ix_groupclass_trainer_start", "trainer_id", "start_time"),
+    )
 
     class_id = Column(Integer, primary_key=True, index=True)
 
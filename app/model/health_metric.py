@@ -5,13 +5,15 @@ Each entry is timestamped and never overwritten, maintaining a complete history.
 Enables tracking of member progress over time.
 """
 
-from sqlalchemy import Column, Integer, Numeric, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, Numeric, ForeignKey, DateTime, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class HealthMetric(Base):
     __tablename__ = "healthmetric"
+    # Fetch server defaults with RETURNING at flush time instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     metric_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     member_id = Column(Integer, ForeignKey("member.member_id"), nullable=False)
@@ -22,5 +24,12 @@ class HealthMetric(Base):
     
     recorded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
+    # Member history is always read newest first (see alembic 0001)
+    __table_args__ = (
+        Index("ix_healthmetric_member_recorded", member_id, recorded_at.desc()),
+        # Global newest-first keyset pagination (see alembic 0003)
+        Index("ix_healthmetric_recorded_metric", recorded_at.desc(), metric_id.desc()),
+    )
+
     # Relationships
     member = relationship("Member", back_populates="health_metrics")
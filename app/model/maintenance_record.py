@@ -4,7 +4,7 @@ Tracks equipment maintenance issues and repair status.
 Links to equipment, records problem descriptions, timestamps, and resolution status.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, TIMESTAMP
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, TIMESTAMP, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -12,6 +12,11 @@ from app.core.database import Base
 class MaintenanceRecord(Base):
     #Table
     __tablename__ = "maintenancerecord"
+    __table_args__ = (
+        Index("ix_maintenancerecord_status", "status"),
+    )
+    #Fetch server defaults with RETURNING at flush time instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     #Attributes
     maintenance_id = Column(Integer, primary_key=True, autoincrement=True)
@@ -11,6 +11,8 @@ from app.core.database import Base
 
 class Member(Base):
     __tablename__ = "member"
+    # Fetch server defaults with RETURNING at flush time instead of a refresh SELECT
+    __mapper_args__ = {"eager_defaults": True}
 
     member_id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     name = Column(String(100), nullable=False)
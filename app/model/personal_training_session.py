@@ -4,12 +4,17 @@ Represents one-on-one training sessions between a member and trainer.
 Tracks session scheduling, room assignment, time slots, and status (scheduled/cancelled/completed).
 """
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, String, Index
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class PersonalTrainingSession(Base):
     __tablename__ = "personaltrainingsession"
+    __table_args__ = (
+        # Room and trainer conflict checks filter on these (see alembic 0001)
+        Index("ix_pt_session_room_status_start", "room_id", "status", "start_time"),
+        Index("ix_pt_session_trainer_status_start", "trainer_id", "status", "start_time"),
+    )
 
     session_id = Column(Integer, primary_key=True, index=True)
 
@@ -4,7 +4,7 @@ Represents physical spaces in the gym facility.
 Stores room details (name, location, capacity) for booking and scheduling purposes.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, literal_column
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -19,6 +19,9 @@ class Room(Base):
     capacity = Column(Integer, nullable=True)  # Can be NULL per DB schema
     admin_id = Column(Integer, ForeignKey('adminstaff.admin_id'), nullable=True)  #FK to admin
 
+    # Bumped by every update; list ETags are built from count, max id and the sum of versions (see app.core.etag)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
+
     #Relationships
     #N rooms belong to 1 admin
     admin = relationship("AdminStaff", back_populates="rooms")
@@ -4,12 +4,15 @@ Stores time windows when trainers are available for sessions or classes.
 Prevents scheduling conflicts by defining available time slots.
 """
 
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index, literal_column
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
 class TrainerAvailability(Base):
     __tablename__ = "traineravailability"
+    __table_args__ = (
+        Index("ix_traineravailability_trainer_start", "trainer_id", "start_time"),
+    )
 
     availability_id = Column(Integer, primary_key=True, index=True)
 
@@ -20,5 +23,8 @@ class TrainerAvailability(Base):
     start_time = Column(DateTime, nullable=False)
     end_time = Column(DateTime, nullable=False)
 
+    # Bumped by every update; list ETags are built from count, max id and the sum of versions (see app.core.etag)
+    version = Column(Integer, nullable=False, default=1, server_default="1", onupdate=literal_column("version + 1"))
+
     # Relationships
     trainer = relationship("Trainer", back_populates="availabilities")
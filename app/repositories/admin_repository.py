@@ -3,9 +3,16 @@ Admin repository - data access layer for AdminStaff entities.
 Handles database operations for administrative staff.
 Manages admin user data and authentication.
 """
+from sqlalchemy import select, bindparam
 from sqlalchemy.orm import Session
+from app.core.pagination import keyset
+from app.core.fieldsets import columns
+from app.core import entity_cache
 from app.model.admin_staff import AdminStaff
-from typing import Optional, List
+from typing import Optional, List, Sequence
+
+#Prebuilt statement for the hot email lookup (built once, served from the compiled SQL cache)
+_admin_by_email = select(AdminStaff).where(AdminStaff.email == bindparam("email"))
 
 def create_admin(db: Session, name:str, email:str, role:str) -> AdminStaff:
     """
@@ -25,8 +32,7 @@ def create_admin(db: Session, name:str, email:str, role:str) -> AdminStaff:
         role = role
     )
     db.add(admin)       #add to database
-    db.commit()         #save changes to database
-    db.refresh(admin)   #re-load database with updates
+    db.flush()          #write changes (committed at end of request)
     return admin
 
 def get_admin_by_id(db: Session, id: int) -> Optional[AdminStaff]:
@@ -39,10 +45,24 @@ def get_admin_by_id(db: Session, id: int) -> Optional[AdminStaff]:
     Returns :
         admin    : AdminStaff object with matching id or none if nothing found
     """
-    #Filter for admin staff where the ids match (first returns the first match or none)
-    admin = db.query(AdminStaff).filter(AdminStaff.admin_id == id).first()
+    #Primary key lookup (session identity map, then the entity cache, then the database)
+    admin = entity_cache.get_by_id(db, AdminStaff, id)
     return admin
 
+def get_admin_fields_by_id(db: Session, id: int, fields: Sequence[str]):
+    """
+    Get only some columns of an admin (sparse fieldsets)
+
+    Parameters :
+        db     : Database session
+        id     : Admin ID
+        fields : Column names to return
+    Returns :
+        admin  : Cached AdminStaff object, a Row with just those columns, or None if nothing found
+    """
+    #Entity cache hit if there is one, otherwise a column-only select
+    return entity_cache.get_fields_by_id(db, AdminStaff, id, columns(AdminStaff, fields))
+
 def get_admin_by_email(db: Session, email: str) -> Optional[AdminStaff]:
     """
     Get admin by email (for logins and authentication)
@@ -54,10 +74,12 @@ def get_admin_by_email(db: Session, email: str) -> Optional[AdminStaff]:
         admin : AdminStaff object with matching email or none if nothing found 
     """
     #Filter for admin staff where the emails match (first returns the first match or none)
-    admin = db.query(AdminStaff).filter(AdminStaff.email == email).first()
+    admin = entity_cache.get_by_attr(
+        db, AdminStaff, "email", email, lambda: db.scalars(_admin_by_email, {"email": email}).first()
+    )
     return admin
 
-def get_all_admins(db: Session, skip: int = 0, limit: int = 100) -> List[AdminStaff]:
+def get_all_admins(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None, fields: Optional[Sequence[str]] = None) -> List[AdminStaff]:
     """
     Get all admins with pagination
 
@@ -65,11 +87,16 @@ def get_all_admins(db: Session, skip: int = 0, limit: int = 100) -> List[AdminSt
         db     : Database session
         skip   : Num of records to skip
         limit  : Maximum records to return
+        after  : Key of the last row of the previous page (keyset pagination)
+        fields : Only select these columns (sparse fieldsets)
     Returns :
-        admins : List of AdminStaff objects
+        admins : List of AdminStaff objects (Rows of the selected columns when fields are given)
     """
+    #Select just the requested columns (plus the pagination key)
+    if fields:
+        return db.execute(keyset(select(*columns(AdminStaff, fields, "admin_id")), [AdminStaff.admin_id], after, skip, limit)).all()
     #Get every admin object
-    admins = db.query(AdminStaff).offset(skip).limit(limit).all()
+    admins = db.scalars(keyset(select(AdminStaff), [AdminStaff.admin_id], after, skip, limit)).all()
     return admins
 
 def update_admin(db: Session, id: int, name: Optional[str] = None, email: Optional[str] = None, role: Optional[str] = None) -> Optional[AdminStaff]:
@@ -98,8 +125,8 @@ def update_admin(db: Session, id: int, name: Optional[str] = None, email: Option
     if role is not None:
         admin.role = role
     
-    db.commit()             #save changes to database
-    db.refresh(admin)       #re-load database with updates
+    entity_cache.invalidate(db, admin)   #drop cached copies (id and email)
+    db.flush()              #write changes (committed at end of request)
     return admin
 
 def delete_admin(db: Session, id: int) -> bool:
@@ -117,6 +144,7 @@ def delete_admin(db: Session, id: int) -> bool:
     if not admin:
         return False
     
+    entity_cache.invalidate(db, admin)   #drop cached copies (id and email)
     db.delete(admin)    #delete admin from database
-    db.commit()         #save changes to database
+    db.flush()          #write changes (committed at end of request)
     return True
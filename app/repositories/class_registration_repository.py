@@ -4,50 +4,55 @@ Handles member enrollment in group classes.
 Manages registration creation, cancellation, and capacity checks.
 """
 
+from sqlalchemy import select, func, bindparam
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.model.class_registration import ClassRegistration
 from app.model.group_class import GroupClass
 from typing import Optional, List
 
+# Prebuilt statements for the class registration hot path (built once, served from the compiled SQL cache)
+_registration_by_member_and_class = select(ClassRegistration).where(
+    ClassRegistration.member_id == bindparam("member_id"),
+    ClassRegistration.class_id == bindparam("class_id")
+)
+_registration_count_by_class = select(func.count()).select_from(ClassRegistration).where(
+    ClassRegistration.class_id == bindparam("class_id")
+)
+
 def create_registration(db: Session, registration: ClassRegistration) -> ClassRegistration:
     """Create a new class registration."""
     db.add(registration)
-    db.commit()
-    db.refresh(registration)
+    db.flush()
     return registration
 
 def get_registration_by_id(db: Session, registration_id: int) -> Optional[ClassRegistration]:
     """Get registration by ID."""
-    return db.query(ClassRegistration).filter(
-        ClassRegistration.registration_id == registration_id
-    ).first()
+    return db.get(ClassRegistration, registration_id)
 
 def get_registrations_by_member(db: Session, member_id: int) -> List[ClassRegistration]:
     """Get all class registrations for a member."""
-    return db.query(ClassRegistration).filter(
-        ClassRegistration.member_id == member_id
+    return db.scalars(
+        select(ClassRegistration).where(ClassRegistration.member_id == member_id)
     ).all()
 
 def get_registrations_by_class(db: Session, class_id: int) -> List[ClassRegistration]:
     """Get all registrations for a specific class."""
-    return db.query(ClassRegistration).filter(
-        ClassRegistration.class_id == class_id
+    return db.scalars(
+        select(ClassRegistration).where(ClassRegistration.class_id == class_id)
     ).all()
 
 def get_registration_by_member_and_class(
     db: Session, member_id: int, class_id: int
 ) -> Optional[ClassRegistration]:
     """Check if a member is already registered for a class."""
-    return db.query(ClassRegistration).filter(
-        ClassRegistration.member_id == member_id,
-        ClassRegistration.class_id == class_id
+    return db.scalars(
+        _registration_by_member_and_class, {"member_id": member_id, "class_id": class_id}
     ).first()
 
 def get_class_registration_count(db: Session, class_id: int) -> int:
     """Get the number of registrations for a class (for capacity checking)."""
-    return db.query(ClassRegistration).filter(
-        ClassRegistration.class_id == class_id
-    ).count()
+    return db.scalar(_registration_count_by_class, {"class_id": class_id})
 
 def delete_registration(db: Session, registration_id: int) -> bool:
     """Cancel/delete a class registration."""
@@ -56,7 +61,7 @@ def delete_registration(db: Session, registration_id: int) -> bool:
         return False
     
     db.delete(registration)
-    db.commit()
+    db.flush()
     return True
 
 def delete_registration_by_member_and_class(
@@ -68,5 +73,35 @@ def delete_registration_by_member_and_class(
         return False
     
     db.delete(registration)
-    db.commit()
+    db.flush()
     return True
+
+# -----------------------------
+# ASYNC VARIANTS
+# -----------------------------
+
+async def create_registration_async(db: AsyncSession, registration: ClassRegistration) -> ClassRegistration:
+    """Create a new class registration (async)."""
+    db.add(registration)
+    await db.flush()
+    return registration
+
+async def get_registrations_by_member_async(db: AsyncSession, member_id: int) -> List[ClassRegistration]:
+    """Get all class registrations for a member (async)."""
+    result = await db.scalars(
+        select(ClassRegistration).where(ClassRegistration.member_id == member_id)
+    )
+    return list(result.all())
+
+async def get_registration_by_member_and_class_async(
+    db: AsyncSession, member_id: int, class_id: int
+) -> Optional[ClassRegistration]:
+    """Check if a member is already registered for a class (async)."""
+    result = await db.scalars(
+        _registration_by_member_and_class, {"member_id": member_id, "class_id": class_id}
+    )
+    return result.first()
+
+async def get_class_registration_count_async(db: AsyncSession, class_id: int) -> int:
+    """Get the number of registrations for a class (async)."""
+    return await db.scalar(_registration_count_by_class, {"class_id": class_id})
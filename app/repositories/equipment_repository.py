@@ -3,7 +3,11 @@ Equipment repository - data access layer for Equipment entities.
 Handles equipment data operations and status management.
 Queries equipment by room, status, or equipment ID.
 """
+from sqlalchemy import select, Select, Row
 from sqlalchemy.orm import Session
+from app.core.pagination import keyset
+from app.core import entity_cache
+from app.core.query_cache import cached_scalars
 from app.model.equipment import Equipment
 from typing import Optional, List
 
@@ -25,8 +29,7 @@ def create_equipment(db: Session, room_id: int, name: str, status: str = "workin
         status = status
     )
     db.add(equipment)       #add to database
-    db.commit()             #save changes to database
-    db.refresh(equipment)   #re-load database with updates
+    db.flush()              #write changes (committed at end of request)
     return equipment
 
 def get_equipment_by_id(db: Session, equipment_id: int) -> Optional[Equipment]:
@@ -39,8 +42,8 @@ def get_equipment_by_id(db: Session, equipment_id: int) -> Optional[Equipment]:
     Returns :
         equipment    : Equipment object with matching id or none if nothing found
     """
-    #Filter for equipment where the equipment_ids match (first returns the first match or none)
-    equipment = db.query(Equipment).filter(Equipment.equipment_id == equipment_id).first()
+    #Primary key lookup (session identity map, then the entity cache, then the database)
+    equipment = entity_cache.get_by_id(db, Equipment, equipment_id)
     return equipment
 
 def get_equipment_by_room(db: Session, room_id: int) -> List[Equipment]:
@@ -54,7 +57,7 @@ def get_equipment_by_room(db: Session, room_id: int) -> List[Equipment]:
         equipment : List of Equipment objects in that room
     """
     #Filter through ALL equipment in a specific room
-    equipment = db.query(Equipment).filter(Equipment.room_id == room_id).all()
+    equipment = db.scalars(select(Equipment).where(Equipment.room_id == room_id)).all()
     return equipment
 
 def get_equipment_by_status(db: Session, status: str) -> List[Equipment]:
@@ -67,11 +70,22 @@ def get_equipment_by_status(db: Session, status: str) -> List[Equipment]:
     Returns :
         equipment : List of Equipment objects with that status
     """
-    #Filter through ALL equipment with a specific status
-    equipment = db.query(Equipment).filter(Equipment.status == status).all()
+    #Filter through ALL equipment with a specific status (cached until equipment is written)
+    equipment = cached_scalars(db, "equipment_by_status", equipment_by_status_stmt(status))
     return equipment
 
-def get_all_equipment(db: Session, skip: int = 0, limit: int = 100) -> List[Equipment]:
+def equipment_by_status_stmt(status: str) -> Select:
+    """
+    Build the query for equipment with a given status (shared by list and NDJSON streaming)
+
+    Parameters :
+        status : Equipment status to filter by
+    Returns :
+        stmt   : select() of Equipment
+    """
+    return select(Equipment).where(Equipment.status == status)
+
+def get_all_equipment(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> List[Equipment]:
     """
     Get all equipment with pagination
 
@@ -79,13 +93,29 @@ def get_all_equipment(db: Session, skip: int = 0, limit: int = 100) -> List[Equi
         db        : Database session
         skip      : Num of records to skip
         limit     : Maximum records to return
+        after    : Key of the last row of the previous page (keyset pagination)
     Returns :
         equipment : list of Equipment objects
     """
     #Get every equipment object
-    equipment = db.query(Equipment).offset(skip).limit(limit).all()
+    equipment = db.scalars(keyset(select(Equipment), [Equipment.equipment_id], after, skip, limit)).all()
     return equipment
 
+def get_all_equipment_rows(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> List[Row]:
+    """
+    Read-only version of get_all_equipment for listings: selects the columns with Core and
+    returns plain rows, skipping ORM instances and the identity map
+
+    Parameters :
+        db        : Database session
+        skip      : Num of records to skip
+        limit     : Maximum records to return
+        after     : Key of the last row of the previous page (keyset pagination)
+    Returns :
+        rows      : list of Row tuples (attribute access by column name)
+    """
+    return db.execute(keyset(select(*Equipment.__table__.c), [Equipment.equipment_id], after, skip, limit)).all()
+
 def update_equipment(db: Session, equipment_id: int, name: Optional[str] = None, status: Optional[str] = None, room_id: Optional[int] = None) -> Optional[Equipment]:
     """
     Update equipment information
@@ -112,8 +142,8 @@ def update_equipment(db: Session, equipment_id: int, name: Optional[str] = None,
     if room_id is not None:
         equipment.room_id = room_id
     
-    db.commit()             #save changes to database
-    db.refresh(equipment)   #re-load database with updates
+    entity_cache.invalidate(db, equipment)   #drop cached copy
+    db.flush()              #write changes (committed at end of request)
     return equipment
 
 def delete_equipment(db: Session, equipment_id: int) -> bool:
@@ -131,8 +161,9 @@ def delete_equipment(db: Session, equipment_id: int) -> bool:
     if not equipment:
         return False
     
+    entity_cache.invalidate(db, equipment)   #drop cached copy
     db.delete(equipment)    #delete equipment from database
-    db.commit()             #save changes to database
+    db.flush()              #write changes (committed at end of request)
     return True
 
 
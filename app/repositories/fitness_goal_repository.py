@@ -4,7 +4,9 @@ Handles CRUD operations for member fitness goals.
 Queries active goals, goals by member, and goal history.
 """
 
+from sqlalchemy import select, Select
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.model.fitness_goal import FitnessGoal
 from typing import Optional, List
 from datetime import date
@@ -12,20 +14,23 @@ from datetime import date
 def create_fitness_goal(db: Session, goal: FitnessGoal) -> FitnessGoal:
     """Create a new fitness goal."""
     db.add(goal)
-    db.commit()
-    db.refresh(goal)
+    db.flush()
     return goal
 
 def get_goal_by_id(db: Session, goal_id: int) -> Optional[FitnessGoal]:
     """Get fitness goal by ID."""
-    return db.query(FitnessGoal).filter(FitnessGoal.goal_id == goal_id).first()
+    return db.get(FitnessGoal, goal_id)
 
 def get_goals_by_member(db: Session, member_id: int, active_only: bool = False) -> List[FitnessGoal]:
     """Get all fitness goals for a member."""
-    query = db.query(FitnessGoal).filter(FitnessGoal.member_id == member_id)
+    return db.scalars(goals_by_member_stmt(member_id, active_only)).all()
+
+def goals_by_member_stmt(member_id: int, active_only: bool = False) -> Select:
+    """Query for a member's fitness goals, newest first (shared by the list and its ETag version)."""
+    stmt = select(FitnessGoal).where(FitnessGoal.member_id == member_id)
     if active_only:
-        query = query.filter(FitnessGoal.is_active == True)
-    return query.order_by(FitnessGoal.created_at.desc()).all()
+        stmt = stmt.where(FitnessGoal.is_active == True)
+    return stmt.order_by(FitnessGoal.created_at.desc())
 
 def get_active_goals_by_member(db: Session, member_id: int) -> List[FitnessGoal]:
     """Get all active fitness goals for a member."""
@@ -56,8 +61,7 @@ def update_goal(
     if is_active is not None:
         goal.is_active = is_active
     
-    db.commit()
-    db.refresh(goal)
+    db.flush()
     return goal
 
 def delete_goal(db: Session, goal_id: int) -> bool:
@@ -67,5 +71,17 @@ def delete_goal(db: Session, goal_id: int) -> bool:
         return False
     
     db.delete(goal)
-    db.commit()
+    db.flush()
     return True
+
+# -----------------------------
+# ASYNC VARIANTS
+# -----------------------------
+
+async def get_goals_by_member_async(db: AsyncSession, member_id: int, active_only: bool = False) -> List[FitnessGoal]:
+    """Get all fitness goals for a member (async)."""
+    stmt = select(FitnessGoal).where(FitnessGoal.member_id == member_id)
+    if active_only:
+        stmt = stmt.where(FitnessGoal.is_active == True)
+    result = await db.scalars(stmt.order_by(FitnessGoal.created_at.desc()))
+    return list(result.all())
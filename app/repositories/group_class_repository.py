@@ -5,28 +5,60 @@ Manages class schedules, capacity tracking, and class queries.
 """
 
 
+from sqlalchemy import select, bindparam
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.model.group_class import GroupClass
+from app.core.interval_index import interval_index, ROOM, TRAINER, CLASS
+
+# Prebuilt overlap probes (built once, served from the compiled SQL cache)
+_room_overlap = select(GroupClass.class_id).where(
+    GroupClass.room_id == bindparam("room_id"),
+    GroupClass.start_time < bindparam("end"),
+    GroupClass.end_time > bindparam("start")
+).limit(1)
+_trainer_overlap = select(GroupClass.class_id).where(
+    GroupClass.trainer_id == bindparam("trainer_id"),
+    GroupClass.start_time < bindparam("end"),
+    GroupClass.end_time > bindparam("start")
+).limit(1)
 
 def create_class(db: Session, new_class: GroupClass):
-    """Add new group class."""
+    """Add new group class (raises IntegrityError on an exclusion-constraint overlap)."""
     db.add(new_class)
-    db.commit()
-    db.refresh(new_class)
+    db.flush()
     return new_class
 
-def room_conflict(db: Session, room_id: int, start, end):
-    """Check if room is booked for other classes."""
-    return db.query(GroupClass).filter(
-        GroupClass.room_id == room_id,
-        GroupClass.start_time < end,
-        GroupClass.end_time > start
-    ).first() is not None
-
-def trainer_conflict(db: Session, trainer_id: int, start, end):
-    """Check if trainer is teaching another class at this time."""
-    return db.query(GroupClass).filter(
-        GroupClass.trainer_id == trainer_id,
-        GroupClass.start_time < end,
-        GroupClass.end_time > start
-    ).first() is not None
+def create_classes(db: Session, new_classes: list):
+    """Add many group classes with one flush (raises IntegrityError on an exclusion-constraint overlap)."""
+    db.add_all(new_classes)
+    db.flush()
+    return new_classes
+
+def get_class_by_id(db: Session, class_id: int):
+    """Fetch group class using its ID."""
+    return db.get(GroupClass, class_id)
+
+async def get_class_by_id_async(db: AsyncSession, class_id: int):
+    """Fetch group class using its ID (async)."""
+    return await db.get(GroupClass, class_id)
+
+def room_conflict(db: Session, room_id: int, start, end, confirm: bool = True):
+    """Check if room is booked for other classes.
+    Answered from the interval index; with `confirm` (booking writes) a free answer is re-checked in SQL
+    and the index is only used when already loaded (see IntervalIndex.consult)."""
+    if interval_index.consult(ROOM, room_id, confirm):
+        if interval_index.first_overlap(db, ROOM, room_id, start, end, (CLASS,)) is not None:
+            return True
+        if not confirm:
+            return False
+    return db.scalar(_room_overlap, {"room_id": room_id, "start": start, "end": end}) is not None
+
+def trainer_conflict(db: Session, trainer_id: int, start, end, confirm: bool = True):
+    """Check if trainer is teaching another class at this time (interval index first, see room_conflict)."""
+    if interval_index.consult(TRAINER, trainer_id, confirm):
+        if interval_index.first_overlap(db, TRAINER, trainer_id, start, end, (CLASS,)) is not None:
+            return True
+        if not confirm:
+            return False
+    return db.scalar(_trainer_overlap, {"trainer_id": trainer_id, "start": start, "end": end}) is not None
@@ -4,36 +4,60 @@ Handles creation and retrieval of historical health metric entries.
 Never overwrites data - all entries are preserved with timestamps.
 """
 
+from sqlalchemy import select, insert, Row
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import keyset
+from app.core.fieldsets import columns
 from app.model.health_metric import HealthMetric
-from typing import Optional, List
+from typing import Optional, List, Dict, Any, Sequence
 
 def create_health_metric(db: Session, health_metric: HealthMetric) -> HealthMetric:
     """Create a new health metric entry."""
     db.add(health_metric)
-    db.commit()
-    db.refresh(health_metric)
+    db.flush()
     return health_metric
 
 def get_health_metric_by_id(db: Session, metric_id: int) -> Optional[HealthMetric]:
     """Get health metric by ID."""
-    return db.query(HealthMetric).filter(HealthMetric.metric_id == metric_id).first()
+    return db.get(HealthMetric, metric_id)
 
 def get_health_metrics_by_member(db: Session, member_id: int, limit: int = 100) -> List[HealthMetric]:
     """Get all health metrics for a specific member, ordered by most recent first."""
-    return db.query(HealthMetric).filter(
-        HealthMetric.member_id == member_id
-    ).order_by(HealthMetric.recorded_at.desc()).limit(limit).all()
+    return db.scalars(
+        select(HealthMetric)
+        .where(HealthMetric.member_id == member_id)
+        .order_by(HealthMetric.recorded_at.desc())
+        .limit(limit)
+    ).all()
+
+def get_health_metric_rows_by_member(db: Session, member_id: int, limit: int = 100, fields: Optional[Sequence[str]] = None) -> List[Row]:
+    """Read-only get_health_metrics_by_member: plain column rows, no ORM instances or identity map (only `fields` if given)."""
+    return db.execute(
+        select(*(columns(HealthMetric, fields) if fields else HealthMetric.__table__.c))
+        .where(HealthMetric.member_id == member_id)
+        .order_by(HealthMetric.recorded_at.desc())
+        .limit(limit)
+    ).all()
 
 def get_latest_health_metric(db: Session, member_id: int) -> Optional[HealthMetric]:
     """Get the most recent health metric for a member."""
-    return db.query(HealthMetric).filter(
-        HealthMetric.member_id == member_id
-    ).order_by(HealthMetric.recorded_at.desc()).first()
+    return db.scalars(
+        select(HealthMetric)
+        .where(HealthMetric.member_id == member_id)
+        .order_by(HealthMetric.recorded_at.desc())
+        .limit(1)
+    ).first()
 
-def get_all_health_metrics(db: Session, skip: int = 0, limit: int = 100) -> List[HealthMetric]:
-    """Get all health metrics with pagination."""
-    return db.query(HealthMetric).offset(skip).limit(limit).all()
+def get_all_health_metrics(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None, fields: Optional[Sequence[str]] = None) -> List[HealthMetric]:
+    """Get all health metrics with pagination, newest first (`after` is the last (recorded_at, metric_id) of the previous page).
+    With `fields`, only those columns (plus the key) are selected and Core rows are returned."""
+    key = [HealthMetric.recorded_at, HealthMetric.metric_id]
+    if fields:
+        return db.execute(
+            keyset(select(*columns(HealthMetric, fields, "recorded_at", "metric_id")), key, after, skip, limit, descending=True)
+        ).all()
+    return db.scalars(keyset(select(HealthMetric), key, after, skip, limit, descending=True)).all()
 
 def delete_health_metric(db: Session, metric_id: int) -> bool:
     """Delete a health metric entry."""
@@ -42,5 +66,26 @@ def delete_health_metric(db: Session, metric_id: int) -> bool:
         return False
     
     db.delete(metric)
-    db.commit()
+    db.flush()
     return True
+
+# -----------------------------
+# ASYNC VARIANTS
+# -----------------------------
+
+async def get_health_metrics_by_member_async(db: AsyncSession, member_id: int, limit: int = 100) -> List[HealthMetric]:
+    """Get all health metrics for a specific member, most recent first (async)."""
+    result = await db.scalars(
+        select(HealthMetric)
+        .where(HealthMetric.member_id == member_id)
+        .order_by(HealthMetric.recorded_at.desc())
+        .limit(limit)
+    )
+    return list(result.all())
+
+async def create_health_metrics_bulk_async(db: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """Insert many health metric entries with one executemany INSERT (async)."""
+    if not rows:
+        return 0
+    await db.execute(insert(HealthMetric), rows)
+    return len(rows)
@@ -3,7 +3,10 @@ MaintenanceRecord repository - data access layer for maintenance records.
 Handles equipment maintenance issue tracking.
 Manages maintenance record creation, status updates, and queries.
 """
+from sqlalchemy import select, Select, Row
 from sqlalchemy.orm import Session
+from app.core.pagination import keyset
+from app.core.query_cache import cached_scalars, cached_rows
 from app.model.maintenance_record import MaintenanceRecord
 from typing import Optional, List
 from datetime import datetime
@@ -28,8 +31,7 @@ def create_maintenance_record(db: Session, equipment_id: int, admin_id: int, iss
         status = status
     )
     db.add(record)       #add to database
-    db.commit()          #save changes to database
-    db.refresh(record)   #re-load database with updates
+    db.flush()           #write changes (committed at end of request)
     return record
 
 def get_maintenance_record_by_id(db: Session, maintenance_id: int) -> Optional[MaintenanceRecord]:
@@ -42,8 +44,8 @@ def get_maintenance_record_by_id(db: Session, maintenance_id: int) -> Optional[M
     Returns :
         record         : MaintenanceRecord object with matching id or none if nothing found
     """
-    #Filter for maintenance record where the ids match (first returns the first match or none)
-    record = db.query(MaintenanceRecord).filter(MaintenanceRecord.maintenance_id == maintenance_id).first()
+    #Primary key lookup (served from the session identity map when already loaded)
+    record = db.get(MaintenanceRecord, maintenance_id)
     return record
 
 def get_maintenance_by_equipment(db: Session, equipment_id: int) -> List[MaintenanceRecord]:
@@ -57,9 +59,20 @@ def get_maintenance_by_equipment(db: Session, equipment_id: int) -> List[Mainten
         records      : List of MaintenanceRecord objects for that equipment
     """
     #Filter through ALL maintenance records for a specific equipment
-    records = db.query(MaintenanceRecord).filter(MaintenanceRecord.equipment_id == equipment_id).all()
+    records = db.scalars(maintenance_by_equipment_stmt(equipment_id)).all()
     return records
 
+def maintenance_by_equipment_stmt(equipment_id: int) -> Select:
+    """
+    Build the query for maintenance records of one equipment (shared by list and NDJSON streaming)
+
+    Parameters :
+        equipment_id : Equipment ID
+    Returns :
+        stmt         : select() of MaintenanceRecord
+    """
+    return select(MaintenanceRecord).where(MaintenanceRecord.equipment_id == equipment_id)
+
 def get_maintenance_by_status(db: Session, status: str) -> List[MaintenanceRecord]:
     """
     Get maintenance records by status (open, in_progress, resolved)
@@ -70,11 +83,37 @@ def get_maintenance_by_status(db: Session, status: str) -> List[MaintenanceRecor
     Returns :
         records : List of MaintenanceRecord objects with that status
     """
-    #Filter through ALL maintenance records with a specific status
-    records = db.query(MaintenanceRecord).filter(MaintenanceRecord.status == status).all()
+    #Filter through ALL maintenance records with a specific status (cached until maintenance records are written)
+    records = cached_scalars(db, "maintenance_by_status", maintenance_by_status_stmt(status))
     return records
 
-def get_all_maintenance_records(db: Session, skip: int = 0, limit: int = 100) -> List[MaintenanceRecord]:
+def get_maintenance_rows_by_status(db: Session, status: str) -> List[Row]:
+    """
+    Read-only version of get_maintenance_by_status for listings: selects the columns with Core and
+    returns plain rows, skipping ORM instances and the identity map
+
+    Parameters :
+        db      : Database session
+        status  : Maintenance status to filter by
+    Returns :
+        rows    : List of Row tuples (attribute access by column name)
+    """
+    #Same cache name (and TTL override) as get_maintenance_by_status; the entries are kept apart
+    stmt = select(*MaintenanceRecord.__table__.c).where(MaintenanceRecord.status == status)
+    return cached_rows(db, "maintenance_by_status", stmt)
+
+def maintenance_by_status_stmt(status: str) -> Select:
+    """
+    Build the query for maintenance records with a given status (shared by list and NDJSON streaming)
+
+    Parameters :
+        status : Maintenance status to filter by
+    Returns :
+        stmt   : select() of MaintenanceRecord
+    """
+    return select(MaintenanceRecord).where(MaintenanceRecord.status == status)
+
+def get_all_maintenance_records(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> List[MaintenanceRecord]:
     """
     Get all maintenance records with pagination
 
@@ -82,11 +121,12 @@ def get_all_maintenance_records(db: Session, skip: int = 0, limit: int = 100) ->
         db      : Database session
         skip    : Num of records to skip
         limit   : Maximum records to return
+        after  : Key of the last row of the previous page (keyset pagination)
     Returns :
         records : List of MaintenanceRecord objects
     """
     #Get every maintenance record object
-    records = db.query(MaintenanceRecord).offset(skip).limit(limit).all()
+    records = db.scalars(keyset(select(MaintenanceRecord), [MaintenanceRecord.maintenance_id], after, skip, limit)).all()
     return records
 
 def update_maintenance_status(db: Session, maintenance_id: int, status: str, resolved_at: Optional[datetime] = None) -> Optional[MaintenanceRecord]:
@@ -113,8 +153,7 @@ def update_maintenance_status(db: Session, maintenance_id: int, status: str, res
     if resolved_at is not None:
         record.resolved_at = resolved_at
     
-    db.commit()          #save changes to database
-    db.refresh(record)   #re-load database with updates
+    db.flush()           #write changes (committed at end of request)
     return record
 
 def delete_maintenance_record(db: Session, maintenance_id: int) -> bool:
@@ -133,5 +172,5 @@ def delete_maintenance_record(db: Session, maintenance_id: int) -> bool:
         return False
     
     db.delete(record)    #delete maintenance record from database
-    db.commit()          #save changes to database
+    db.flush()           #write changes (committed at end of request)
     return True
@@ -4,29 +4,48 @@ Handles all database operations for members (CRUD operations, queries by email,
 Abstracts database logic from business services.
 """
 
+from sqlalchemy import select, bindparam, text
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.pagination import keyset
+from app.core.fieldsets import columns
+from app.core import entity_cache
 from app.model.member import Member
-from typing import Optional, List
+from typing import Optional, List, Iterable, Set, Dict, BinaryIO, Sequence
 from datetime import date
 
+# Prebuilt statement for the hot email lookup (built once, served from the compiled SQL cache)
+_member_by_email = select(Member).where(Member.email == bindparam("email"))
+_existing_member_ids = select(Member.member_id).where(
+    Member.member_id.in_(bindparam("member_ids", expanding=True))
+)
+
 def create_member(db: Session, member: Member) -> Member:
     """Create a new member in the database."""
     db.add(member)
-    db.commit()
-    db.refresh(member)
+    db.flush()
     return member
 
 def get_member_by_id(db: Session, member_id: int) -> Optional[Member]:
-    """Get member by ID."""
-    return db.query(Member).filter(Member.member_id == member_id).first()
+    """Get member by ID (identity map, then entity cache, then database)."""
+    return entity_cache.get_by_id(db, Member, member_id)
+
+def get_member_fields_by_id(db: Session, member_id: int, fields: Sequence[str]):
+    """Only the given columns of a member (cached entity, else a column-only select returning a Row)."""
+    return entity_cache.get_fields_by_id(db, Member, member_id, columns(Member, fields))
 
 def get_member_by_email(db: Session, email: str) -> Optional[Member]:
     """Get member by email address."""
-    return db.query(Member).filter(Member.email == email).first()
+    return entity_cache.get_by_attr(
+        db, Member, "email", email, lambda: db.scalars(_member_by_email, {"email": email}).first()
+    )
 
-def get_all_members(db: Session, skip: int = 0, limit: int = 100) -> List[Member]:
-    """Get all members with pagination."""
-    return db.query(Member).offset(skip).limit(limit).all()
+def get_all_members(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None, fields: Optional[Sequence[str]] = None) -> List[Member]:
+    """Get all members with pagination (by member_id; `after` is the last key of the previous page).
+    With `fields`, only those columns (plus the key) are selected and Core rows are returned."""
+    if fields:
+        return db.execute(keyset(select(*columns(Member, fields, "member_id")), [Member.member_id], after, skip, limit)).all()
+    return db.scalars(keyset(select(Member), [Member.member_id], after, skip, limit)).all()
 
 def update_member(
     db: Session, 
@@ -53,8 +72,8 @@ def update_member(
     if phone is not None:
         member.phone = phone
     
-    db.commit()
-    db.refresh(member)
+    entity_cache.invalidate(db, member)
+    db.flush()
     return member
 
 def delete_member(db: Session, member_id: int) -> bool:
@@ -63,6 +82,121 @@ def delete_member(db: Session, member_id: int) -> bool:
     if not member:
         return False
     
+    entity_cache.invalidate(db, member)
     db.delete(member)
-    db.commit()
+    db.flush()
     return True
+
+# -----------------------------
+# BULK IMPORT (PostgreSQL COPY)
+# -----------------------------
+
+MEMBER_IMPORT_STAGING = "member_import_staging"
+
+# Row is importable when required fields are present, values fit the member columns
+# and the date of birth (if any) is a valid YYYY-MM-DD date
+_VALID_STAGED_MEMBER = """
+    nullif(trim(name), '') IS NOT NULL
+    AND length(trim(name)) <= 100
+    AND trim(email) ~ '^[^@\\s]+@[^@\\s]+\\.[^@\\s]+$'
+    AND length(trim(email)) <= 100
+    AND (nullif(trim(date_of_birth), '') IS NULL OR pg_temp.member_import_date(trim(date_of_birth)) IS NOT NULL)
+    AND length(coalesce(trim(gender), '')) <= 20
+    AND length(coalesce(trim(phone), '')) <= 20
+"""
+
+def create_member_import_staging(db: Session, column_count: int):
+    """Create the transaction-scoped staging table (one TEXT column per CSV column) and date parser."""
+    columns = ", ".join(f"c{i} text" for i in range(column_count))
+    db.execute(text(
+        f"CREATE TEMP TABLE {MEMBER_IMPORT_STAGING} "
+        f"(row_no bigint GENERATED ALWAYS AS IDENTITY, {columns}) ON COMMIT DROP"
+    ))
+    db.execute(text("""
+        CREATE OR REPLACE FUNCTION pg_temp.member_import_date(value text) RETURNS date AS $$
+        BEGIN
+            -- Reject other formats without entering the exception block (a subtransaction per call)
+            IF value !~ '^[0-9]{4}-[0-9]{2}-[0-9]{2}$' THEN
+                RETURN NULL;
+            END IF;
+            -- Well-formed but impossible dates (2026-02-30) still fail the cast
+            BEGIN
+                RETURN value::date;
+            EXCEPTION WHEN datetime_field_overflow OR invalid_datetime_format THEN
+                RETURN NULL;
+            END;
+        END
+        $$ LANGUAGE plpgsql STABLE
+    """))
+
+def copy_members_csv(db: Session, csv_body: BinaryIO, column_count: int) -> int:
+    """Stream CSV rows (header already consumed) into the staging table with COPY FROM STDIN."""
+    columns = ", ".join(f"c{i}" for i in range(column_count))
+    connection = db.connection()
+    cursor = connection.connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {MEMBER_IMPORT_STAGING} ({columns}) FROM STDIN WITH (FORMAT csv)", csv_body)
+        return cursor.rowcount
+    except connection.dialect.dbapi.DataError as e:
+        # Raw cursor errors are not wrapped by SQLAlchemy; malformed CSV is an input error
+        raise ValueError(f"Could not load CSV: {str(e).strip()}")
+    finally:
+        cursor.close()
+
+def merge_staged_members(db: Session, column_map: Dict[str, int], invalid_sample: int = 100) -> Dict[str, object]:
+    """
+    Insert valid staged rows into member in one statement.
+    Emails already in member (or repeated later in the file) are skipped by the unique index
+    through ON CONFLICT (email) DO NOTHING.
+    """
+    fields = ["name", "email", "date_of_birth", "gender", "phone"]
+    staged = ", ".join(
+        f"c{column_map[field]} AS {field}" if field in column_map else f"NULL::text AS {field}"
+        for field in fields
+    )
+    row = db.execute(text(f"""
+        WITH staged AS (
+            SELECT row_no, {staged} FROM {MEMBER_IMPORT_STAGING}
+        ),
+        checked AS (
+            SELECT *, ({_VALID_STAGED_MEMBER}) AS is_valid FROM staged
+        ),
+        inserted AS (
+            INSERT INTO member (name, email, date_of_birth, gender, phone)
+            SELECT trim(name), trim(email), pg_temp.member_import_date(nullif(trim(date_of_birth), '')),
+                   nullif(trim(gender), ''), nullif(trim(phone), '')
+            FROM checked
+            WHERE is_valid
+            ORDER BY row_no
+            ON CONFLICT (email) DO NOTHING
+            RETURNING 1
+        )
+        SELECT
+            (SELECT count(*) FROM checked) AS received,
+            (SELECT count(*) FROM checked WHERE NOT is_valid) AS invalid,
+            (SELECT count(*) FROM inserted) AS inserted,
+            ARRAY(
+                SELECT row_no FROM checked WHERE NOT is_valid ORDER BY row_no LIMIT :invalid_sample
+            ) AS invalid_rows
+    """), {"invalid_sample": invalid_sample}).mappings().one()
+    return dict(row)
+
+# -----------------------------
+# ASYNC VARIANTS
+# -----------------------------
+
+async def get_member_by_id_async(db: AsyncSession, member_id: int) -> Optional[Member]:
+    """Get member by ID (async)."""
+    return await entity_cache.get_by_id_async(db, Member, member_id)
+
+async def get_member_by_email_async(db: AsyncSession, email: str) -> Optional[Member]:
+    """Get member by email address (async)."""
+    async def load():
+        result = await db.scalars(_member_by_email, {"email": email})
+        return result.first()
+    return await entity_cache.get_by_attr_async(db, Member, "email", email, load)
+
+async def get_existing_member_ids_async(db: AsyncSession, member_ids: Iterable[int]) -> Set[int]:
+    """Return which of the given member IDs exist, using one IN query (async)."""
+    result = await db.scalars(_existing_member_ids, {"member_ids": list(member_ids)})
+    return set(result.all())
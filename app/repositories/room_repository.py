@@ -3,9 +3,16 @@ Room repository - data access layer for Room entities.
 Handles room data operations and availability queries.
 Manages room information for booking purposes.
 """
+from sqlalchemy import select, Select, literal, null, union_all
 from sqlalchemy.orm import Session
+from app.core.pagination import keyset
+from app.core import entity_cache
+from app.core.query_cache import cached_scalars
 from app.model.room import Room
-from typing import Optional, List
+from app.model.group_class import GroupClass
+from app.model.personal_training_session import PersonalTrainingSession
+from datetime import datetime
+from typing import Optional, List, Iterable, Set
 
 def create_room(db: Session, room_name: str, capacity: int, location: str, admin_id: int) -> Room:
     """
@@ -27,8 +34,7 @@ def create_room(db: Session, room_name: str, capacity: int, location: str, admin
         admin_id = admin_id
     )
     db.add(room)        #add to database
-    db.commit()         #save changes to database
-    db.refresh(room)    #re-load database with updates
+    db.flush()          #write changes (committed at end of request)
     return room
 
 def get_room_by_id(db: Session, room_id: int) -> Optional[Room]:
@@ -41,11 +47,11 @@ def get_room_by_id(db: Session, room_id: int) -> Optional[Room]:
     Returns :
         room    : Room object with matching id or none if nothing found
     """
-    #Filter for room where the room_ids match (first returns the first match or none)
-    room = db.query(Room).filter(Room.room_id == room_id).first()
+    #Primary key lookup (session identity map, then the entity cache, then the database)
+    room = entity_cache.get_by_id(db, Room, room_id)
     return room
 
-def get_all_rooms(db: Session, skip: int = 0, limit: int = 100) -> List[Room]:
+def get_all_rooms(db: Session, skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> List[Room]:
     """
     Get all rooms with pagination
 
@@ -53,12 +59,76 @@ def get_all_rooms(db: Session, skip: int = 0, limit: int = 100) -> List[Room]:
         db     : Database session
         skip   : Number of records to skip
         limit  : Maximum records to return
+        after  : Key of the last row of the previous page (keyset pagination)
     Returns :
         rooms  : List of Room objects
     """
-    rooms = db.query(Room).offset(skip).limit(limit).all()
+    rooms = db.scalars(all_rooms_stmt(skip, limit, after)).all()
     return rooms
 
+def all_rooms_stmt(skip: int = 0, limit: int = 100, after: Optional[tuple] = None) -> Select:
+    """Query for one page of rooms (shared by the list and its ETag version)."""
+    return keyset(select(Room), [Room.room_id], after, skip, limit)
+
+def get_existing_room_ids(db: Session, room_ids: Iterable[int]) -> Set[int]:
+    """
+    Which of the given room ids exist (one query for a whole batch)
+
+    Parameters :
+        db       : Database session
+        room_ids : Room IDs to look up
+    Returns :
+        Set of the room ids that exist
+    """
+    return set(db.scalars(select(Room.room_id).where(Room.room_id.in_(set(room_ids)))))
+
+def get_room_ids(db: Session, room_ids: Optional[Iterable[int]] = None, min_capacity: Optional[int] = None) -> List[int]:
+    """
+    Ids of the rooms matching the filters, in id order
+
+    Parameters :
+        db           : Database session
+        room_ids     : Only these rooms (None for all rooms)
+        min_capacity : Only rooms holding at least this many people (None for any capacity)
+    Returns :
+        List of room ids
+    """
+    stmt = select(Room.room_id).order_by(Room.room_id)
+    if room_ids is not None:
+        stmt = stmt.where(Room.room_id.in_(set(room_ids)))
+    if min_capacity is not None:
+        stmt = stmt.where(Room.capacity >= min_capacity)
+    return list(db.scalars(stmt))
+
+def get_room_bookings_in_range(db: Session, room_ids: Iterable[int], start: datetime, end: datetime) -> list:
+    """
+    All group classes and scheduled PT sessions of a set of rooms that overlap [start, end)
+
+    Parameters :
+        db       : Database session
+        room_ids : Room IDs
+        start    : Window start
+        end      : Window end
+    Returns :
+        Rows of (room_id, start_time, end_time, kind, booking_id, label), ordered by room and start time;
+        kind is "class" (label = class name) or "session"
+    """
+    room_ids = set(room_ids)
+    classes = select(
+        GroupClass.room_id, GroupClass.start_time, GroupClass.end_time,
+        literal("class").label("kind"), GroupClass.class_id.label("booking_id"), GroupClass.class_name.label("label")
+    ).where(GroupClass.room_id.in_(room_ids), GroupClass.start_time < end, GroupClass.end_time > start)
+    sessions = select(
+        PersonalTrainingSession.room_id, PersonalTrainingSession.start_time, PersonalTrainingSession.end_time,
+        literal("session"), PersonalTrainingSession.session_id, null()
+    ).where(
+        PersonalTrainingSession.room_id.in_(room_ids), PersonalTrainingSession.status == "scheduled",
+        PersonalTrainingSession.start_time < end, PersonalTrainingSession.end_time > start
+    )
+    #One round-trip for both booking tables
+    bookings = union_all(classes, sessions).subquery()
+    return db.execute(select(bookings).order_by(bookings.c.room_id, bookings.c.start_time)).all()
+
 def get_rooms_by_capacity(db: Session, min_capacity: int) -> List[Room]:
     """
     Get rooms with at least specified capacity
@@ -69,10 +139,21 @@ def get_rooms_by_capacity(db: Session, min_capacity: int) -> List[Room]:
     Returns :
         room         : List of room with at least that capcity
     """
-    #filter through ALL rooms that have a larger than or equal to min capcity
-    room = db.query(Room).filter(Room.capacity >= min_capacity).all()
+    #filter through ALL rooms that have a larger than or equal to min capcity (cached until rooms are written)
+    room = cached_scalars(db, "rooms_by_capacity", rooms_by_capacity_stmt(min_capacity))
     return room
 
+def rooms_by_capacity_stmt(min_capacity: int) -> Select:
+    """
+    Build the query for rooms with at least a given capacity (shared by list and NDJSON streaming)
+
+    Parameters :
+        min_capacity : Minimum capacity required for a room
+    Returns :
+        stmt         : select() of Room
+    """
+    return select(Room).where(Room.capacity >= min_capacity)
+
 def update_room(db: Session, room_id: int, room_name: Optional[str] = None, capacity: Optional[int] = None, location: Optional[str] = None) -> Optional[Room]:
     """
     Update room information
@@ -98,8 +179,8 @@ def update_room(db: Session, room_id: int, room_name: Optional[str] = None, capa
     if location is not None:
         room.location = location
     
-    db.commit()             #save changes to database
-    db.refresh(room)        #re-load database with updates
+    entity_cache.invalidate(db, room)   #drop cached copy
+    db.flush()              #write changes (committed at end of request)
     return room
 
 def delete_room(db: Session, id: int) -> bool:
@@ -117,6 +198,7 @@ def delete_room(db: Session, id: int) -> bool:
     if not room:
         return False
     
+    entity_cache.invalidate(db, room)   #drop cached copy
     db.delete(room)     #delete room from database
-    db.commit()         #save changes to database
+    db.flush()          #write changes (committed at end of request)
     return True 
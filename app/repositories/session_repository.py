@@ -3,51 +3,88 @@ PersonalTrainingSession repository - data access layer for session entities.
 Manages session scheduling, retrieval, and status updates.
 Handles queries for upcoming/past sessions, sessions by member or trainer.
 """
+from sqlalchemy import select, bindparam, literal, null, union_all
 from sqlalchemy.orm import Session
 from app.model.personal_training_session import PersonalTrainingSession
-from app.model.trainer_availability import TrainerAvailability
 from app.model.group_class import GroupClass
+from app.core.interval_index import interval_index, covers, naive_utc, ROOM, TRAINER, SESSION
+from app.repositories.trainer_availability_repository import get_trainer_availability_in_range
+
+# Prebuilt scheduling probes (built once, served from the compiled SQL cache)
+_trainer_session_overlap = select(PersonalTrainingSession.session_id).where(
+    PersonalTrainingSession.trainer_id == bindparam("trainer_id"),
+    PersonalTrainingSession.start_time < bindparam("end"),
+    PersonalTrainingSession.end_time > bindparam("start"),
+    PersonalTrainingSession.status == "scheduled"
+).limit(1)
+_room_session_overlap = select(PersonalTrainingSession).where(
+    PersonalTrainingSession.room_id == bindparam("room_id"),
+    PersonalTrainingSession.start_time < bindparam("end"),
+    PersonalTrainingSession.end_time > bindparam("start"),
+    PersonalTrainingSession.status == "scheduled"
+).limit(1)
+_room_class_overlap = select(GroupClass).where(
+    GroupClass.room_id == bindparam("room_id"),
+    GroupClass.start_time < bindparam("end"),
+    GroupClass.end_time > bindparam("start")
+).limit(1)
 
 def trainer_available(db: Session, trainer_id: int, start, end):
     """
-    Trainer must have an availability window covering the whole session.
+    Trainer must be available for the whole session; back-to-back availability windows count as one.
     """
-    return db.query(TrainerAvailability).filter(
-        TrainerAvailability.trainer_id == trainer_id,
-        TrainerAvailability.start_time <= start,
-        TrainerAvailability.end_time >= end
-    ).first() is not None
-
-def trainer_session_conflict(db: Session, trainer_id: int, start, end):
-    """Trainer cannot have overlapping PT sessions."""
-    return db.query(PersonalTrainingSession).filter(
-        PersonalTrainingSession.trainer_id == trainer_id,
-        PersonalTrainingSession.start_time < end,
-        PersonalTrainingSession.end_time > start,
-        PersonalTrainingSession.status == "scheduled"
-    ).first() is not None
-
-def room_conflict(db: Session, room_id: int, start, end):
-    """Detect room conflicts with classes or PT sessions."""
-    pt_conf = db.query(PersonalTrainingSession).filter(
-        PersonalTrainingSession.room_id == room_id,
-        PersonalTrainingSession.start_time < end,
-        PersonalTrainingSession.end_time > start,
-        PersonalTrainingSession.status == "scheduled"
-    ).first()
-
-    class_conf = db.query(GroupClass).filter(
-        GroupClass.room_id == room_id,
-        GroupClass.start_time < end,
-        GroupClass.end_time > start
-    ).first()
+    start, end = naive_utc(start), naive_utc(end)
+    return covers(get_trainer_availability_in_range(db, trainer_id, start, end), start, end)
+
+def trainer_session_conflict(db: Session, trainer_id: int, start, end, confirm: bool = True):
+    """Trainer cannot have overlapping PT sessions.
+    Answered from the interval index; with `confirm` (booking writes) a free answer is re-checked in SQL
+    and the index is only used when already loaded (see IntervalIndex.consult)."""
+    if interval_index.consult(TRAINER, trainer_id, confirm):
+        if interval_index.first_overlap(db, TRAINER, trainer_id, start, end, (SESSION,)) is not None:
+            return True
+        if not confirm:
+            return False
+    params = {"trainer_id": trainer_id, "start": start, "end": end}
+    return db.scalar(_trainer_session_overlap, params) is not None
+
+def room_conflict(db: Session, room_id: int, start, end, confirm: bool = True):
+    """Detect room conflicts with classes or PT sessions (interval index first, see trainer_session_conflict)."""
+    if interval_index.consult(ROOM, room_id, confirm):
+        booking = interval_index.first_overlap(db, ROOM, room_id, start, end)
+        if booking is not None or not confirm:
+            return booking
+    params = {"room_id": room_id, "start": start, "end": end}
+    pt_conf = db.scalars(_room_session_overlap, params).first()
+
+    class_conf = db.scalars(_room_class_overlap, params).first()
 
     return pt_conf or class_conf
 
+def get_trainer_bookings_in_range(db: Session, trainer_ids, start, end):
+    """
+    Scheduled PT sessions and group classes of a set of trainers overlapping [start, end), as
+    (trainer_id, start_time, end_time, kind, booking_id, label) rows ordered by trainer and start
+    (one round-trip for both tables; kind is "class" (label = class name) or "session").
+    """
+    trainer_ids = set(trainer_ids)
+    classes = select(
+        GroupClass.trainer_id, GroupClass.start_time, GroupClass.end_time,
+        literal("class").label("kind"), GroupClass.class_id.label("booking_id"), GroupClass.class_name.label("label")
+    ).where(GroupClass.trainer_id.in_(trainer_ids), GroupClass.start_time < end, GroupClass.end_time > start)
+    sessions = select(
+        PersonalTrainingSession.trainer_id, PersonalTrainingSession.start_time, PersonalTrainingSession.end_time,
+        literal("session"), PersonalTrainingSession.session_id, null()
+    ).where(
+        PersonalTrainingSession.trainer_id.in_(trainer_ids), PersonalTrainingSession.status == "scheduled",
+        PersonalTrainingSession.start_time < end, PersonalTrainingSession.end_time > start
+    )
+    bookings = union_all(classes, sessions).subquery()
+    return db.execute(select(bookings).order_by(bookings.c.trainer_id, bookings.c.start_time)).all()
+
 def create_session(db: Session, session: PersonalTrainingSession):
-    """Insert PT session."""
+    """Insert PT session (raises IntegrityError on an exclusion-constraint overlap)."""
     db.add(session)
-    db.commit()
-    db.refresh(session)
+    db.flush()
     return session
 
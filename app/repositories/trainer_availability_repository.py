@@ -4,30 +4,57 @@ Manages trainer time slot definitions.
 Handles availability queries, overlap detection, and scheduling conflicts.
 """
 
+from sqlalchemy import select, bindparam, Select
 from sqlalchemy.orm import Session
 from app.model.trainer_availability import TrainerAvailability
 
+# Prebuilt probes (built once, served from the compiled SQL cache)
+_availability_in_window = select(TrainerAvailability.start_time, TrainerAvailability.end_time).where(
+    TrainerAvailability.trainer_id == bindparam("trainer_id"),
+    TrainerAvailability.start_time < bindparam("end"),
+    TrainerAvailability.end_time > bindparam("start")
+).order_by(TrainerAvailability.start_time)
+_availability_overlap = select(TrainerAvailability.availability_id).where(
+    TrainerAvailability.trainer_id == bindparam("trainer_id"),
+    TrainerAvailability.start_time < bindparam("end"),
+    TrainerAvailability.end_time > bindparam("start")
+).limit(1)
+
 def has_overlapping_availability(db: Session, trainer_id: int, start, end):
     """
     Check if trainer already has overlapping availability.
     """
-    return db.query(TrainerAvailability).filter(
-        TrainerAvailability.trainer_id == trainer_id,
-        TrainerAvailability.start_time < end,
-        TrainerAvailability.end_time > start
-    ).first() is not None
+    params = {"trainer_id": trainer_id, "start": start, "end": end}
+    return db.scalar(_availability_overlap, params) is not None
 
 def create_availability(db: Session, availability: TrainerAvailability):
     """Insert availability into DB."""
     db.add(availability)
-    db.commit()
-    db.refresh(availability)
+    db.flush()
     return availability
 
+def get_trainer_availability_in_range(db: Session, trainer_id: int, start, end):
+    """A trainer's availability windows overlapping [start, end), as (start_time, end_time) rows in start order (index range scan)."""
+    return db.execute(_availability_in_window, {"trainer_id": trainer_id, "start": start, "end": end}).all()
+
+def get_availability_in_range(db: Session, trainer_ids, start, end):
+    """Availability windows of a set of trainers overlapping [start, end), as (trainer_id, start_time, end_time) rows ordered by trainer and start."""
+    return db.execute(
+        select(TrainerAvailability.trainer_id, TrainerAvailability.start_time, TrainerAvailability.end_time)
+        .where(
+            TrainerAvailability.trainer_id.in_(set(trainer_ids)),
+            TrainerAvailability.start_time < end,
+            TrainerAvailability.end_time > start
+        )
+        .order_by(TrainerAvailability.trainer_id, TrainerAvailability.start_time)
+    ).all()
+
 def list_availability(db: Session, trainer_id: int):
     """List all availability slots for a trainer."""
-    return db.query(TrainerAvailability).filter(
-        TrainerAvailability.trainer_id == trainer_id
-    ).all()
+    return db.scalars(list_availability_stmt(trainer_id)).all()
+
+def list_availability_stmt(trainer_id: int) -> Select:
+    """Query for a trainer's availability slots (shared by list and NDJSON streaming)."""
+    return select(TrainerAvailability).where(TrainerAvailability.trainer_id == trainer_id)
 
 
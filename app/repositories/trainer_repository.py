@@ -4,26 +4,54 @@ Handles database operations for trainers (CRUD, search by specialization, etc.).
 Manages trainer data persistence.
 """
 
+from sqlalchemy import select, bindparam, func, Select
 from sqlalchemy.orm import Session
+from app.core import entity_cache
+from app.core.query_cache import cached_scalars, cached_rows
+from app.core.fieldsets import columns
 from app.model.trainer import Trainer
 
+# Prebuilt statement for the email lookup (built once, served from the compiled SQL cache)
+_trainer_by_email = select(Trainer).where(Trainer.email == bindparam("email"))
+
 def create_trainer(db: Session, trainer: Trainer):
     """Insert a new trainer into the database."""
     db.add(trainer)
-    db.commit()
-    db.refresh(trainer)
+    db.flush()
     return trainer
 
 def get_trainer_by_id(db: Session, trainer_id: int):
     """Fetch trainer using their ID."""
-    return db.query(Trainer).filter(Trainer.trainer_id == trainer_id).first()
+    return entity_cache.get_by_id(db, Trainer, trainer_id)
+
+def get_trainer_fields_by_id(db: Session, trainer_id: int, fields):
+    """Fetch only the given columns of a trainer (cached entity, else a column-only select returning a Row)."""
+    return entity_cache.get_fields_by_id(db, Trainer, trainer_id, columns(Trainer, fields))
 
 def get_trainer_by_email(db: Session, email: str):
     """Check if trainer email already exists."""
-    return db.query(Trainer).filter(Trainer.email == email).first()
+    return entity_cache.get_by_attr(
+        db, Trainer, "email", email, lambda: db.scalars(_trainer_by_email, {"email": email}).first()
+    )
+
+def list_trainers(db: Session, fields=None):
+    """Return a list of all trainers (result cached for up to 5 minutes, dropped on any trainer write).
+    With `fields`, only those columns are selected and Core rows are returned."""
+    if fields:
+        return cached_rows(db, "list_trainers", select(*columns(Trainer, fields)), ttl=300)
+    return cached_scalars(db, "list_trainers", list_trainers_stmt(), ttl=300)
+
+def get_trainer_ids(db: Session, specialization: str = None, trainer_ids=None):
+    """Ids of all trainers, or of those with the given specialization (case-insensitive) / among trainer_ids, in id order."""
+    stmt = select(Trainer.trainer_id).order_by(Trainer.trainer_id)
+    if trainer_ids is not None:
+        stmt = stmt.where(Trainer.trainer_id.in_(set(trainer_ids)))
+    if specialization:
+        stmt = stmt.where(func.lower(Trainer.specialization) == specialization.lower())
+    return list(db.scalars(stmt))
 
-def list_trainers(db: Session):
-    """Return a list of all trainers."""
-    return db.query(Trainer).all()
+def list_trainers_stmt() -> Select:
+    """Query for all trainers (shared by list and NDJSON streaming)."""
+    return select(Trainer)
 
 
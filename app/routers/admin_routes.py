@@ -3,22 +3,33 @@ Admin API routes - REST endpoints for administrative operations.
 Exposes HTTP endpoints for room booking, equipment maintenance, class management, and billing.
 Handles admin authentication and administrative functionality.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File, status
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
-from app.core.database import get_db
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+from datetime import datetime, timedelta
+from app.core.database import get_db, get_read_db
+from app.core.streaming import wants_ndjson, stream_ndjson, NDJSON_RESPONSES
+from app.core.pagination import parse_cursor, set_next_cursor
+from app.core.etag import rows_etag, not_modified
+from app.core.serialization import json_list, json_object
+from app.core.fieldsets import FIELDS_QUERY, parse_fields, sparse_model
 from app.schemas.admin_schemas import (
     AdminCreate, AdminUpdate, AdminResponse,
     RoomCreate, RoomUpdate, RoomResponse,
     EquipmentCreate, EquipmentUpdate, EquipmentResponse,
     MaintenanceCreate, MaintenanceUpdate, MaintenanceResponse,
-    GroupClassCreate, PTScheduleCreate, 
+    GroupClassCreate, GroupClassSeriesCreate, GroupClassSeriesResponse, PTScheduleCreate, PTSlot,
+    RoomAvailabilityBatchRequest, RoomAvailabilityResult, RoomFreeWindows, TimeSlot,
+    MemberImportResponse,
 )
-from app.repositories import admin_repository, room_repository, equipment_repository, maintenance_repository, group_class_repository, session_repository
+from app.repositories import admin_repository, room_repository, equipment_repository, maintenance_repository, group_class_repository, session_repository, health_metric_repository
+from app.schemas.member_schemas import HealthMetricResponse
 from app.model.group_class import GroupClass
+from app.model.room import Room
 from app.model.personal_training_session import PersonalTrainingSession
-from app.services import admin_service, class_service, booking_service
+from app.services import admin_service, class_service, booking_service, member_service
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 #============================================
@@ -35,12 +46,17 @@ def create_admin(admin: AdminCreate, db: Session = Depends(get_db)):
     return admin_repository.create_admin(db, admin.name, admin.email, admin.role)
 
 @router.get("/", response_model=List[AdminResponse])
-def get_all_admins(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all admins with pagination"""
-    return admin_repository.get_all_admins(db, skip, limit)
+def get_all_admins(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    """Get all admins with pagination (pass the X-Next-Cursor header back as ?cursor= for the next page)"""
+    only = parse_fields(fields, AdminResponse)
+    admins = admin_repository.get_all_admins(db, skip, limit, after=parse_cursor(cursor, int), fields=only)
+    set_next_cursor(response, admins, limit, "admin_id")
+    if only:
+        return json_list(admins, sparse_model(AdminResponse, only), response)
+    return admins
 
 @router.get("/email/{email}", response_model=AdminResponse)
-def get_admin_by_email(email: str, db: Session = Depends(get_db)):
+def get_admin_by_email(email: str, db: Session = Depends(get_read_db)):
     """Get admin by email address"""
     admin = admin_repository.get_admin_by_email(db, email)
     if not admin:
@@ -48,12 +64,17 @@ def get_admin_by_email(email: str, db: Session = Depends(get_db)):
     return admin
 
 @router.get("/by-id/{admin_id}", response_model=AdminResponse)
-def get_admin(admin_id: int, db: Session = Depends(get_db)):
+def get_admin(admin_id: int, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
     """Get admin by ID"""
-    admin = admin_repository.get_admin_by_id(db, admin_id)
+    only = parse_fields(fields, AdminResponse)
+    if only:
+        admin = admin_repository.get_admin_fields_by_id(db, admin_id, only)
+    else:
+        admin = admin_repository.get_admin_by_id(db, admin_id)
     if not admin:
         raise HTTPException(status_code=404, detail="Admin not found")
-    return admin
+    #Only the requested fields are serialized
+    return json_object(admin, sparse_model(AdminResponse, only)) if only else admin
 
 @router.put("/by-id/{admin_id}", response_model=AdminResponse)
 def update_admin(admin_id: int, admin_update: AdminUpdate, db: Session = Depends(get_db)):
@@ -92,17 +113,43 @@ def create_room(room: RoomCreate, db: Session = Depends(get_db)):
     )
 
 @router.get("/rooms", response_model=List[RoomResponse])
-def get_all_rooms(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all rooms"""
-    return room_repository.get_all_rooms(db, skip, limit)
-
-@router.get("/rooms/capacity/{min_capacity}", response_model=List[RoomResponse])
-def get_rooms_by_capacity(min_capacity: int, db: Session = Depends(get_db)):
+def get_all_rooms(request: Request, response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """Get all rooms (pass the X-Next-Cursor header back as ?cursor= for the next page, the ETag as If-None-Match)"""
+    after = parse_cursor(cursor, int)
+    #version the page with one aggregate query; 304 if the client already has it
+    etag = rows_etag(db, "rooms", room_repository.all_rooms_stmt(skip, limit, after), Room.room_id, Room.version)
+    unchanged = not_modified(request, response, etag)
+    if unchanged:
+        return unchanged
+    rooms = room_repository.get_all_rooms(db, skip, limit, after=after)
+    set_next_cursor(response, rooms, limit, "room_id")
+    return rooms
+
+@router.get("/rooms/capacity/{min_capacity}", response_model=List[RoomResponse], responses=NDJSON_RESPONSES)
+def get_rooms_by_capacity(min_capacity: int, request: Request, db: Session = Depends(get_read_db)):
     """Get rooms with at least the specified capacity"""
+    #Stream rows as NDJSON when the client asks for it
+    if wants_ndjson(request):
+        return stream_ndjson(request, room_repository.rooms_by_capacity_stmt(min_capacity), RoomResponse)
     return room_repository.get_rooms_by_capacity(db, min_capacity)
 
+@router.get("/rooms/free-windows", response_model=List[RoomFreeWindows])
+def get_free_windows(
+    start_time: datetime = Query(..., alias="from"),
+    end_time: datetime = Query(..., alias="to"),
+    min_minutes: int = Query(0, ge=0),
+    room_ids: Optional[List[int]] = Query(None, alias="room_id"),
+    min_capacity: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Free time windows between from and to for several rooms (?room_id=1&room_id=2 and/or ?min_capacity=, default all rooms)"""
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    rooms = room_repository.get_room_ids(db, room_ids, min_capacity)
+    return booking_service.find_free_windows(db, rooms, start_time, end_time, min_minutes)
+
 @router.get("/rooms/{room_id}", response_model=RoomResponse)
-def get_room(room_id: int, db: Session = Depends(get_db)):
+def get_room(room_id: int, db: Session = Depends(get_read_db)):
     """Get room by ID"""
     room = room_repository.get_room_by_id(db, room_id)
     if not room:
@@ -140,22 +187,27 @@ def create_equipment(equipment: EquipmentCreate, db: Session = Depends(get_db)):
     )
 
 @router.get("/equipment", response_model=List[EquipmentResponse])
-def get_all_equipment(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all equipment"""
-    return equipment_repository.get_all_equipment(db, skip, limit)
+def get_all_equipment(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """Get all equipment (pass the X-Next-Cursor header back as ?cursor= for the next page)"""
+    equipment = equipment_repository.get_all_equipment_rows(db, skip, limit, after=parse_cursor(cursor, int))
+    set_next_cursor(response, equipment, limit, "equipment_id")
+    return json_list(equipment, EquipmentResponse, response)
 
 @router.get("/equipment/room/{room_id}", response_model=List[EquipmentResponse])
-def get_equipment_by_room(room_id: int, db: Session = Depends(get_db)):
+def get_equipment_by_room(room_id: int, db: Session = Depends(get_read_db)):
     """Get all equipment in a specific room"""
-    return equipment_repository.get_equipment_by_room(db, room_id)
+    return json_list(equipment_repository.get_equipment_by_room(db, room_id), EquipmentResponse)
 
-@router.get("/equipment/status/{status}", response_model=List[EquipmentResponse])
-def get_equipment_by_status(status: str, db: Session = Depends(get_db)):
+@router.get("/equipment/status/{status}", response_model=List[EquipmentResponse], responses=NDJSON_RESPONSES)
+def get_equipment_by_status(status: str, request: Request, db: Session = Depends(get_read_db)):
     """Get equipment by status (working, broken, in_repair)"""
-    return equipment_repository.get_equipment_by_status(db, status)
+    #Stream rows as NDJSON when the client asks for it
+    if wants_ndjson(request):
+        return stream_ndjson(request, equipment_repository.equipment_by_status_stmt(status), EquipmentResponse)
+    return json_list(equipment_repository.get_equipment_by_status(db, status), EquipmentResponse)
 
 @router.get("/equipment/{equipment_id}", response_model=EquipmentResponse)
-def get_equipment(equipment_id: int, db: Session = Depends(get_db)):
+def get_equipment(equipment_id: int, db: Session = Depends(get_read_db)):
     """Get equipment by ID"""
     equipment = equipment_repository.get_equipment_by_id(db, equipment_id)
     if not equipment:
@@ -196,22 +248,30 @@ def report_equipment_issue(maintenance: MaintenanceCreate, db: Session = Depends
     return result
 
 @router.get("/maintenance", response_model=List[MaintenanceResponse])
-def get_all_maintenance(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all maintenance records"""
-    return maintenance_repository.get_all_maintenance_records(db, skip, limit)
-
-@router.get("/maintenance/equipment/{equipment_id}", response_model=List[MaintenanceResponse])
-def get_maintenance_by_equipment(equipment_id: int, db: Session = Depends(get_db)):
+def get_all_maintenance(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, db: Session = Depends(get_read_db)):
+    """Get all maintenance records (pass the X-Next-Cursor header back as ?cursor= for the next page)"""
+    records = maintenance_repository.get_all_maintenance_records(db, skip, limit, after=parse_cursor(cursor, int))
+    set_next_cursor(response, records, limit, "maintenance_id")
+    return json_list(records, MaintenanceResponse, response)
+
+@router.get("/maintenance/equipment/{equipment_id}", response_model=List[MaintenanceResponse], responses=NDJSON_RESPONSES)
+def get_maintenance_by_equipment(equipment_id: int, request: Request, db: Session = Depends(get_read_db)):
     """Get all maintenance records for specific equipment"""
-    return maintenance_repository.get_maintenance_by_equipment(db, equipment_id)
+    #Stream rows as NDJSON when the client asks for it
+    if wants_ndjson(request):
+        return stream_ndjson(request, maintenance_repository.maintenance_by_equipment_stmt(equipment_id), MaintenanceResponse)
+    return json_list(maintenance_repository.get_maintenance_by_equipment(db, equipment_id), MaintenanceResponse)
 
-@router.get("/maintenance/status/{status}", response_model=List[MaintenanceResponse])
-def get_maintenance_by_status(status: str, db: Session = Depends(get_db)):
+@router.get("/maintenance/status/{status}", response_model=List[MaintenanceResponse], responses=NDJSON_RESPONSES)
+def get_maintenance_by_status(status: str, request: Request, db: Session = Depends(get_read_db)):
     """Get maintenance records by status (open, in_progress, resolved)"""
-    return maintenance_repository.get_maintenance_by_status(db, status)
+    #Stream rows as NDJSON when the client asks for it
+    if wants_ndjson(request):
+        return stream_ndjson(request, maintenance_repository.maintenance_by_status_stmt(status), MaintenanceResponse)
+    return json_list(maintenance_repository.get_maintenance_rows_by_status(db, status), MaintenanceResponse)
 
 @router.get("/maintenance/{maintenance_id}", response_model=MaintenanceResponse)
-def get_maintenance_record(maintenance_id: int, db: Session = Depends(get_db)):
+def get_maintenance_record(maintenance_id: int, db: Session = Depends(get_read_db)):
     """Get maintenance record by ID"""
     record = maintenance_repository.get_maintenance_record_by_id(db, maintenance_id)
     if not record:
@@ -256,19 +316,51 @@ def create_group_class(data: GroupClassCreate, db: Session = Depends(get_db)):
     Ensures:
       - room is not double-booked
       - trainer is not double-booked
+    In constraint mode both checks are done by the INSERT itself (exclusion constraints).
     """
 
-    # Room conflict check
-    if group_class_repository.room_conflict(db, data.room_id, data.start_time, data.end_time):
-        raise HTTPException(status_code=400, detail="Room is already booked for this time.")
+    if not booking_service.constraint_mode():
+        # Room conflict check
+        if group_class_repository.room_conflict(db, data.room_id, data.start_time, data.end_time):
+            raise HTTPException(status_code=400, detail="Room is already booked for this time.")
 
-    # Trainer conflict check
-    if group_class_repository.trainer_conflict(db, data.trainer_id, data.start_time, data.end_time):
-        raise HTTPException(status_code=400, detail="Trainer is already teaching another class.")
+        # Trainer conflict check
+        if group_class_repository.trainer_conflict(db, data.trainer_id, data.start_time, data.end_time):
+            raise HTTPException(status_code=400, detail="Trainer is already teaching another class.")
 
     # Create & save class
     new_class = GroupClass(**data.dict())
-    return group_class_repository.create_class(db, new_class)
+    try:
+        return group_class_repository.create_class(db, new_class)
+    except IntegrityError as e:
+        message = booking_service.booking_conflict_message(e)
+        if message is None:
+            raise
+        raise HTTPException(status_code=400, detail=message)
+
+@router.post("/classes/series", status_code=201, response_model=GroupClassSeriesResponse)
+def create_group_class_series(data: GroupClassSeriesCreate, db: Session = Depends(get_db)):
+    """
+    Creates a recurring group class (weekly, biweekly or a custom RRULE; count or until).
+    All occurrences are checked against the room's and trainer's bookings at once;
+    conflicting ones are reported, the rest are created in one transaction
+    (or none of them with skip_conflicts=false).
+    """
+    try:
+        result = class_service.create_class_series(
+            db, data.class_name, data.trainer_id, data.room_id, data.admin_id, data.start_time, data.end_time, data.capacity,
+            frequency=data.frequency, rule=data.rrule, count=data.count, until=data.until, skip_conflicts=data.skip_conflicts
+        )
+    except IntegrityError as e:
+        #A booking made concurrently, caught by the exclusion constraints; nothing is created
+        message = booking_service.booking_conflict_message(e)
+        if message is None:
+            raise
+        raise HTTPException(status_code=400, detail=message)
+    if not result["success"]:
+        detail = {"message": result["message"], "conflicts": result["conflicts"]} if result["conflicts"] else result["message"]
+        raise HTTPException(status_code=400, detail=jsonable_encoder(detail))
+    return result
 
 # ============================================================
 # PERSONAL TRAINING SESSION SCHEDULING
@@ -283,21 +375,77 @@ def schedule_pt_session(data: PTScheduleCreate, db: Session = Depends(get_db)):
     if not session_repository.trainer_available(db, data.trainer_id, data.start_time, data.end_time):
         raise HTTPException(status_code=400, detail="Trainer is not available during this time.")
 
-    # Trainer must not have another PT session
-    if session_repository.trainer_session_conflict(db, data.trainer_id, data.start_time, data.end_time):
-        raise HTTPException(status_code=400, detail="Trainer already has another session at this time.")
+    if booking_service.constraint_mode():
+        # PT-vs-PT overlaps are enforced by the INSERT; only classes in the room need a query
+        if group_class_repository.room_conflict(db, data.room_id, data.start_time, data.end_time):
+            raise HTTPException(status_code=400, detail="Room is already booked.")
+    else:
+        # Trainer must not have another PT session
+        if session_repository.trainer_session_conflict(db, data.trainer_id, data.start_time, data.end_time):
+            raise HTTPException(status_code=400, detail="Trainer already has another session at this time.")
 
-    # Room must be free
-    if session_repository.room_conflict(db, data.room_id, data.start_time, data.end_time):
-        raise HTTPException(status_code=400, detail="Room is already booked.")
+        # Room must be free
+        if session_repository.room_conflict(db, data.room_id, data.start_time, data.end_time):
+            raise HTTPException(status_code=400, detail="Room is already booked.")
 
     # Create session
     session = PersonalTrainingSession(**data.dict(), status="scheduled")
-    return session_repository.create_session(db, session)
+    try:
+        return session_repository.create_session(db, session)
+    except IntegrityError as e:
+        message = booking_service.booking_conflict_message(e)
+        if message is None:
+            raise
+        raise HTTPException(status_code=400, detail=message)
+
+@router.get("/pt-session/slots", response_model=List[PTSlot])
+def find_pt_slots(
+    duration_minutes: int = Query(..., gt=0, le=480),
+    start_time: Optional[datetime] = Query(None, alias="from"),
+    horizon_days: int = Query(14, ge=1, le=90),
+    specialization: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Earliest (trainer, room, start) combinations where a PT session of duration_minutes fits,
+    searched from `from` (default now) over the next horizon_days days.
+    """
+    start_time = start_time or datetime.now()
+    end_time = start_time + timedelta(days=horizon_days)
+    return booking_service.find_pt_slots(db, duration_minutes, start_time, end_time, specialization, limit)
 
 #============================================
 #ROOM Availability Check
 #============================================
+@router.get("/rooms/{room_id}/free-windows", response_model=List[TimeSlot])
+def get_room_free_windows(
+    room_id: int,
+    start_time: datetime = Query(..., alias="from"),
+    end_time: datetime = Query(..., alias="to"),
+    min_minutes: int = Query(0, ge=0),
+    db: Session = Depends(get_read_db)
+):
+    """Free time windows of a room between from and to, at least min_minutes long"""
+    if end_time <= start_time:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    if not room_repository.get_room_by_id(db, room_id):
+        raise HTTPException(status_code=404, detail="Room not found")
+    return booking_service.find_free_windows(db, [room_id], start_time, end_time, min_minutes)[0]["windows"]
+
+@router.post("/rooms/availability/batch", response_model=List[RoomAvailabilityResult])
+def check_room_availability_batch(data: RoomAvailabilityBatchRequest, db: Session = Depends(get_read_db)):
+    """
+    Check many room / time slot combinations in one call (e.g. a week grid).
+    Candidates come from `candidates` plus the cross product of `room_ids` and `slots`;
+    results are returned in that order. A slot that does not end after it starts fails on its own row.
+    """
+    candidates = [(c.room_id, c.start_time, c.end_time) for c in data.candidates]
+    candidates += [(room_id, slot.start_time, slot.end_time) for room_id in data.room_ids for slot in data.slots]
+    if len(candidates) > booking_service.AVAILABILITY_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {booking_service.AVAILABILITY_BATCH_MAX} room/slot combinations per request")
+    return booking_service.check_room_availability_batch(db, candidates)
+
 @router.get("/rooms/{room_id}/availability")
 def check_room_availability(
     room_id: int,
@@ -306,5 +454,28 @@ def check_room_availability(
     db: Session = Depends(get_db)
 ):
     """Check if a room is available for a given time slot"""
-    result = booking_service.check_room_availability(db, room_id, start_time, end_time)
+    #Read-only check: the interval index answer is final here (bookings re-check before inserting)
+    result = booking_service.check_room_availability(db, room_id, start_time, end_time, confirm=False)
+    return result
+
+#============================================
+#HEALTH METRICS (all members)
+#============================================
+@router.get("/health-metrics", response_model=List[HealthMetricResponse])
+def get_all_health_metrics(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    """Get health metrics of all members, newest first (pass the X-Next-Cursor header back as ?cursor= for the next page)"""
+    only = parse_fields(fields, HealthMetricResponse)
+    metrics = health_metric_repository.get_all_health_metrics(db, skip, limit, after=parse_cursor(cursor, datetime, int), fields=only)
+    set_next_cursor(response, metrics, limit, "recorded_at", "metric_id")
+    return json_list(metrics, sparse_model(HealthMetricResponse, only), response)
+
+#============================================
+#MEMBER Bulk Import
+#============================================
+@router.post("/members/import", response_model=MemberImportResponse)
+def import_members(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Bulk-import members from a CSV file (header: name,email[,date_of_birth,gender,phone])"""
+    result = member_service.import_members_csv(db, file.file)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result["message"])
     return result
@@ -4,17 +4,25 @@ Exposes HTTP endpoints for member registration, profile updates, health metrics,
 Handles request validation and response formatting for member-facing features.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
+import json
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError, OperationalError
-from typing import List
+from typing import List, Optional, AsyncIterator, Tuple, Any
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, get_async_db
+from app.core.pagination import parse_cursor, set_next_cursor
+from app.core.etag import row_etag, rows_etag, not_modified
+from app.core.serialization import json_list, json_object
+from app.core.fieldsets import FIELDS_QUERY, parse_fields, sparse_model
 from app.schemas.member_schemas import (
     MemberCreate, MemberUpdate, MemberResponse,
-    HealthMetricCreate, HealthMetricResponse,
+    HealthMetricCreate, HealthMetricResponse, HealthMetricBulkResponse,
     ClassRegistrationCreate, ClassRegistrationResponse,
-    FitnessGoalCreate, FitnessGoalUpdate, FitnessGoalResponse
+    FitnessGoalCreate, FitnessGoalUpdate, FitnessGoalResponse,
+    MemberDashboardResponse
 )
 from app.model.member import Member
 from app.model.health_metric import HealthMetric
@@ -26,6 +34,7 @@ import app.repositories.health_metric_repository as health_metric_repo
 import app.repositories.class_registration_repository as class_registration_repo
 import app.repositories.fitness_goal_repository as fitness_goal_repo
 import app.repositories.group_class_repository as group_class_repo
+import app.services.member_service as member_service
 
 router = APIRouter(prefix="/member", tags=["Member"])
 
@@ -69,16 +78,24 @@ def create_member(member: MemberCreate, db: Session = Depends(get_db)):
 # GET MEMBER BY ID
 # -----------------------------
 @router.get("/{member_id}", response_model=MemberResponse)
-def get_member(member_id: int, db: Session = Depends(get_db)):
-    """Get member by ID"""
+def get_member(member_id: int, request: Request, response: Response, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    """Get member by ID (send the ETag back as If-None-Match to get 304 when unchanged)"""
+    only = parse_fields(fields, MemberResponse)
     try:
-        member = member_repo.get_member_by_id(db, member_id)
+        if only:
+            member = member_repo.get_member_fields_by_id(db, member_id, only)
+        else:
+            member = member_repo.get_member_by_id(db, member_id)
         if not member:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Member not found"
             )
-        return member
+        unchanged = not_modified(request, response, row_etag("member", member, only))
+        if unchanged:
+            return unchanged
+        # Only the requested fields are serialized
+        return json_object(member, sparse_model(MemberResponse, only), response) if only else member
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -91,7 +108,7 @@ def get_member(member_id: int, db: Session = Depends(get_db)):
 # GET MEMBER BY EMAIL
 # -----------------------------
 @router.get("/email/{email}", response_model=MemberResponse)
-def get_member_by_email(email: str, db: Session = Depends(get_db)):
+def get_member_by_email(email: str, db: Session = Depends(get_read_db)):
     """Get member by email address"""
     try:
         member = member_repo.get_member_by_email(db, email)
@@ -113,10 +130,14 @@ def get_member_by_email(email: str, db: Session = Depends(get_db)):
 # LIST ALL MEMBERS
 # -----------------------------
 @router.get("/", response_model=List[MemberResponse])
-def list_members(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all members with pagination"""
+def list_members(response: Response, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    """Get all members with pagination (pass the X-Next-Cursor header back as ?cursor= for the next page)"""
+    after = parse_cursor(cursor, int)
+    only = parse_fields(fields, MemberResponse)
     try:
-        return member_repo.get_all_members(db, skip=skip, limit=limit)
+        members = member_repo.get_all_members(db, skip=skip, limit=limit, after=after, fields=only)
+        set_next_cursor(response, members, limit, "member_id")
+        return json_list(members, sparse_model(MemberResponse, only), response)
     except OperationalError as e:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
@@ -203,6 +224,28 @@ def delete_member(member_id: int, db: Session = Depends(get_db)):
             detail=f"Database error: {str(e)}"
         )
 
+# -----------------------------
+# MEMBER DASHBOARD
+# -----------------------------
+@router.get("/{member_id}/dashboard", response_model=MemberDashboardResponse)
+async def get_member_dashboard(member_id: int, db: AsyncSession = Depends(get_async_db)):
+    """Get dashboard data (profile, latest metric, goals, registrations) for a member"""
+    try:
+        result = await member_service.get_member_dashboard_async(db, member_id)
+        if not result["success"]:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=result["message"]
+            )
+        return result["data"]
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
 # -----------------------------
 # HEALTH METRIC ENDPOINTS
 # -----------------------------
@@ -243,9 +286,115 @@ def create_health_metric(member_id: int, health_metric: HealthMetricCreate, db:
             detail=f"Database error: {str(e)}"
         )
 
+# Rows per executemany INSERT / member lookup in bulk uploads
+HEALTH_METRIC_BULK_CHUNK = 1000
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+async def _bulk_health_metric_rows(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    """
+    Yield (row number, decoded JSON value or parse error) from a bulk upload.
+    NDJSON bodies are decoded line by line as they stream in; anything else must be a JSON array.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_MEDIA_TYPES:
+        line_no = 0
+        buffer = b""
+        async for chunk in request.stream():
+            buffer += chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line_no += 1
+                if line.strip():
+                    try:
+                        yield line_no, json.loads(line)
+                    except ValueError as e:
+                        yield line_no, e
+        if buffer.strip():
+            try:
+                yield line_no + 1, json.loads(buffer)
+            except ValueError as e:
+                yield line_no + 1, e
+        return
+
+    try:
+        payload = json.loads(await request.body())
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON")
+    if not isinstance(payload, list):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be a JSON array or NDJSON")
+    for row, item in enumerate(payload, start=1):
+        yield row, item
+
+@router.post(
+    "/health-metrics/bulk",
+    response_model=HealthMetricBulkResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {
+                    "schema": {"type": "array", "items": {"$ref": "#/components/schemas/HealthMetricCreate"}}
+                },
+                "application/x-ndjson": {"schema": {"$ref": "#/components/schemas/HealthMetricCreate"}},
+            },
+        }
+    },
+)
+async def create_health_metrics_bulk(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Record many health metrics for one or many members.
+    Accepts a JSON array of HealthMetricCreate objects or an NDJSON stream (one object per line).
+    Invalid rows and rows for unknown members are reported in `errors`; the rest are inserted.
+    """
+    received = 0
+    inserted = 0
+    errors = []
+    member_exists = {}
+    chunk = []
+    try:
+        async for row, item in _bulk_health_metric_rows(request):
+            received += 1
+            if isinstance(item, ValueError):
+                errors.append({"row": row, "error": f"Invalid JSON: {item}"})
+                continue
+            try:
+                metric = HealthMetricCreate.model_validate(item)
+            except ValidationError as e:
+                member_id = item.get("member_id") if isinstance(item, dict) else None
+                errors.append({
+                    "row": row,
+                    "member_id": member_id if isinstance(member_id, int) else None,
+                    "error": "; ".join(f"{'.'.join(map(str, err['loc'])) or 'row'}: {err['msg']}" for err in e.errors())
+                })
+                continue
+
+            chunk.append((row, metric.dict()))
+            if len(chunk) >= HEALTH_METRIC_BULK_CHUNK:
+                result = await member_service.log_health_metrics_bulk_async(db, chunk, member_exists)
+                inserted += result["inserted"]
+                errors.extend(result["errors"])
+                chunk = []
+
+        if chunk:
+            result = await member_service.log_health_metrics_bulk_async(db, chunk, member_exists)
+            inserted += result["inserted"]
+            errors.extend(result["errors"])
+    except HTTPException:
+        raise
+    except SQLAlchemyError as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Database error: {str(e)}"
+        )
+
+    errors.sort(key=lambda error: error["row"])
+    return {"received": received, "inserted": inserted, "failed": len(errors), "errors": errors}
+
 @router.get("/{member_id}/health-metrics", response_model=List[HealthMetricResponse])
-def get_member_health_metrics(member_id: int, limit: int = 100, db: Session = Depends(get_db)):
+def get_member_health_metrics(member_id: int, limit: int = 100, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
     """Get all health metrics for a member, ordered by most recent first"""
+    only = parse_fields(fields, HealthMetricResponse)
     try:
         # Verify member exists
         member = member_repo.get_member_by_id(db, member_id)
@@ -255,7 +404,8 @@ def get_member_health_metrics(member_id: int, limit: int = 100, db: Session = De
                 detail="Member not found"
             )
         
-        return health_metric_repo.get_health_metrics_by_member(db, member_id, limit=limit)
+        metrics = health_metric_repo.get_health_metric_rows_by_member(db, member_id, limit=limit, fields=only)
+        return json_list(metrics, sparse_model(HealthMetricResponse, only))
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -265,7 +415,7 @@ def get_member_health_metrics(member_id: int, limit: int = 100, db: Session = De
         )
 
 @router.get("/{member_id}/health-metrics/latest", response_model=HealthMetricResponse)
-def get_latest_health_metric(member_id: int, db: Session = Depends(get_db)):
+def get_latest_health_metric(member_id: int, db: Session = Depends(get_read_db)):
     """Get the most recent health metric for a member"""
     try:
         # Verify member exists
@@ -292,7 +442,7 @@ def get_latest_health_metric(member_id: int, db: Session = Depends(get_db)):
         )
 
 @router.get("/health-metrics/{metric_id}", response_model=HealthMetricResponse)
-def get_health_metric(metric_id: int, db: Session = Depends(get_db)):
+def get_health_metric(metric_id: int, db: Session = Depends(get_read_db)):
     """Get a specific health metric by ID"""
     try:
         metric = health_metric_repo.get_health_metric_by_id(db, metric_id)
@@ -334,11 +484,11 @@ def delete_health_metric(metric_id: int, db: Session = Depends(get_db)):
 # -----------------------------
 
 @router.post("/{member_id}/class-registrations", response_model=ClassRegistrationResponse, status_code=status.HTTP_201_CREATED)
-def register_for_class(member_id: int, registration: ClassRegistrationCreate, db: Session = Depends(get_db)):
+async def register_for_class(member_id: int, registration: ClassRegistrationCreate, db: AsyncSession = Depends(get_async_db)):
     """Register a member for a group class"""
     try:
         # Verify member exists
-        member = member_repo.get_member_by_id(db, member_id)
+        member = await member_repo.get_member_by_id_async(db, member_id)
         if not member:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -353,7 +503,7 @@ def register_for_class(member_id: int, registration: ClassRegistrationCreate, db
             )
         
         # Verify class exists
-        group_class = db.query(GroupClass).filter(GroupClass.class_id == registration.class_id).first()
+        group_class = await group_class_repo.get_class_by_id_async(db, registration.class_id)
         if not group_class:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -361,7 +511,7 @@ def register_for_class(member_id: int, registration: ClassRegistrationCreate, db
             )
         
         # Check if already registered
-        existing = class_registration_repo.get_registration_by_member_and_class(
+        existing = await class_registration_repo.get_registration_by_member_and_class_async(
             db, member_id, registration.class_id
         )
         if existing:
@@ -371,7 +521,7 @@ def register_for_class(member_id: int, registration: ClassRegistrationCreate, db
             )
         
         # Check capacity
-        current_registrations = class_registration_repo.get_class_registration_count(
+        current_registrations = await class_registration_repo.get_class_registration_count_async(
             db, registration.class_id
         )
         if current_registrations >= group_class.capacity:
@@ -381,35 +531,35 @@ def register_for_class(member_id: int, registration: ClassRegistrationCreate, db
             )
         
         new_registration = ClassRegistration(**registration.dict())
-        return class_registration_repo.create_registration(db, new_registration)
+        return await class_registration_repo.create_registration_async(db, new_registration)
     except HTTPException:
         raise
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Database integrity error"
         )
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Database error: {str(e)}"
         )
 
 @router.get("/{member_id}/class-registrations", response_model=List[ClassRegistrationResponse])
-def get_member_class_registrations(member_id: int, db: Session = Depends(get_db)):
+async def get_member_class_registrations(member_id: int, db: AsyncSession = Depends(get_async_db)):
     """Get all class registrations for a member"""
     try:
         # Verify member exists
-        member = member_repo.get_member_by_id(db, member_id)
+        member = await member_repo.get_member_by_id_async(db, member_id)
         if not member:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Member not found"
             )
         
-        return class_registration_repo.get_registrations_by_member(db, member_id)
+        return await class_registration_repo.get_registrations_by_member_async(db, member_id)
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -480,8 +630,8 @@ def create_fitness_goal(member_id: int, goal: FitnessGoalCreate, db: Session = D
         )
 
 @router.get("/{member_id}/fitness-goals", response_model=List[FitnessGoalResponse])
-def get_member_fitness_goals(member_id: int, active_only: bool = False, db: Session = Depends(get_db)):
-    """Get all fitness goals for a member"""
+def get_member_fitness_goals(member_id: int, request: Request, response: Response, active_only: bool = False, db: Session = Depends(get_read_db)):
+    """Get all fitness goals for a member (send the ETag back as If-None-Match to get 304 when unchanged)"""
     try:
         # Verify member exists
         member = member_repo.get_member_by_id(db, member_id)
@@ -490,8 +640,11 @@ def get_member_fitness_goals(member_id: int, active_only: bool = False, db: Sess
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Member not found"
             )
-        
-        return fitness_goal_repo.get_goals_by_member(db, member_id, active_only=active_only)
+
+        # Version the goal list with one aggregate query before loading it
+        stmt = fitness_goal_repo.goals_by_member_stmt(member_id, active_only)
+        etag = rows_etag(db, "fitness-goals", stmt, FitnessGoal.goal_id, FitnessGoal.version)
+        return not_modified(request, response, etag) or fitness_goal_repo.get_goals_by_member(db, member_id, active_only=active_only)
     except HTTPException:
         raise
     except SQLAlchemyError as e:
@@ -501,7 +654,7 @@ def get_member_fitness_goals(member_id: int, active_only: bool = False, db: Sess
         )
 
 @router.get("/{member_id}/fitness-goals/active", response_model=List[FitnessGoalResponse])
-def get_active_fitness_goals(member_id: int, db: Session = Depends(get_db)):
+def get_active_fitness_goals(member_id: int, db: Session = Depends(get_read_db)):
     """Get all active fitness goals for a member"""
     try:
         # Verify member exists
@@ -522,7 +675,7 @@ def get_active_fitness_goals(member_id: int, db: Session = Depends(get_db)):
         )
 
 @router.get("/fitness-goals/{goal_id}", response_model=FitnessGoalResponse)
-def get_fitness_goal(goal_id: int, db: Session = Depends(get_db)):
+def get_fitness_goal(goal_id: int, db: Session = Depends(get_read_db)):
     """Get a specific fitness goal by ID"""
     try:
         goal = fitness_goal_repo.get_goal_by_id(db, goal_id)
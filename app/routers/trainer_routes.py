@@ -4,17 +4,24 @@ Exposes HTTP endpoints for setting availability, viewing schedules, and member l
 Handles trainer authentication and request processing.
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
+from datetime import datetime
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
-from app.schemas.trainer_schemas import TrainerCreate, TrainerResponse
+from app.core.database import get_db, get_read_db
+from app.core.streaming import wants_ndjson, stream_ndjson, NDJSON_RESPONSES
+from app.core.etag import rows_etag, not_modified
+from app.core.serialization import json_list, json_object
+from app.core.fieldsets import FIELDS_QUERY, parse_fields, sparse_model
+from app.schemas.trainer_schemas import TrainerCreate, TrainerResponse, AvailabilityResponse
 from app.schemas.common_schemas import AvailabilityCreate
 from app.model.trainer import Trainer
 from app.model.trainer_availability import TrainerAvailability
 
 import app.repositories.trainer_repository as trainer_repo
 import app.repositories.trainer_availability_repository as availability_repo
+from app.services import trainer_service
 
 router = APIRouter(prefix="/trainer", tags=["Trainer"])
 
@@ -29,19 +36,43 @@ def create_trainer(data: TrainerCreate, db: Session = Depends(get_db)):
     trainer = Trainer(**data.dict())
     return trainer_repo.create_trainer(db, trainer)
 
+# CHECK MANY TRAINERS' AVAILABILITY (declared before /{trainer_id})
+
+@router.get("/available")
+def check_trainers_available(
+    start_time: datetime,
+    end_time: datetime,
+    trainer_ids: List[int] = Query(..., alias="trainer_id"),
+    db: Session = Depends(get_read_db)
+):
+    """Is each trainer (?trainer_id=1&trainer_id=2...) available for the whole slot? Back-to-back availability windows count as one."""
+    if end_time <= start_time:
+        raise HTTPException(400, "End time must be after start time")
+    return trainer_service.check_trainers_available(db, trainer_ids, start_time, end_time)
+
 # GET TRAINER
 
 @router.get("/{trainer_id}", response_model=TrainerResponse)
-def get_trainer(trainer_id: int, db: Session = Depends(get_db)):
-    trainer = trainer_repo.get_trainer_by_id(db, trainer_id)
+def get_trainer(trainer_id: int, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    only = parse_fields(fields, TrainerResponse)
+    if only:
+        trainer = trainer_repo.get_trainer_fields_by_id(db, trainer_id, only)
+    else:
+        trainer = trainer_repo.get_trainer_by_id(db, trainer_id)
     if not trainer:
         raise HTTPException(404, "Trainer not found")
-    return trainer
+    return json_object(trainer, sparse_model(TrainerResponse, only)) if only else trainer
 
 
 # LIST TRAINERS
-@router.get("/", response_model=list[TrainerResponse])
-def list_trainers(db: Session = Depends(get_db)):
+@router.get("/", response_model=list[TrainerResponse], responses=NDJSON_RESPONSES)
+def list_trainers(request: Request, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    # Stream rows as NDJSON when the client asks for it
+    if wants_ndjson(request):
+        return stream_ndjson(request, trainer_repo.list_trainers_stmt(), TrainerResponse)
+    only = parse_fields(fields, TrainerResponse)
+    if only:
+        return json_list(trainer_repo.list_trainers(db, fields=only), sparse_model(TrainerResponse, only))
     return trainer_repo.list_trainers(db)
 
 # ADD TRAINER AVAILABILITY
@@ -58,7 +89,21 @@ def add_availability(trainer_id: int, data: AvailabilityCreate, db: Session = De
     )
     return availability_repo.create_availability(db, slot)
 
+# CHECK TRAINER AVAILABILITY
+@router.get("/{trainer_id}/available")
+def check_trainer_available(trainer_id: int, start_time: datetime, end_time: datetime, db: Session = Depends(get_read_db)):
+    """Is the trainer available for the whole slot? Back-to-back availability windows count as one."""
+    if end_time <= start_time:
+        raise HTTPException(400, "End time must be after start time")
+    result = trainer_service.check_trainer_available(db, trainer_id, start_time, end_time)
+    if not result["success"]:
+        raise HTTPException(404, result["message"])
+    return result
+
 # LIST TRAINER AVAILABILITY
-@router.get("/{trainer_id}/availability")
-def get_availability(trainer_id: int, db: Session = Depends(get_db)):
-    return availability_repo.list_availability(db, trainer_id)
+@router.get("/{trainer_id}/availability", response_model=list[AvailabilityResponse], responses=NDJSON_RESPONSES)
+def get_availability(trainer_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    if wants_ndjson(request):
+        return stream_ndjson(request, availability_repo.list_availability_stmt(trainer_id), AvailabilityResponse)
+    etag = rows_etag(db, "trainer-availability", availability_repo.list_availability_stmt(trainer_id), TrainerAvailability.availability_id, TrainerAvailability.version)
+    return not_modified(request, response, etag) or availability_repo.list_availability(db, trainer_id)
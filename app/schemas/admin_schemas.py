@@ -4,7 +4,7 @@ Defines Pydantic models for admin operations (room booking, maintenance, class m
 Validates administrative data inputs and formats responses.
 """
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, List, Literal
 from datetime import datetime
 
 #============================================
@@ -139,6 +139,33 @@ class GroupClassCreate(BaseModel):
     end_time: datetime
     capacity: int
 
+class GroupClassResponse(GroupClassCreate):
+    "Schema for group class response"
+    class_id: int
+
+    class Config:
+        from_attributes = True
+
+class GroupClassSeriesCreate(GroupClassCreate):
+    """Schema for a recurring group class; start_time / end_time are those of the first occurrence"""
+    frequency: Literal["weekly", "biweekly"] = "weekly"
+    rrule: Optional[str] = None         #custom RFC 5545 rule instead of frequency, e.g. "FREQ=WEEKLY;BYDAY=MO,WE"
+    count: Optional[int] = None         #number of occurrences
+    until: Optional[datetime] = None    #last possible start time
+    skip_conflicts: bool = True         #create the free occurrences (False: all or nothing)
+
+class ClassSeriesConflict(BaseModel):
+    """An occurrence that could not be booked"""
+    start_time: datetime
+    end_time: datetime
+    message: str
+
+class GroupClassSeriesResponse(BaseModel):
+    """Schema for recurring group class creation result"""
+    message: str
+    created: List[GroupClassResponse]
+    conflicts: List[ClassSeriesConflict]
+
 #============================================
 # Personal Training Session Schemas (Your Feature)
 #============================================
@@ -148,4 +175,55 @@ class PTScheduleCreate(BaseModel):
     trainer_id: int
     room_id: int
     start_time: datetime
-    end_time: datetime
\ No newline at end of file
+    end_time: datetime
+
+#============================================
+#Room Availability Batch Schemas
+#============================================
+class TimeSlot(BaseModel):
+    """A time slot to check"""
+    start_time: datetime
+    end_time: datetime
+
+class RoomSlot(BaseModel):
+    """A room and a time slot to check"""
+    room_id: int
+    start_time: datetime
+    end_time: datetime
+
+class RoomAvailabilityBatchRequest(BaseModel):
+    """Schema for a batch availability check: explicit candidates, and/or every room in room_ids times every slot in slots"""
+    candidates: List[RoomSlot] = []
+    room_ids: List[int] = []
+    slots: List[TimeSlot] = []
+
+class RoomAvailabilityResult(RoomSlot):
+    """Availability of one room and time slot"""
+    success: bool
+    message: str
+
+class RoomFreeWindows(BaseModel):
+    """Free time windows of one room"""
+    room_id: int
+    windows: List[TimeSlot]
+
+#============================================
+#PT Slot Search Schemas
+#============================================
+class PTSlot(BaseModel):
+    """A feasible personal training slot"""
+    trainer_id: int
+    room_id: int
+    start_time: datetime
+    end_time: datetime
+
+#============================================
+#Member Import Schemas
+#============================================
+class MemberImportResponse(BaseModel):
+    """Schema for CSV member import result"""
+    received: int           #data rows in the file
+    inserted: int           #new members created
+    skipped: int            #valid rows whose email already exists (or repeats in the file)
+    invalid: int            #rows that failed validation
+    invalid_rows: List[int] #first invalid data row numbers (header excluded)
@@ -5,7 +5,7 @@ Validates input data and formats output for member endpoints.
 """
 
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, List
 from datetime import date, datetime
 from decimal import Decimal
 
@@ -57,6 +57,19 @@ class HealthMetricResponse(HealthMetricBase):
     class Config:
         from_attributes = True
 
+class HealthMetricBulkError(BaseModel):
+    """A row rejected from a bulk health metric upload"""
+    row: int  # 1-based position in the JSON array / line number in the NDJSON body
+    member_id: Optional[int] = None
+    error: str
+
+class HealthMetricBulkResponse(BaseModel):
+    """Schema for bulk health metric upload result"""
+    received: int
+    inserted: int
+    failed: int
+    errors: List[HealthMetricBulkError]
+
 # Class Registration Schemas
 class ClassRegistrationBase(BaseModel):
     """Base schema for ClassRegistration"""
@@ -104,3 +117,14 @@ class FitnessGoalResponse(FitnessGoalBase):
     
     class Config:
         from_attributes = True
+
+# Dashboard Schemas
+class MemberDashboardResponse(BaseModel):
+    """Schema for member dashboard response"""
+    member: MemberResponse
+    latest_health_metric: Optional[HealthMetricResponse] = None
+    health_metrics_count: int
+    active_fitness_goals: List[FitnessGoalResponse]
+    total_goals: int
+    class_registrations: List[ClassRegistrationResponse]
+    classes_registered: int
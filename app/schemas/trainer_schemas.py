@@ -5,6 +5,7 @@ Validates availability scheduling, schedule queries, and member lookup requests.
 """
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+from datetime import datetime
 
 class TrainerCreate(BaseModel):
     name: str
@@ -22,3 +23,11 @@ class TrainerResponse(BaseModel):
     class Config:
         from_attributes = True  # Allows Pydantic to read from ORM models
 
+class AvailabilityResponse(BaseModel):
+    availability_id: int
+    trainer_id: int
+    start_time: datetime
+    end_time: datetime
+
+    class Config:
+        from_attributes = True
@@ -4,13 +4,60 @@ Handles conflict detection for room bookings and trainer availability.
 Ensures no double-booking of rooms or overlapping trainer schedules.
 """
 from sqlalchemy.orm import Session
-from app.repositories import room_repository
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.repositories import room_repository, trainer_repository, trainer_availability_repository, session_repository
+from app.core.interval_index import interval_index, naive_utc, free_windows, merge_windows, Booking, ROOM, CLASS, SESSION
 from app.model.group_class import GroupClass
 from app.model.personal_training_session import PersonalTrainingSession
-from datetime import datetime
-from sqlalchemy import and_, or_
+from datetime import datetime, timedelta
+from typing import Optional, List, Tuple, Dict, Sequence
+from collections import defaultdict
+from heapq import nsmallest
+from sqlalchemy import and_, or_, select
 
-def check_room_availability(db: Session, room_id: int, start_time: datetime, end_time: datetime) -> dict:
+#Exclusion constraints from alembic revision 0002, mapped to the messages the routes already return
+BOOKING_CONSTRAINT_MESSAGES = {
+    "ex_groupclass_room_overlap": "Room is already booked for this time.",
+    "ex_groupclass_trainer_overlap": "Trainer is already teaching another class.",
+    "ex_pt_session_room_overlap": "Room is already booked.",
+    "ex_pt_session_trainer_overlap": "Trainer already has another session at this time.",
+}
+
+#Most (room, slot) candidates one batch availability request may ask about
+AVAILABILITY_BATCH_MAX = 5000
+
+def constraint_mode() -> bool:
+    """True when overlap checks are left to the database exclusion constraints."""
+    return settings.BOOKING_CONFLICT_MODE == "constraint"
+
+def booking_conflict_message(error: IntegrityError) -> Optional[str]:
+    """
+    Translate an exclusion-constraint violation into the route's conflict message.
+    
+    Parameters:
+        error : IntegrityError raised by an INSERT into groupclass/personaltrainingsession
+    Returns:
+        Conflict message, or None if the error is not a booking overlap
+    """
+    diag = getattr(error.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None)
+    if constraint in BOOKING_CONSTRAINT_MESSAGES:
+        return BOOKING_CONSTRAINT_MESSAGES[constraint]
+    #Fall back to the error text for drivers without diagnostics
+    text = str(error.orig)
+    for name, message in BOOKING_CONSTRAINT_MESSAGES.items():
+        if name in text:
+            return message
+    return None
+
+def room_conflict_result(booking) -> dict:
+    """Availability answer for a conflicting interval-index booking (same messages as the SQL checks)."""
+    if booking.kind == CLASS:
+        return {"success": False, "message": f"Room is booked for class '{booking.label}' during this time"}
+    return {"success": False, "message": "Room is booked for a personal training session during this time"}
+
+def check_room_availability(db: Session, room_id: int, start_time: datetime, end_time: datetime, confirm: bool = True) -> dict:
     """
     Assign rooms for sessions or classes. Prevent double-booking.
     
@@ -19,6 +66,8 @@ def check_room_availability(db: Session, room_id: int, start_time: datetime, end
         room_id    : Room ID to check
         start_time : Requested start time
         end_time   : Requested end time
+        confirm    : Re-check a free answer from the interval index in SQL (True when about to book;
+                     only the read-only GET passes False and gets its answer without a query)
     Returns:
         dict with success status and message
     """
@@ -26,9 +75,17 @@ def check_room_availability(db: Session, room_id: int, start_time: datetime, end
     room = room_repository.get_room_by_id(db, room_id)
     if not room:
         return {"success": False, "message": "Room not found"}
+
+    #Answer from the in-memory room calendar (for bookings only a clash it already knows about)
+    if interval_index.consult(ROOM, room_id, confirm):
+        booking = interval_index.first_overlap(db, ROOM, room_id, start_time, end_time)
+        if booking is not None:
+            return room_conflict_result(booking)
+        if not confirm:
+            return {"success": True, "message": "Room is available"}
     
     #Check for conflicting group classes
-    class_conflict = db.query(GroupClass).filter(
+    class_conflict = db.scalars(select(GroupClass).where(
         and_(
             GroupClass.room_id == room_id,
             or_(#Time constrants
@@ -40,13 +97,13 @@ def check_room_availability(db: Session, room_id: int, start_time: datetime, end
                 and_(GroupClass.start_time >= start_time, GroupClass.end_time <= end_time)
             )
         )
-    ).first()
+    ).limit(1)).first()
     
     if class_conflict:
         return {"success": False, "message": f"Room is booked for class '{class_conflict.class_name}' during this time"}
     
     #Check for conflicting personal training sessions
-    session_conflict = db.query(PersonalTrainingSession).filter(
+    session_conflict = db.scalars(select(PersonalTrainingSession).where(
         and_(
             PersonalTrainingSession.room_id == room_id,
             PersonalTrainingSession.status == 'scheduled',
@@ -56,9 +113,191 @@ def check_room_availability(db: Session, room_id: int, start_time: datetime, end
                 and_(PersonalTrainingSession.start_time >= start_time, PersonalTrainingSession.end_time <= end_time)
             )
         )
-    ).first()
+    ).limit(1)).first()
     
     if session_conflict:
         return {"success": False, "message": "Room is booked for a personal training session during this time"}
     
     return {"success": True, "message": "Room is available"}
+
+def check_room_availability_batch(db: Session, candidates: Sequence[Tuple[int, datetime, datetime]]) -> List[dict]:
+    """
+    Availability of many (room, time slot) candidates at once, e.g. a week grid.
+    Fetches every overlapping booking of the requested rooms with one range query and answers
+    all candidates with a sweep over the bookings in start order, instead of two overlap queries per candidate.
+
+    Parameters:
+        db         : Database session
+        candidates : (room_id, start_time, end_time) triples
+    Returns:
+        One dict per candidate, in request order, with room_id, start_time, end_time and the
+        same success / message answer as check_room_availability (a slot that does not end
+        after it starts fails on its own row)
+    """
+    results = [
+        {"room_id": room_id, "start_time": start, "end_time": end, "success": True, "message": "Room is available"}
+        for room_id, start, end in candidates
+    ]
+    slots = []
+    for position, (room_id, start, end) in enumerate(candidates):
+        start, end = naive_utc(start), naive_utc(end)
+        if end <= start:
+            results[position].update(success=False, message="End time must be after start time")
+        else:
+            slots.append((room_id, start, end, position))
+    if not slots:
+        return results
+
+    #Rooms that exist, and all of their bookings in the window spanned by the candidates
+    rooms = room_repository.get_existing_room_ids(db, (room_id for room_id, _, _, _ in slots))
+    window_start = min(start for _, start, _, _ in slots)
+    window_end = max(end for _, _, end, _ in slots)
+    bookings: Dict[int, Dict[str, List[Booking]]] = defaultdict(lambda: {CLASS: [], SESSION: []})
+    for room_id, start, end, kind, booking_id, label in room_repository.get_room_bookings_in_range(db, rooms, window_start, window_end):
+        bookings[room_id][kind].append(Booking(start, end, kind, booking_id, label))
+
+    #Candidates grouped per room, in start order
+    per_room: Dict[int, List[Tuple[datetime, datetime, int]]] = defaultdict(list)
+    for room_id, start, end, position in slots:
+        if room_id not in rooms:
+            results[position].update(success=False, message="Room not found")
+        else:
+            per_room[room_id].append((start, end, position))
+
+    for room_id, room_slots in per_room.items():
+        room_slots.sort()
+        #Classes first, so a slot clashing with both reports the class (as check_room_availability does)
+        conflicts = sweep_conflicts(bookings[room_id][CLASS], room_slots)
+        conflicts.update(sweep_conflicts(bookings[room_id][SESSION], [slot for slot in room_slots if slot[2] not in conflicts]))
+        for position, booking in conflicts.items():
+            results[position].update(room_conflict_result(booking))
+    return results
+
+def sweep_conflicts(bookings: List[Booking], slots: List[Tuple[datetime, datetime, int]]) -> Dict[int, Booking]:
+    """
+    One pass over bookings and candidate slots, both sorted by start time.
+
+    A slot [start, end) clashes with a booking that started at or before `start` exactly when the
+    latest-ending such booking is still running at `start`; otherwise it clashes only if the next
+    booking to start begins before `end`.
+
+    Parameters:
+        bookings : One room's bookings of one kind, sorted by start
+        slots    : (start, end, position) candidates, sorted by start
+    Returns:
+        Conflicting booking per candidate position (conflict-free candidates are left out)
+    """
+    conflicts = {}
+    latest = None       #booking with the latest end among those started so far
+    next_index = 0      #first booking that has not started yet
+    for start, end, position in slots:
+        while next_index < len(bookings) and bookings[next_index].start <= start:
+            if latest is None or bookings[next_index].end > latest.end:
+                latest = bookings[next_index]
+            next_index += 1
+        if latest is not None and latest.end > start:
+            conflicts[position] = latest
+        elif next_index < len(bookings) and bookings[next_index].start < end:
+            conflicts[position] = bookings[next_index]
+    return conflicts
+
+def find_free_windows(db: Session, room_ids: Sequence[int], start_time: datetime, end_time: datetime, min_minutes: int = 0) -> List[dict]:
+    """
+    Free time windows of rooms between two times.
+    Loads the classes and scheduled PT sessions of all the rooms in the range with one query,
+    merges each room's bookings and returns the gaps between them.
+
+    Parameters:
+        db          : Database session
+        room_ids    : Rooms to report on (must exist)
+        start_time  : Range start
+        end_time    : Range end
+        min_minutes : Shortest window worth returning
+    Returns:
+        One dict per room, in room_ids order, with room_id and its windows
+        (start_time / end_time dicts in time order)
+    """
+    start, end = naive_utc(start_time), naive_utc(end_time)
+    bookings: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+    for room_id, booking_start, booking_end, *_ in room_repository.get_room_bookings_in_range(db, room_ids, start, end):
+        bookings[room_id].append((booking_start, booking_end))
+    min_length = timedelta(minutes=min_minutes)
+    return [
+        {
+            "room_id": room_id,
+            "windows": [
+                {"start_time": window_start, "end_time": window_end}
+                for window_start, window_end in free_windows(bookings[room_id], start, end, min_length)
+            ],
+        }
+        for room_id in room_ids
+    ]
+
+def find_pt_slots(db: Session, duration_minutes: int, start_time: datetime, end_time: datetime, specialization: Optional[str] = None, limit: int = 10) -> List[dict]:
+    """
+    Earliest feasible personal training slots across all trainers and rooms.
+    Each trainer's availability windows minus their PT sessions and group classes are intersected
+    with every room's free windows; five set-based queries load everything needed.
+
+    Parameters:
+        db               : Database session
+        duration_minutes : Session length
+        start_time       : Earliest start
+        end_time         : Latest end (search horizon)
+        specialization   : Only trainers with this specialization (None for all)
+        limit            : Number of slots to return
+    Returns:
+        Up to `limit` dicts with trainer_id, room_id, start_time and end_time, earliest first;
+        one per trainer / room / overlapping free window, starting as early as that overlap allows
+    """
+    start, end = naive_utc(start_time), naive_utc(end_time)
+    duration = timedelta(minutes=duration_minutes)
+
+    #Trainer free time: availability windows minus sessions and classes
+    trainer_ids = trainer_repository.get_trainer_ids(db, specialization)
+    if not trainer_ids:
+        return []
+    busy: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+    for trainer_id, booking_start, booking_end, *_ in session_repository.get_trainer_bookings_in_range(db, trainer_ids, start, end):
+        busy[trainer_id].append((booking_start, booking_end))
+    availability: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+    for trainer_id, window_start, window_end in trainer_availability_repository.get_availability_in_range(db, trainer_ids, start, end):
+        availability[trainer_id].append((window_start, window_end))
+    trainer_free: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+    for trainer_id, windows in availability.items():
+        #Back-to-back availability windows count as one (as in trainer_available)
+        for window_start, window_end in merge_windows(windows):
+            trainer_free[trainer_id] += free_windows(busy[trainer_id], max(window_start, start), min(window_end, end), duration)
+    if not trainer_free:
+        return []
+
+    #Room free time
+    rooms = room_repository.get_room_ids(db)
+    room_busy: Dict[int, List[Tuple[datetime, datetime]]] = defaultdict(list)
+    for room_id, booking_start, booking_end, *_ in room_repository.get_room_bookings_in_range(db, rooms, start, end):
+        room_busy[room_id].append((booking_start, booking_end))
+    room_free = {room_id: free_windows(room_busy[room_id], start, end, duration) for room_id in rooms}
+
+    slots = (
+        (slot_start, trainer_id, room_id)
+        for trainer_id, trainer_windows in trainer_free.items()
+        for room_id, room_windows in room_free.items()
+        for slot_start in _common_starts(trainer_windows, room_windows, duration)
+    )
+    return [
+        {"trainer_id": trainer_id, "room_id": room_id, "start_time": slot_start, "end_time": slot_start + duration}
+        for slot_start, trainer_id, room_id in nsmallest(limit, slots)
+    ]
+
+def _common_starts(first: List[Tuple[datetime, datetime]], second: List[Tuple[datetime, datetime]], duration: timedelta):
+    """Earliest start in every overlap of two sorted, disjoint window lists that is at least `duration` long."""
+    i = j = 0
+    while i < len(first) and j < len(second):
+        overlap_start = max(first[i][0], second[j][0])
+        if min(first[i][1], second[j][1]) - overlap_start >= duration:
+            yield overlap_start
+        #Move past whichever window ends first
+        if first[i][1] <= second[j][1]:
+            i += 1
+        else:
+            j += 1
@@ -4,10 +4,17 @@ Manages class registration, capacity checking, and enrollment operations.
 Handles member registration for classes and capacity validation.
 """
 from sqlalchemy.orm import Session
-from app.repositories import group_class_repository
+from app.repositories import group_class_repository, room_repository, session_repository
 from app.model.group_class import GroupClass
 from app.services import booking_service
+from app.core.interval_index import naive_utc, Booking, CLASS
 from datetime import datetime
+from itertools import islice
+from typing import List, Optional, Tuple
+from dateutil.rrule import rrule, rrulestr, WEEKLY
+
+#Most occurrences one class series may have (two years of weekly classes)
+MAX_SERIES_OCCURRENCES = 104
 
 def create_group_class(db: Session, class_name: str, trainer_id: int, room_id: int, admin_id: int, start_time: datetime, end_time: datetime, capacity: int) -> dict:
     """
@@ -47,3 +54,122 @@ def create_group_class(db: Session, class_name: str, trainer_id: int, room_id: i
         "message": f"Group class '{class_name}' created successfully",
         "class": new_class
     }
+
+def expand_series(start_time: datetime, end_time: datetime, frequency: str = "weekly", rule: Optional[str] = None, count: Optional[int] = None, until: Optional[datetime] = None) -> List[Tuple[datetime, datetime]]:
+    """
+    Expand a recurring class into its occurrences.
+    
+    Parameters:
+        start_time : Start of the first occurrence
+        end_time   : End of the first occurrence (sets the length of every occurrence)
+        frequency  : "weekly" or "biweekly" (ignored when rule is given)
+        rule       : Custom RFC 5545 RRULE, e.g. "FREQ=WEEKLY;BYDAY=MO,WE"
+        count      : Number of occurrences
+        until      : Last possible start time
+    Returns:
+        (start_time, end_time) of every occurrence in time order
+    Raises:
+        ValueError with a readable message for invalid rules, empty or over-long series
+    """
+    start_time, end_time = naive_utc(start_time), naive_utc(end_time)
+    if end_time <= start_time:
+        raise ValueError("End time must be after start time")
+    if count is not None and until is not None:
+        raise ValueError("Give either count or until, not both")
+    if until is not None:
+        until = naive_utc(until)
+    if rule:
+        try:
+            recurrence = rrulestr(rule, dtstart=start_time)
+        except (ValueError, TypeError):
+            #TypeError: the rule has no FREQ
+            raise ValueError(f"Invalid RRULE: {rule}")
+        if not isinstance(recurrence, rrule):
+            raise ValueError("Only a single RRULE is supported")
+        #count / until from the request replace the rule's own bound
+        if count is not None or until is not None:
+            recurrence = recurrence.replace(count=count, until=until)
+    else:
+        if frequency not in ("weekly", "biweekly"):
+            raise ValueError("Frequency must be 'weekly' or 'biweekly' (or give a custom rule)")
+        recurrence = rrule(WEEKLY, interval=2 if frequency == "biweekly" else 1, dtstart=start_time, count=count, until=until)
+    
+    #Stop reading one past the limit, so unbounded rules fail fast
+    starts = list(islice(recurrence, MAX_SERIES_OCCURRENCES + 1))
+    if len(starts) > MAX_SERIES_OCCURRENCES:
+        raise ValueError(f"A series can have at most {MAX_SERIES_OCCURRENCES} occurrences (set count or until)")
+    if not starts:
+        raise ValueError("The series has no occurrences")
+    duration = end_time - start_time
+    return [(start, start + duration) for start in starts]
+
+def create_class_series(db: Session, class_name: str, trainer_id: int, room_id: int, admin_id: int, start_time: datetime, end_time: datetime, capacity: int,
+                        frequency: str = "weekly", rule: Optional[str] = None, count: Optional[int] = None, until: Optional[datetime] = None, skip_conflicts: bool = True) -> dict:
+    """
+    Create a recurring group class in one transaction.
+    Every booking of the room and of the trainer in the series span is loaded with two range
+    queries, all occurrences are checked against them in memory and the free ones are inserted
+    with a single flush.
+    
+    Parameters:
+        db             : Database session
+        class_name .. capacity : As for a single group class (start/end of the first occurrence)
+        frequency, rule, count, until : Recurrence (see expand_series)
+        skip_conflicts : Create the free occurrences and report the others (False: create nothing if any conflict)
+    Returns:
+        dict with success status, message, the created classes and the conflicts
+        (start_time, end_time and message per conflicting occurrence)
+    """
+    try:
+        occurrences = expand_series(start_time, end_time, frequency, rule, count, until)
+    except ValueError as e:
+        return {"success": False, "message": str(e), "created": [], "conflicts": []}
+    
+    #Everything the room and the trainer have booked over the whole series
+    span_start, span_end = occurrences[0][0], occurrences[-1][1]
+    room_bookings = [Booking(s, e, kind, booking_id, label) for _, s, e, kind, booking_id, label in room_repository.get_room_bookings_in_range(db, [room_id], span_start, span_end)]
+    trainer_bookings = [Booking(s, e, kind, booking_id, label) for _, s, e, kind, booking_id, label in session_repository.get_trainer_bookings_in_range(db, [trainer_id], span_start, span_end)]
+    
+    #One sweep per resource over the occurrences (already in time order)
+    slots = [(s, e, position) for position, (s, e) in enumerate(occurrences)]
+    room_conflicts = booking_service.sweep_conflicts(room_bookings, slots)
+    trainer_conflicts = booking_service.sweep_conflicts(trainer_bookings, slots)
+    
+    conflicts = []
+    new_classes = []
+    for position, (s, e) in enumerate(occurrences):
+        reasons = []
+        if new_classes and new_classes[-1].end_time > s:
+            reasons.append("Overlaps the previous occurrence of this series")
+        if position in room_conflicts:
+            reasons.append(booking_service.room_conflict_result(room_conflicts[position])["message"])
+        if position in trainer_conflicts:
+            booking = trainer_conflicts[position]
+            reasons.append(
+                f"Trainer is teaching class '{booking.label}' during this time" if booking.kind == CLASS
+                else "Trainer has a personal training session during this time"
+            )
+        if reasons:
+            conflicts.append({"start_time": s, "end_time": e, "message": "; ".join(reasons)})
+        else:
+            new_classes.append(GroupClass(
+                class_name=class_name, trainer_id=trainer_id, room_id=room_id, admin_id=admin_id,
+                start_time=s, end_time=e, capacity=capacity
+            ))
+    
+    if conflicts and not skip_conflicts:
+        return {
+            "success": False,
+            "message": f"{len(conflicts)} of {len(occurrences)} occurrences conflict; nothing was created",
+            "created": [],
+            "conflicts": conflicts
+        }
+    
+    #Bulk insert (raises IntegrityError if an exclusion constraint still catches a concurrent booking)
+    created = group_class_repository.create_classes(db, new_classes) if new_classes else []
+    return {
+        "success": True,
+        "message": f"Created {len(created)} of {len(occurrences)} occurrences of '{class_name}'",
+        "created": created,
+        "conflicts": conflicts
+    }
@@ -4,8 +4,11 @@ Implements member registration, profile management, health metric logging, and d
 Coordinates between repositories to provide high-level member features.
 """
 from sqlalchemy.orm import Session
-from typing import Optional, List, Dict, Any
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from typing import Optional, List, Dict, Any, Tuple, BinaryIO
 from datetime import date
+import csv
 
 from app.model.member import Member
 from app.model.health_metric import HealthMetric
@@ -182,6 +185,47 @@ def get_member_dashboard(db: Session, member_id: int) -> Dict[str, Any]:
     }
 
 
+async def get_member_dashboard_async(db: AsyncSession, member_id: int) -> Dict[str, Any]:
+    """
+    Async variant of get_member_dashboard for routes running on the event loop.
+    
+    Returns:
+        dict with all dashboard data
+    """
+    member = await member_repo.get_member_by_id_async(db, member_id)
+    if not member:
+        return {
+            "success": False,
+            "message": "Member not found",
+            "data": None
+        }
+    
+    # Get latest health metrics
+    health_metrics = await health_metric_repo.get_health_metrics_by_member_async(db, member_id)
+    latest_metric = health_metrics[0] if health_metrics else None
+    
+    # Get active fitness goals
+    fitness_goals = await fitness_goal_repo.get_goals_by_member_async(db, member_id)
+    active_goals = [g for g in fitness_goals if g.is_active]
+    
+    # Get class registrations
+    registrations = await class_registration_repo.get_registrations_by_member_async(db, member_id)
+    
+    return {
+        "success": True,
+        "message": "Dashboard data retrieved",
+        "data": {
+            "member": member,
+            "latest_health_metric": latest_metric,
+            "health_metrics_count": len(health_metrics),
+            "active_fitness_goals": active_goals,
+            "total_goals": len(fitness_goals),
+            "class_registrations": registrations,
+            "classes_registered": len(registrations)
+        }
+    }
+
+
 def set_fitness_goal(
     db: Session,
     member_id: int,
@@ -252,3 +296,94 @@ def update_goal_progress(
     }
 
 
+async def log_health_metrics_bulk_async(
+    db: AsyncSession,
+    metrics: List[Tuple[int, Dict[str, Any]]],
+    member_exists: Dict[int, bool]
+) -> Dict[str, Any]:
+    """
+    Insert one chunk of a bulk health metric upload.
+    Unknown members are looked up with a single IN query (results are cached in member_exists
+    across chunks), the remaining rows go in with one executemany INSERT inside a savepoint.
+    If that INSERT fails, the chunk is retried row by row so only the offending rows are rejected.
+
+    Args:
+        metrics: (row number, validated HealthMetricCreate fields) pairs
+        member_exists: member_id -> exists cache shared by all chunks of the upload
+
+    Returns:
+        dict with inserted count and per-row errors
+    """
+    unchecked = {fields["member_id"] for _, fields in metrics} - member_exists.keys()
+    if unchecked:
+        existing = await member_repo.get_existing_member_ids_async(db, unchecked)
+        for member_id in unchecked:
+            member_exists[member_id] = member_id in existing
+
+    errors = []
+    valid = []
+    for row, fields in metrics:
+        if member_exists[fields["member_id"]]:
+            valid.append((row, fields))
+        else:
+            errors.append({"row": row, "member_id": fields["member_id"], "error": "Member not found"})
+
+    try:
+        async with db.begin_nested():
+            inserted = await health_metric_repo.create_health_metrics_bulk_async(db, [fields for _, fields in valid])
+    except SQLAlchemyError:
+        # Isolate the rows the database rejected (e.g. out-of-range values)
+        inserted = 0
+        for row, fields in valid:
+            try:
+                async with db.begin_nested():
+                    inserted += await health_metric_repo.create_health_metrics_bulk_async(db, [fields])
+            except SQLAlchemyError as e:
+                errors.append({"row": row, "member_id": fields["member_id"], "error": f"Database error: {getattr(e, 'orig', e)}"})
+
+    return {"inserted": inserted, "errors": errors}
+
+
+MEMBER_IMPORT_COLUMNS = ("name", "email", "date_of_birth", "gender", "phone")
+
+def import_members_csv(db: Session, csv_file: BinaryIO) -> Dict[str, Any]:
+    """
+    Bulk-load members from a CSV file (PostgreSQL only).
+    The header row names the columns (name and email are required; date_of_birth, gender and phone
+    are optional; other columns are ignored). Rows are streamed into a temporary staging table
+    with COPY FROM STDIN, validated in SQL and merged with INSERT ... ON CONFLICT (email) DO NOTHING.
+
+    Returns:
+        dict with success status, message and received/inserted/skipped/invalid counts
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return {"success": False, "message": "Member import requires PostgreSQL"}
+
+    header_line = csv_file.readline().decode("utf-8-sig")
+    header = next(csv.reader([header_line]), [])
+    column_map = {}
+    for index, column in enumerate(header):
+        column = column.strip().lower()
+        if column in MEMBER_IMPORT_COLUMNS and column not in column_map:
+            column_map[column] = index
+    missing = [column for column in ("name", "email") if column not in column_map]
+    if missing:
+        return {"success": False, "message": f"CSV header is missing required column(s): {', '.join(missing)}"}
+
+    member_repo.create_member_import_staging(db, len(header))
+    try:
+        member_repo.copy_members_csv(db, csv_file, len(header))
+    except ValueError as e:
+        return {"success": False, "message": str(e)}
+    counts = member_repo.merge_staged_members(db, column_map)
+
+    skipped = counts["received"] - counts["invalid"] - counts["inserted"]
+    return {
+        "success": True,
+        "message": f"Imported {counts['inserted']} member(s)",
+        "received": counts["received"],
+        "inserted": counts["inserted"],
+        "skipped": skipped,
+        "invalid": counts["invalid"],
+        "invalid_rows": list(counts["invalid_rows"])
+    }
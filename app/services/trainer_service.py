@@ -6,12 +6,14 @@ Coordinates trainer-related business rules and data access.
 from sqlalchemy.orm import Session
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from collections import defaultdict
 
 from app.model.trainer import Trainer
 from app.model.trainer_availability import TrainerAvailability
 import app.repositories.trainer_repository as trainer_repo
 import app.repositories.trainer_availability_repository as availability_repo
 import app.repositories.member_repository as member_repo
+from app.core.interval_index import covers, naive_utc
 
 
 def set_availability(
@@ -102,6 +104,8 @@ def check_trainer_available(
 ) -> Dict[str, Any]:
     """
     Check if a trainer is available during a specific time slot.
+    Only the availability windows overlapping the slot are loaded; back-to-back
+    windows are merged before checking that they cover it.
     
     Returns:
         dict with availability status
@@ -114,14 +118,10 @@ def check_trainer_available(
             "available": False
         }
     
-    # Check if trainer has availability covering this time
-    availability = availability_repo.list_availability(db, trainer_id)
-    
-    is_available = False
-    for slot in availability:
-        if slot.start_time <= start_time and slot.end_time >= end_time:
-            is_available = True
-            break
+    # Check if trainer's availability covers this time
+    start_time, end_time = naive_utc(start_time), naive_utc(end_time)
+    windows = availability_repo.get_trainer_availability_in_range(db, trainer_id, start_time, end_time)
+    is_available = covers(windows, start_time, end_time)
     
     return {
         "success": True,
@@ -130,6 +130,40 @@ def check_trainer_available(
     }
 
 
+def check_trainers_available(
+    db: Session,
+    trainer_ids: List[int],
+    start_time: datetime,
+    end_time: datetime
+) -> List[Dict[str, Any]]:
+    """
+    Batched check_trainer_available for many trainers and one time slot
+    (two queries in total, whatever the number of trainers).
+    
+    Returns:
+        list of dicts with trainer_id and availability status, in trainer_ids order
+    """
+    start_time, end_time = naive_utc(start_time), naive_utc(end_time)
+    existing = set(trainer_repo.get_trainer_ids(db, trainer_ids=trainer_ids))
+    windows = defaultdict(list)
+    for trainer_id, window_start, window_end in availability_repo.get_availability_in_range(db, existing, start_time, end_time):
+        windows[trainer_id].append((window_start, window_end))
+    
+    results = []
+    for trainer_id in trainer_ids:
+        if trainer_id not in existing:
+            results.append({"trainer_id": trainer_id, "success": False, "message": "Trainer not found", "available": False})
+            continue
+        is_available = covers(windows[trainer_id], start_time, end_time)
+        results.append({
+            "trainer_id": trainer_id,
+            "success": True,
+            "message": "Available" if is_available else "Not available during this time",
+            "available": is_available
+        })
+    return results
+
+
 def lookup_member(db: Session, member_id: int) -> Dict[str, Any]:
     """
     Look up a member's information (for trainers to view their clients).
@@ -0,0 +1,4 @@
+"""
+Benchmarks package - standalone micro-benchmarks for hot paths.
+Run from the project root, e.g. python -m benchmarks.bench_repository_lookups
+"""
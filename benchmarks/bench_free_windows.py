@@ -0,0 +1,86 @@
+"""
+"When is this room free?" for one room with 10k bookings (group classes and PT sessions).
+"before" is what clients did without the free-windows endpoint: ask check_room_availability for
+every half-hour cell of a week (two overlap queries per cell; the interval index is disabled so
+every call reaches the database). "after" is find_free_windows, one range query plus a merge,
+for the same week and for the whole 10k-booking range. The script checks that the free cells
+and the returned windows agree.
+
+Run: python -m benchmarks.bench_free_windows
+"""
+
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_session, bench
+
+from sqlalchemy import insert
+
+from app.core.interval_index import interval_index
+from app.model.admin_staff import AdminStaff
+from app.model.group_class import GroupClass
+from app.model.member import Member
+from app.model.personal_training_session import PersonalTrainingSession
+from app.model.room import Room
+from app.model.trainer import Trainer
+from app.services import booking_service
+
+BOOKINGS = 10_000
+CELL = timedelta(minutes=30)
+N = 5
+
+
+def seed(db):
+    admin = AdminStaff(name="Admin", email="admin@example.com")
+    trainer = Trainer(name="Trainer", email="trainer@example.com")
+    member = Member(name="Member", email="member@example.com")
+    room = Room(room_name="Studio", capacity=30, admin=admin)
+    db.add_all([admin, trainer, member, room])
+    db.flush()
+    # Every 100 minutes a 45-90 minute booking, alternating group classes and PT sessions
+    start = datetime(2026, 1, 1, 6, 0)
+    classes, sessions = [], []
+    for i in range(BOOKINGS):
+        booking_start = start + timedelta(minutes=100 * i)
+        booking = {
+            "trainer_id": trainer.trainer_id, "room_id": room.room_id,
+            "start_time": booking_start, "end_time": booking_start + timedelta(minutes=45 + 15 * (i % 4)),
+        }
+        if i % 2:
+            classes.append({**booking, "class_name": f"Class {i}", "admin_id": admin.admin_id, "capacity": 20})
+        else:
+            sessions.append({**booking, "member_id": member.member_id, "status": "scheduled"})
+    db.execute(insert(GroupClass), classes)
+    db.execute(insert(PersonalTrainingSession), sessions)
+    db.commit()
+    return room.room_id, start, start + timedelta(minutes=100 * BOOKINGS)
+
+
+def main():
+    db = make_session()
+    room_id, first, last = seed(db)
+    # Benchmark the SQL checks themselves, not the in-memory index
+    interval_index.ttl = 0
+
+    week_start = first + timedelta(days=30)
+    week_end = week_start + timedelta(days=7)
+    cells = [(week_start + k * CELL, week_start + (k + 1) * CELL) for k in range((week_end - week_start) // CELL)]
+
+    def per_cell():
+        return [booking_service.check_room_availability(db, room_id, s, e)["success"] for s, e in cells]
+
+    def windows(start, end):
+        return lambda: booking_service.find_free_windows(db, [room_id], start, end)[0]["windows"]
+
+    week = windows(week_start, week_end)()
+    inside = lambda s, e: any(w["start_time"] <= s and e <= w["end_time"] for w in week)
+    assert per_cell() == [inside(s, e) for s, e in cells]
+
+    print(f"{BOOKINGS} bookings in one room, {N} runs each\n")
+    before = bench(f"week grid: {len(cells)} x check_room_availability", per_cell, N)
+    after = bench("week: find_free_windows", windows(week_start, week_end), N)
+    print(f"{'speedup':<55} {before / after:10.2f}x\n")
+    bench(f"whole range ({BOOKINGS} bookings): find_free_windows", windows(first, last), N)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+ORM hydration vs the read-only Core fast path for list endpoints.
+Fetches 10k health metrics for one member both ways (get_health_metrics_by_member vs
+get_health_metric_rows_by_member), then serializes them with json_list as the route does.
+Reports CPU time per row and memory per row (tracemalloc: memory held by the fetched result,
+and the peak while fetching).
+
+Run: python -m benchmarks.bench_read_fast_path
+"""
+
+import tracemalloc
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from benchmarks.common import make_session, bench
+
+from sqlalchemy import insert
+
+from app.core.serialization import json_list
+from app.model.health_metric import HealthMetric
+from app.model.member import Member
+from app.repositories import health_metric_repository
+from app.schemas.member_schemas import HealthMetricResponse
+
+ROWS = 10_000
+N = 10
+
+
+def seed(db):
+    member = Member(name="Member", email="member@example.com")
+    db.add(member)
+    db.flush()
+    start = datetime(2026, 1, 1, 7, 0)
+    db.execute(insert(HealthMetric), [
+        {
+            "member_id": member.member_id, "recorded_at": start + timedelta(minutes=i),
+            "weight": Decimal("70.00") + Decimal(i % 300) / 10, "heart_rate": 55 + i % 40,
+            "body_fat": Decimal("18.50") + Decimal(i % 90) / 10,
+        }
+        for i in range(ROWS)
+    ])
+    db.commit()
+    return member.member_id
+
+
+def memory_per_row(fetch) -> tuple:
+    """Bytes per row still held by the result, and peak bytes per row while fetching."""
+    tracemalloc.start()
+    result = fetch()
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return held / ROWS, peak / ROWS
+
+
+def main():
+    db = make_session()
+    member_id = seed(db)
+
+    def orm():
+        # A fresh identity map every call, as in a request
+        db.expunge_all()
+        return health_metric_repository.get_health_metrics_by_member(db, member_id, limit=ROWS)
+
+    def core():
+        return health_metric_repository.get_health_metric_rows_by_member(db, member_id, limit=ROWS)
+
+    assert json_list(orm(), HealthMetricResponse).body == json_list(core(), HealthMetricResponse).body
+
+    print(f"{ROWS} health metrics, {N} runs each\n")
+    cases = [
+        ("fetch", orm, core),
+        ("fetch + json_list", lambda: json_list(orm(), HealthMetricResponse).body, lambda: json_list(core(), HealthMetricResponse).body),
+    ]
+    for label, before_fn, after_fn in cases:
+        before = bench(f"{label} [ORM entities]", before_fn, N)
+        after = bench(f"{label} [Core rows]", after_fn, N)
+        print(f"{'  per row':<55} {before / ROWS:10.2f} -> {after / ROWS:.2f} us  ({before / after:.2f}x)\n")
+
+    db.expunge_all()
+    orm_held, orm_peak = memory_per_row(orm)
+    db.expunge_all()
+    core_held, core_peak = memory_per_row(core)
+    print(f"{'memory held per row [ORM entities]':<55} {orm_held:10.0f} B   (peak {orm_peak:.0f} B)")
+    print(f"{'memory held per row [Core rows]':<55} {core_held:10.0f} B   (peak {core_peak:.0f} B)")
+
+
+if __name__ == "__main__":
+    main()
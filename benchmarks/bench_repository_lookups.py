@@ -0,0 +1,103 @@
+"""
+Per-call Python overhead of repository lookups: legacy Query API vs 2.0 select().
+The "legacy" callables reproduce the pre-migration repository code inline. The entity cache and
+the interval index are disabled, so both sides of every case reach the database.
+
+Run: python -m benchmarks.bench_repository_lookups
+"""
+
+from datetime import datetime, timedelta
+
+from benchmarks.common import make_session, bench
+
+from app.core.entity_cache import entity_cache
+from app.core.interval_index import interval_index
+from app.model.admin_staff import AdminStaff
+from app.model.class_registration import ClassRegistration
+from app.model.group_class import GroupClass
+from app.model.member import Member
+from app.model.room import Room
+from app.model.trainer import Trainer
+from app.repositories import member_repository, class_registration_repository, group_class_repository
+
+N = 5000
+MEMBERS = 1000
+
+
+def seed(db):
+    admin = AdminStaff(name="Admin", email="admin@example.com")
+    trainer = Trainer(name="Trainer", email="trainer@example.com")
+    room = Room(room_name="Studio", capacity=30, admin=admin)
+    db.add_all([admin, trainer, room])
+    db.flush()
+    start = datetime(2026, 1, 5, 9, 0)
+    group_class = GroupClass(
+        class_name="Spin", trainer_id=trainer.trainer_id, room_id=room.room_id, admin_id=admin.admin_id,
+        start_time=start, end_time=start + timedelta(hours=1), capacity=MEMBERS
+    )
+    db.add(group_class)
+    db.add_all(Member(name=f"Member {i}", email=f"member{i}@example.com") for i in range(MEMBERS))
+    db.flush()
+    db.add_all(
+        ClassRegistration(member_id=m, class_id=group_class.class_id) for m in range(1, MEMBERS + 1, 2)
+    )
+    db.commit()
+    return room.room_id, group_class.class_id, start
+
+
+def main():
+    db = make_session()
+    room_id, class_id, start = seed(db)
+    # Compare the query styles, not the caches in front of them
+    entity_cache.maxsize = 0
+    interval_index.ttl = 0
+    end = start + timedelta(minutes=30)
+    # The identity map holds weak references; keep member 500 alive for the "in session" case
+    held = db.get(Member, 500)
+
+    cases = [
+        (
+            "member by id (already in session)",
+            lambda: db.query(Member).filter(Member.member_id == 500).first(),
+            lambda: member_repository.get_member_by_id(db, 500),
+        ),
+        (
+            "member by id (not in session)",
+            lambda: db.query(Member).filter(Member.member_id == 501).first(),
+            lambda: member_repository.get_member_by_id(db, 501),
+        ),
+        (
+            "member by email",
+            lambda: db.query(Member).filter(Member.email == "member500@example.com").first(),
+            lambda: member_repository.get_member_by_email(db, "member500@example.com"),
+        ),
+        (
+            "registration by member and class",
+            lambda: db.query(ClassRegistration).filter(
+                ClassRegistration.member_id == 501, ClassRegistration.class_id == class_id
+            ).first(),
+            lambda: class_registration_repository.get_registration_by_member_and_class(db, 501, class_id),
+        ),
+        (
+            "registration count for class",
+            lambda: db.query(ClassRegistration).filter(ClassRegistration.class_id == class_id).count(),
+            lambda: class_registration_repository.get_class_registration_count(db, class_id),
+        ),
+        (
+            "group class room conflict",
+            lambda: db.query(GroupClass).filter(
+                GroupClass.room_id == room_id, GroupClass.start_time < end, GroupClass.end_time > start
+            ).first() is not None,
+            lambda: group_class_repository.room_conflict(db, room_id, start, end),
+        ),
+    ]
+
+    print(f"{N} calls each, {MEMBERS} members\n")
+    for label, legacy, current in cases:
+        before = bench(f"{label} [legacy query()]", legacy, N)
+        after = bench(f"{label} [select()]", current, N)
+        print(f"{'':<55} {before / after:10.2f}x\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Serialization of a List[HealthMetricResponse] of 10k ORM rows, from ORM objects to response body bytes.
+"before" is FastAPI's response_model path with the stdlib JSONResponse (the previous default),
+then the same path with ORJSONResponse (the new default), then the TypeAdapter fast path
+used by the large list endpoints. The script checks that all three produce the same document.
+
+Run: python -m benchmarks.bench_serialization
+"""
+
+import asyncio
+import json
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+
+from benchmarks.common import bench
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.serialization import json_list
+from app.model.health_metric import HealthMetric
+from app.schemas.member_schemas import HealthMetricResponse
+
+ROWS = 10_000
+N = 20
+
+
+def make_rows() -> List[HealthMetric]:
+    start = datetime(2026, 1, 1, 7, 0)
+    return [
+        HealthMetric(
+            metric_id=i, member_id=i % 500 + 1, recorded_at=start + timedelta(minutes=i),
+            weight=Decimal("70.00") + Decimal(i % 300) / 10, heart_rate=55 + i % 40 if i % 3 else None,
+            body_fat=Decimal("18.50") + Decimal(i % 90) / 10
+        )
+        for i in range(ROWS)
+    ]
+
+
+def main():
+    rows = make_rows()
+    field = create_response_field(name="Response_bench", type_=List[HealthMetricResponse])
+    loop = asyncio.new_event_loop()
+
+    def response_model_path(response_class):
+        def run():
+            content = loop.run_until_complete(serialize_response(field=field, response_content=rows, is_coroutine=False))
+            return response_class(content).body
+        return run
+
+    reference = json.loads(response_model_path(JSONResponse)())
+    assert json.loads(response_model_path(ORJSONResponse)()) == reference
+    assert json.loads(json_list(rows, HealthMetricResponse).body) == reference
+    assert json_list(rows, HealthMetricResponse).body == response_model_path(ORJSONResponse)()
+
+    print(f"{ROWS} HealthMetricResponse rows, {N} runs each\n")
+    before = bench("response_model + JSONResponse (stdlib json)", response_model_path(JSONResponse), N)
+    orjson_path = bench("response_model + ORJSONResponse", response_model_path(ORJSONResponse), N)
+    adapter = bench("TypeAdapter dump_json of ORM state (json_list)", lambda: json_list(rows, HealthMetricResponse).body, N)
+    print(f"\n{'ORJSONResponse speedup':<55} {before / orjson_path:10.2f}x")
+    print(f"{'TypeAdapter speedup':<55} {before / adapter:10.2f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
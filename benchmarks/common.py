@@ -0,0 +1,43 @@
+"""
+Shared setup for the micro-benchmarks.
+Points the app settings at throwaway URLs before any app module is imported (the app
+engines are created but never connected), and provides a seeded in-memory SQLite session.
+Set BENCH_DATABASE_URL to benchmark against a real database instead.
+"""
+
+import os
+import time
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bench-unused.db")
+os.environ.setdefault("ASYNC_DATABASE_URL", "postgresql+asyncpg://bench@localhost/bench")
+os.environ.setdefault("SLOW_QUERY_MS", "0")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+
+import app.model  # Registers all models with Base.metadata
+from app.core.database import Base
+
+
+def make_session() -> Session:
+    """Create an empty schema and return a session bound to it."""
+    url = os.getenv("BENCH_DATABASE_URL", "sqlite://")
+    if url.startswith("sqlite"):
+        engine = create_engine(url, poolclass=StaticPool, connect_args={"check_same_thread": False})
+    else:
+        engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def bench(label: str, fn, number: int) -> float:
+    """Run fn `number` times after one warm-up call and print microseconds per call."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(number):
+        fn()
+    per_call_us = (time.perf_counter() - start) / number * 1e6
+    print(f"{label:<55} {per_call_us:10.1f} us/call")
+    return per_call_us
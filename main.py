@@ -5,6 +5,7 @@ Coordinates all application components and serves as the entry point for running
 """
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
@@ -12,7 +13,7 @@ from contextlib import asynccontextmanager
 import app.model  # This imports all models from app.model/__init__.py
 
 # Import database utilities
-from app.core.database import Base, engine, create_tables
+from app.core.database import Base, engine, async_engine, create_tables
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -26,14 +27,17 @@ async def lifespan(app: FastAPI):
         print(f"Warning: Could not create tables on startup: {e}")
         print("Tables may need to be created manually or database connection may need to be configured.")
     yield
-    # Shutdown: Add any cleanup code here if needed
+    # Shutdown: release pooled async connections
+    await async_engine.dispose()
 
 # Create FastAPI app instance
 app = FastAPI(
     title="Fitness Center Management API",
     description="API for managing fitness center operations",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # orjson encodes response_model output several times faster than the stdlib json module
+    default_response_class=ORJSONResponse
 )
 
 # Add CORS middleware for frontend
@@ -43,8 +47,17 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-DB-Queries", "X-DB-Time-ms", "X-DB-N-Plus-One", "X-Next-Cursor", "ETag"],
 )
 
+# Pin clients to the primary right after their own writes (read replica routing)
+from app.core.read_routing import read_your_writes_middleware
+app.middleware("http")(read_your_writes_middleware)
+
+# Report per-request statement count and DB time (X-DB-Queries / X-DB-Time-ms)
+from app.core.query_stats import query_stats_middleware
+app.middleware("http")(query_stats_middleware)
+
 # Health check endpoint
 @app.get("/")
 def root():
@@ -73,6 +86,32 @@ def health_check_db():
     except Exception as e:
         return {"status": "unhealthy", "database": "disconnected", "error": str(e)}
 
+@app.get("/health/pool")
+def health_check_pool():
+    """Connection pool statistics endpoint (checked-out, idle, overflow, wait times)"""
+    from app.core.database import engine, async_engine, read_engine
+    from app.core.pool import pool_status
+    pools = {
+        "primary": pool_status(engine),
+        "primary_async": pool_status(async_engine.sync_engine),
+    }
+    if read_engine is not None:
+        pools["replica"] = pool_status(read_engine)
+    return {"status": "healthy", "pools": pools}
+
+@app.get("/health/cache")
+def health_check_cache():
+    """Entity, query cache and interval index statistics endpoint (size, hits, misses, evictions, invalidations)"""
+    from app.core.entity_cache import entity_cache
+    from app.core.query_cache import query_cache
+    from app.core.interval_index import interval_index
+    return {
+        "status": "healthy",
+        "entity_cache": entity_cache.stats(),
+        "query_cache": query_cache.stats(),
+        "interval_index": interval_index.stats(),
+    }
+
 # Register routers
 from app.routers import trainer_routes, admin_routes, member_routes
 
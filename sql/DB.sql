@@ -30,7 +30,8 @@ CREATE TABLE IF NOT EXISTS room (
     room_name VARCHAR(100) NOT NULL,
     location VARCHAR(100),
     capacity INT,
-    admin_id INT REFERENCES adminstaff(admin_id)
+    admin_id INT REFERENCES adminstaff(admin_id),
+    version INT NOT NULL DEFAULT 1
 ); 
 -- EQUIPMENT
 CREATE TABLE IF NOT EXISTS equipment (
@@ -49,7 +50,8 @@ CREATE TABLE IF NOT EXISTS fitnessgoal (
     current_value NUMERIC,
     target_date DATE,
     is_active BOOLEAN DEFAULT TRUE,
-    created_at TIMESTAMP DEFAULT NOW()
+    created_at TIMESTAMP DEFAULT NOW(),
+    version INT NOT NULL DEFAULT 1
 );
 -- HEALTH METRICS
 CREATE TABLE IF NOT EXISTS healthmetric (
@@ -66,7 +68,8 @@ CREATE TABLE IF NOT EXISTS traineravailability (
     availability_id SERIAL PRIMARY KEY,
     trainer_id INT REFERENCES trainer(trainer_id),
     start_time TIMESTAMP NOT NULL,
-    end_time TIMESTAMP NOT NULL
+    end_time TIMESTAMP NOT NULL,
+    version INT NOT NULL DEFAULT 1
 );
 
 -- GROUP CLASS
@@ -106,4 +109,17 @@ CREATE TABLE IF NOT EXISTS maintenancerecord (
     reported_at TIMESTAMP DEFAULT NOW(),
     resolved_at TIMESTAMP,
     status VARCHAR(20) CHECK (status IN ('open','in_progress','resolved'))
-);
\ No newline at end of file
+);
+
+-- INDEXES (hot-path conflict checks, dashboards and pagination, mirrors alembic revisions 0001, 0003 and 0004)
+CREATE INDEX IF NOT EXISTS ix_groupclass_room_time ON groupclass (room_id, start_time, end_time);
+CREATE INDEX IF NOT EXISTS ix_groupclass_trainer_start ON groupclass (trainer_id, start_time);
+CREATE INDEX IF NOT EXISTS ix_pt_session_room_status_start ON personaltrainingsession (room_id, status, start_time);
+CREATE INDEX IF NOT EXISTS ix_pt_session_trainer_status_start ON personaltrainingsession (trainer_id, status, start_time);
+CREATE INDEX IF NOT EXISTS ix_healthmetric_member_recorded ON healthmetric (member_id, recorded_at DESC);
+CREATE INDEX IF NOT EXISTS ix_classregistration_class ON classregistration (class_id);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_classregistration_member_class ON classregistration (member_id, class_id);
+CREATE INDEX IF NOT EXISTS ix_traineravailability_trainer_start ON traineravailability (trainer_id, start_time);
+CREATE INDEX IF NOT EXISTS ix_maintenancerecord_status ON maintenancerecord (status);
+CREATE INDEX IF NOT EXISTS ix_healthmetric_recorded_metric ON healthmetric (recorded_at DESC, metric_id DESC);
+CREATE INDEX IF NOT EXISTS ix_fitnessgoal_member ON fitnessgoal (member_id);
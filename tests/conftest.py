@@ -0,0 +1,29 @@
+"""
+Shared fixtures. Like the benchmarks, the app settings point at throwaway URLs before any app
+module is imported, and each test gets an empty in-memory SQLite schema.
+"""
+
+import os
+
+os.environ.setdefault("DATABASE_URL", "sqlite:///./test-unused.db")
+os.environ.setdefault("ASYNC_DATABASE_URL", "postgresql+asyncpg://test@localhost/test")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.model  # Registers all models with Base.metadata
+from app.core.database import Base
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
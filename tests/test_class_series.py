@@ -0,0 +1,21 @@
+"""Series expansion for POST /api/admin/classes/series."""
+
+from datetime import datetime
+
+import pytest
+
+from app.services.class_service import expand_series
+
+START, END = datetime(2026, 1, 5, 9), datetime(2026, 1, 5, 10)
+
+
+def test_rrule_expansion():
+    occurrences = expand_series(START, END, rule="FREQ=WEEKLY;BYDAY=MO,WE", count=3)
+    assert [start.day for start, _ in occurrences] == [5, 7, 12]
+    assert all(end - start == END - START for start, end in occurrences)
+
+
+@pytest.mark.parametrize("rule", ["BYDAY=MO", "FREQ=SOMETIMES", "not a rule"])
+def test_invalid_rrule(rule):
+    with pytest.raises(ValueError, match="Invalid RRULE"):
+        expand_series(START, END, rule=rule, count=3)
@@ -0,0 +1,21 @@
+"""Batch room availability (POST /api/admin/rooms/availability/batch)."""
+
+from datetime import datetime
+
+from app.model.admin_staff import AdminStaff
+from app.model.room import Room
+from app.services import booking_service
+
+
+def test_slot_ending_before_start_fails_on_its_row(db):
+    room = Room(room_name="Studio", capacity=10, admin=AdminStaff(name="Admin", email="admin@example.com"))
+    db.add(room)
+    db.commit()
+    results = booking_service.check_room_availability_batch(db, [
+        (room.room_id, datetime(2026, 1, 5, 10), datetime(2026, 1, 5, 9)),
+        (room.room_id, datetime(2026, 1, 5, 9), datetime(2026, 1, 5, 10)),
+    ])
+    assert [(r["success"], r["message"]) for r in results] == [
+        (False, "End time must be after start time"),
+        (True, "Room is available"),
+    ]
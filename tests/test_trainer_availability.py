@@ -0,0 +1,45 @@
+"""Trainer availability checks with naive and UTC-aware request datetimes."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.model.trainer import Trainer
+from app.model.trainer_availability import TrainerAvailability
+from app.repositories import session_repository
+from app.services import trainer_service
+
+UTC = timezone.utc
+
+
+@pytest.fixture
+def trainer_id(db):
+    trainer = Trainer(name="Trainer", email="trainer@example.com")
+    db.add(trainer)
+    db.flush()
+    # Back-to-back windows 08:00-10:00 and 10:00-12:00 (stored naive, UTC)
+    db.add_all([
+        TrainerAvailability(trainer_id=trainer.trainer_id, start_time=datetime(2026, 1, 5, 8), end_time=datetime(2026, 1, 5, 10)),
+        TrainerAvailability(trainer_id=trainer.trainer_id, start_time=datetime(2026, 1, 5, 10), end_time=datetime(2026, 1, 5, 12)),
+    ])
+    db.commit()
+    return trainer.trainer_id
+
+
+@pytest.mark.parametrize("tz", [None, UTC])
+def test_trainer_available(db, trainer_id, tz):
+    assert session_repository.trainer_available(db, trainer_id, datetime(2026, 1, 5, 9, tzinfo=tz), datetime(2026, 1, 5, 11, tzinfo=tz))
+    assert not session_repository.trainer_available(db, trainer_id, datetime(2026, 1, 5, 11, tzinfo=tz), datetime(2026, 1, 5, 13, tzinfo=tz))
+
+
+def test_check_trainer_available_aware(db, trainer_id):
+    result = trainer_service.check_trainer_available(db, trainer_id, datetime(2026, 1, 5, 9, tzinfo=UTC), datetime(2026, 1, 5, 11, tzinfo=UTC))
+    assert result["available"]
+
+
+def test_check_trainers_available_aware(db, trainer_id):
+    results = trainer_service.check_trainers_available(
+        db, [trainer_id, trainer_id + 1], datetime(2026, 1, 5, 8, tzinfo=UTC), datetime(2026, 1, 5, 12, tzinfo=UTC)
+    )
+    assert [r["available"] for r in results] == [True, False]
+    assert results[1]["message"] == "Trainer not found"